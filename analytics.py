@@ -0,0 +1,213 @@
+"""
+Columnar analytics over run history and the Fitbit sleep stats.
+
+Everything here works on NumPy arrays: the sleep CSV and the split
+history are each loaded into columns once, joined by date with
+searchsorted, and the statistics are computed per split in a single
+vectorised pass (grouped sums via bincount), so cost grows with the
+number of rows only inside NumPy. Requires numpy; the timer itself does
+not import this module.
+"""
+import numpy as np
+
+SLEEP_METRICS = [
+    'Sleep Duration', 'Sleep Efficiency', 'Deep Sleep', 'Light Sleep',
+    'REM Sleep', 'Awake Time', 'Resting Heart Rate', 'Step Count'
+]
+CLOCK_COLUMNS = ['Bed Time', 'Wake Time']
+
+
+def _to_float(column):
+    """Vectorised str -> float with '' as NaN"""
+    column = np.where(np.char.str_len(column) == 0, 'nan', column)
+    return column.astype(float)
+
+
+def _clock_to_minutes(column):
+    """Vectorised 'HH:MM AM' -> minutes after midnight (NaN if malformed)"""
+    column = column.astype('U8')
+    valid = np.char.str_len(column) == 8
+    chars = np.where(valid, column, '00:00 AM').view('U1').reshape(-1, 8)
+    digits = np.char.isdigit(chars[:, [0, 1, 3, 4]]).all(axis=1)
+    valid &= digits
+    chars = np.where(valid[:, None], chars, '0')
+    hours = chars[:, 0].astype(int) * 10 + chars[:, 1].astype(int)
+    minutes = chars[:, 3].astype(int) * 10 + chars[:, 4].astype(int)
+    pm = chars[:, 6] == 'P'
+    total = ((hours % 12) + 12 * pm) * 60 + minutes
+    return np.where(valid, total, np.nan)
+
+
+class SleepColumns:
+    """Sleep stats as date-sorted columns: dates (datetime64[D]) and one float array per metric"""
+
+    def __init__(self, dates, columns):
+        order = np.argsort(dates, kind='stable')
+        self.dates = dates[order]
+        self.columns = {name: values[order] for name, values in columns.items()}
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        table = np.loadtxt(csv_path, delimiter=',', dtype=str, ndmin=2, encoding='utf-8-sig')
+        header, body = list(table[0]), table[1:]
+        dates = body[:, header.index('Date')].astype('datetime64[D]')
+
+        columns = {}
+        for name in SLEEP_METRICS:
+            if name in header:
+                columns[name] = _to_float(body[:, header.index(name)])
+        for name in CLOCK_COLUMNS:
+            if name in header:
+                columns[name] = _clock_to_minutes(body[:, header.index(name)])
+        return cls(dates, columns)
+
+    def lookup(self, dates, metric):
+        """Metric values for each of `dates` (NaN where there is no row)"""
+        index = np.searchsorted(self.dates, dates)
+        index = np.minimum(index, len(self.dates) - 1)
+        found = self.dates[index] == dates if len(self.dates) else np.zeros(len(dates), bool)
+        return np.where(found, self.columns[metric][index], np.nan)
+
+
+class SegmentColumns:
+    """
+    Split history for one run type as parallel arrays, one entry per
+    recorded split of a completed run. A segment that follows a skipped
+    split spans several splits, so its segment time is NaN (its split
+    time is kept).
+    """
+
+    def __init__(self, run_ids, dates, split_codes, split_names, segment_times, split_times):
+        self.run_ids = run_ids
+        self.dates = dates
+        self.split_codes = split_codes
+        self.split_names = split_names
+        self.segment_times = segment_times
+        self.split_times = split_times
+
+    @classmethod
+    def from_history(cls, history, run_type):
+        rows = [
+            (run_id, started_at[:10], name, split_time, segment_time)
+            for run_id, _, started_at, _, name, split_time, segment_time, _, _
+            in history.iter_split_rows(run_type, clean=True)
+        ]
+        if not rows:
+            empty = np.array([])
+            return cls(empty.astype(int), empty.astype('datetime64[D]'), empty.astype(int), [], empty, empty)
+
+        run_ids, dates, names, split_times, segments = zip(*rows)
+        split_names, split_codes = np.unique(np.array(names), return_inverse=True)
+        return cls(
+            np.array(run_ids),
+            np.array(dates, dtype='datetime64[D]'),
+            split_codes,
+            [str(name) for name in split_names],
+            np.array(segments, dtype=float),
+            np.array(split_times, dtype=float)
+        )
+
+    def run_totals(self):
+        """(run ids, run dates, run time: the latest split time of each run)"""
+        run_ids, first, codes = np.unique(self.run_ids, return_index=True, return_inverse=True)
+        totals = np.full(len(run_ids), np.nan)
+        np.fmax.at(totals, codes, self.split_times)
+        return run_ids, self.dates[first], totals
+
+
+def grouped_regression(groups, x, y, group_count):
+    """
+    Per-group Pearson r and least-squares slope of y on x, in one pass.
+    Pairs with a NaN on either side are ignored. Returns (n, r, slope) arrays.
+    """
+    keep = np.isfinite(x) & np.isfinite(y)
+    groups, x, y = groups[keep], x[keep], y[keep]
+
+    n = np.bincount(groups, minlength=group_count).astype(float)
+    sx = np.bincount(groups, weights=x, minlength=group_count)
+    sy = np.bincount(groups, weights=y, minlength=group_count)
+    sxx = np.bincount(groups, weights=x * x, minlength=group_count)
+    syy = np.bincount(groups, weights=y * y, minlength=group_count)
+    sxy = np.bincount(groups, weights=x * y, minlength=group_count)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+        slope = cov / var_x
+    return n.astype(int), r, slope
+
+
+def rolling_mean(values, window):
+    """Trailing mean over the last `window` entries, skipping NaNs"""
+    finite = np.isfinite(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(finite, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(finite)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums[end] - sums[start]) / (counts[end] - counts[start])
+
+
+def rolling_mean_by_date(dates, values, window_days):
+    """Trailing mean over a calendar window (dates sorted ascending, gaps allowed)"""
+    finite = np.isfinite(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(finite, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(finite)))
+    end = np.arange(1, len(values) + 1)
+    start = np.searchsorted(dates, dates - np.timedelta64(window_days - 1, 'D'), side='left')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums[end] - sums[start]) / (counts[end] - counts[start])
+
+
+class RunAnalytics:
+    """Joins a RunHistory to the sleep stats CSV and answers trend/correlation questions"""
+
+    def __init__(self, history, sleep_csv_path):
+        self.history = history
+        self.sleep = SleepColumns.from_csv(sleep_csv_path)
+        self._segments = {}
+
+    def segments(self, run_type):
+        if run_type not in self._segments:
+            self._segments[run_type] = SegmentColumns.from_history(self.history, run_type)
+        return self._segments[run_type]
+
+    def segment_correlations(self, run_type, metric='Sleep Efficiency'):
+        """Return {split name: (samples, pearson r, seconds of segment per unit of metric)}"""
+        segments = self.segments(run_type)
+        sleep_values = self.sleep.lookup(segments.dates, metric)
+        n, r, slope = grouped_regression(segments.split_codes, sleep_values,
+                                         segments.segment_times, len(segments.split_names))
+        return {name: (int(n[i]), float(r[i]), float(slope[i])) for i, name in enumerate(segments.split_names)}
+
+    def correlation_matrix(self, run_type, metrics=None):
+        """Return (split names, metrics, r matrix of shape splits x metrics)"""
+        metrics = [m for m in (metrics or SLEEP_METRICS + CLOCK_COLUMNS) if m in self.sleep.columns]
+        segments = self.segments(run_type)
+        matrix = np.empty((len(segments.split_names), len(metrics)))
+        for column, metric in enumerate(metrics):
+            _, r, _ = grouped_regression(segments.split_codes, self.sleep.lookup(segments.dates, metric),
+                                         segments.segment_times, len(segments.split_names))
+            matrix[:, column] = r
+        return segments.split_names, metrics, matrix
+
+    def run_time_correlation(self, run_type, metric='Sleep Duration'):
+        """(samples, pearson r, slope) of total run time against a sleep metric"""
+        _, dates, totals = self.segments(run_type).run_totals()
+        n, r, slope = grouped_regression(np.zeros(len(totals), int), self.sleep.lookup(dates, metric), totals, 1)
+        return int(n[0]), float(r[0]), float(slope[0])
+
+    def sleep_trend(self, metric, window_days=7):
+        """(dates, trailing `window_days` mean of a sleep metric)"""
+        return self.sleep.dates, rolling_mean_by_date(self.sleep.dates, self.sleep.columns[metric], window_days)
+
+    def segment_trend(self, run_type, split_name, window=7):
+        """(run dates, segment times, trailing mean over the last `window` runs) for one split"""
+        segments = self.segments(run_type)
+        if split_name not in segments.split_names:
+            return np.array([], 'datetime64[D]'), np.array([]), np.array([])
+        mask = (segments.split_codes == segments.split_names.index(split_name)) & np.isfinite(segments.segment_times)
+        times = segments.segment_times[mask]
+        return segments.dates[mask], times, rolling_mean(times, window)
@@ -0,0 +1,313 @@
+"""
+Replay benchmark for the timer engine, focus timing and splits display.
+
+Feeds recorded or synthetic runs (start, ticks, splits, focus changes,
+undo/skip) through TimerEngine, FocusTimer and the real display-model
+methods of SpeedrunTimerGUI, with a fake clock and a fake Treeview, so a
+24 hour run replays in seconds. Reports events/s, per-event latency
+percentiles by event kind and peak traced memory for each scenario.
+
+    python benchmarks/bench_engine.py                       # all synthetic scenarios
+    python benchmarks/bench_engine.py --scenario long_template --json engine.json
+    python benchmarks/bench_engine.py --split-log split_log.jsonl
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from focus_colors import FocusGradient  # noqa: E402
+from focus_tracker import FakeFocusTracker, FocusTimer  # noqa: E402
+from timer import SpeedrunTimerGUI  # noqa: E402
+from timer_engine import NS_PER_SECOND, FakeClock, Split, TimerEngine  # noqa: E402
+
+FOCUS_WINDOW = "Editor"
+
+
+class FakeTreeview:
+    """Counts the Treeview calls the display makes instead of drawing anything"""
+
+    def __init__(self):
+        self.calls = {"insert": 0, "item": 0, "delete": 0, "move": 0}
+
+    def insert(self, parent, index, iid=None, **kwargs):
+        self.calls["insert"] += 1
+        return iid
+
+    def item(self, iid, **kwargs):
+        self.calls["item"] += 1
+
+    def delete(self, *items):
+        self.calls["delete"] += 1
+
+    def move(self, iid, parent, index):
+        self.calls["move"] += 1
+
+    def see(self, iid):
+        pass
+
+    def tag_configure(self, *args, **kwargs):
+        pass
+
+
+class FakeWidget:
+    def __init__(self):
+        self.text = ""
+
+    def config(self, text=None, **kwargs):
+        if text is not None:
+            self.text = text
+
+
+class FakeVar:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def headless_display(engine, precision=0, virtual=True):
+    """A SpeedrunTimerGUI with fake widgets: only its display-model methods are used"""
+    display = object.__new__(SpeedrunTimerGUI)
+    display.engine = engine
+    display.split_rows = {}
+    display.split_row_order = []
+    display.split_row_index = {}
+    display.split_scroll = 0
+    display.virtual_splits = FakeVar(virtual)
+    display.splits_tree = FakeTreeview()
+    display.timer_display = FakeWidget()
+    display.comparison_display = FakeWidget()
+    display.comparison_text = None
+    display.display_precision = FakeVar(precision)
+    display.focus_gradient = FocusGradient()
+    return display
+
+
+# Scenarios: lists of (clock ns, kind, argument) sorted by time
+
+def synthetic_run(split_count=20, duration_s=3600, tick_hz=1, focus_changes=4, undo_rate=0.0, skip_rate=0.0,
+                  seed=1):
+    """
+    A run of `split_count` splits over `duration_s`, ticking `tick_hz`
+    times a second. Every split tracks focus on one window and sees
+    `focus_changes` focus switches; undo_rate/skip_rate are the chance a
+    split is immediately undone and redone, or skipped.
+    """
+    rng = random.Random(seed)
+    events = [(0, "start", None)]
+    weights = [rng.uniform(0.5, 1.5) for _ in range(split_count)]
+    scale = duration_s * NS_PER_SECOND / sum(weights)
+
+    now = 0
+    for index, weight in enumerate(weights):
+        segment_ns = int(weight * scale)
+        events.append((now + 1, "track", FOCUS_WINDOW))
+        for _ in range(focus_changes):
+            at = now + rng.randrange(1, segment_ns)
+            events.append((at, "focus", rng.choice([FOCUS_WINDOW, "Browser", "Chat"])))
+        now += segment_ns
+        if rng.random() < skip_rate and index < split_count - 1:
+            events.append((now, "skip", None))
+            continue
+        events.append((now, "split", None))
+        if rng.random() < undo_rate and index < split_count - 1:
+            events.append((now + 1, "undo", None))
+            events.append((now + 2, "split", None))
+
+    tick_ns = NS_PER_SECOND // tick_hz
+    events.extend((at, "tick", None) for at in range(tick_ns, now, tick_ns))
+    events.sort(key=lambda event: event[0])
+    return [f"Split {i + 1}" for i in range(split_count)], events
+
+
+def recorded_run(split_log_path, tick_hz=1):
+    """Events from a split log (split_log.jsonl); pauses are collapsed, focus changes aren't recorded"""
+    names = []
+    events = []
+    last = 0
+    with open(split_log_path, 'rb') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            event = record.get("ev")
+            if event == "run":
+                names = record.get("splits", [])
+                events = []
+            elif event == "start" and not events:
+                events.append((int(record["e"] * NS_PER_SECOND), "start", None))
+            elif event in ("split", "skip", "undo"):
+                at = int(record["t"] * NS_PER_SECOND) if event == "split" else last
+                events.append((max(at, last), event, None))
+            elif event == "stop":
+                events.append((max(int(record["e"] * NS_PER_SECOND), last), "stop", None))
+            if events:
+                last = events[-1][0]
+    if not events:
+        raise ValueError(f"No run recorded in {split_log_path}")
+
+    tick_ns = NS_PER_SECOND // tick_hz
+    events.extend((at, "tick", None) for at in range(events[0][0] + tick_ns, last, tick_ns))
+    events.sort(key=lambda event: event[0])
+    return names, events
+
+
+SCENARIOS = {
+    "day": lambda: synthetic_run(split_count=20, duration_s=16 * 3600, undo_rate=0.05, skip_rate=0.02),
+    "long_template": lambda: synthetic_run(split_count=1000, duration_s=4 * 3600, focus_changes=2),
+    "long_run": lambda: synthetic_run(split_count=50, duration_s=24 * 3600),
+    "fast_ticks": lambda: synthetic_run(split_count=20, duration_s=3600, tick_hz=100),
+}
+
+
+class Replay:
+    """Wires an engine, focus timer and headless display together the way the GUI does"""
+
+    def __init__(self, names, precision=0, virtual=True):
+        self.clock = FakeClock()
+        self.engine = TimerEngine([Split(name) for name in names], clock=self.clock)
+        self.tracker = FakeFocusTracker(self.clock, title=FOCUS_WINDOW)
+        self.focus_timer = FocusTimer(self.tracker)
+        self.display = headless_display(self.engine, precision, virtual)
+
+        self.engine.subscribe("tick", self.on_tick)
+        for event in ("split", "undo", "skip"):
+            self.engine.subscribe(event, self.on_split)
+        self.display.update_splits_display()
+
+    def on_tick(self, elapsed_time):
+        self.focus_timer.flush()
+        self.display.update_timer_display()
+        self.display.update_current_split_row()
+
+    def on_split(self, index, split):
+        self.focus_timer.untrack()
+        self.display.update_splits_display()
+
+    def handle(self, kind, argument):
+        engine = self.engine
+        if kind == "tick":
+            engine.tick()
+        elif kind == "split":
+            engine.split()
+        elif kind == "focus":
+            self.tracker.set_active(argument)
+        elif kind == "track":
+            current = engine.current_split
+            if current is not None:
+                self.focus_timer.track(current, argument)
+        elif kind == "undo":
+            engine.undo_split()
+        elif kind == "skip":
+            engine.skip_split()
+        elif kind == "start":
+            engine.start()
+        elif kind == "stop":
+            engine.stop()
+
+    def run(self, events, record_latency=True):
+        """Replay events; returns {kind: [latency ns, ...]} (empty lists if not recording)"""
+        latencies = {}
+        clock = self.clock
+        handle = self.handle
+        now = time.perf_counter_ns
+        for at, kind, argument in events:
+            clock.ns = at
+            if record_latency:
+                started = now()
+                handle(kind, argument)
+                latencies.setdefault(kind, []).append(now() - started)
+            else:
+                handle(kind, argument)
+        return latencies
+
+
+def percentiles(values):
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q / 100 * len(values)))] / 1000  # noqa: E731
+    return {"count": len(values), "p50_us": pick(50), "p90_us": pick(90), "p99_us": pick(99),
+            "max_us": values[-1] / 1000}
+
+
+def bench_scenario(names, events, precision=0, memory=True, virtual=True):
+    # Throughput without per-event timing overhead
+    gc.collect()
+    replay = Replay(names, precision, virtual)
+    started = time.perf_counter()
+    replay.run(events, record_latency=False)
+    elapsed = time.perf_counter() - started
+
+    # Latency distribution per event kind
+    latencies = Replay(names, precision, virtual).run(events)
+
+    # Peak memory allocated while replaying (engine, splits, display state, caches)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        memory_replay = Replay(names, precision, virtual)
+        memory_replay.run(events, record_latency=False)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    engine = replay.engine
+    return {
+        "splits": len(names),
+        "events": len(events),
+        "run_length_s": events[-1][0] / NS_PER_SECOND,
+        "replay_s": elapsed,
+        "events_per_s": len(events) / elapsed,
+        "speedup": events[-1][0] / NS_PER_SECOND / elapsed,
+        "latency": {kind: percentiles(values) for kind, values in sorted(latencies.items())},
+        "peak_memory_mb": peak / 1e6 if peak is not None else None,
+        "treeview_calls": replay.display.splits_tree.calls,
+        "final_time_s": engine.elapsed_time,
+        "sum_of_best_s": engine.comparisons.sum_of_best()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--split-log", help="also replay a recorded split log")
+    parser.add_argument("--precision", type=int, default=0, help="timer display decimal places")
+    parser.add_argument("--full-table", action="store_true",
+                        help="give every split a row (no windowed splits table for long templates)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slow) tracemalloc pass")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    runs = [(name, SCENARIOS[name]) for name in (args.scenario or sorted(SCENARIOS))]
+    if args.split_log:
+        runs.append(("recorded", lambda: recorded_run(args.split_log)))
+
+    results = {}
+    for label, scenario in runs:
+        names, events = scenario()
+        result = results[label] = bench_scenario(names, events, args.precision, memory=not args.no_memory,
+                                                   virtual=not args.full_table)
+        memory = "" if result["peak_memory_mb"] is None else f", peak {result['peak_memory_mb']:.1f} MB allocated"
+        print(f"{label}: {result['splits']} splits, {result['events']} events over "
+              f"{result['run_length_s'] / 3600:.1f} h replayed in {result['replay_s']:.2f} s "
+              f"({result['events_per_s']:,.0f} events/s){memory}")
+        for kind, stats in result["latency"].items():
+            print(f"    {kind:6} n={stats['count']:<7} p50 {stats['p50_us']:8.1f} us  p90 {stats['p90_us']:8.1f} us  "
+                  f"p99 {stats['p99_us']:8.1f} us  max {stats['max_us']:8.1f} us")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
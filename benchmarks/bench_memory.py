@@ -0,0 +1,131 @@
+"""
+Memory benchmark: many split records as dict-backed objects, slotted
+Split objects and a columnar SplitTable.
+
+Builds the same synthetic records in each representation under
+tracemalloc and reports the bytes allocated per record, plus the time
+to build them and to sum every segment time.
+
+    python benchmarks/bench_memory.py --records 1000000 --json memory.json
+"""
+import argparse
+import gc
+import itertools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from split_table import SplitTable  # noqa: E402
+from timer_engine import Split  # noqa: E402
+
+SPLIT_NAMES = ["Wake Up", "Brush Teeth", "Breakfast", "Work Start", "Lunch", "Gym", "Dinner", "Bed"]
+
+
+class DictSplit:
+    """Split as it was before __slots__: same attributes, per-instance __dict__"""
+
+    _row_ids = itertools.count()
+
+    def __init__(self, name):
+        self.name = name
+        self.group = ()
+        self.row_id = f"split_{next(DictSplit._row_ids)}"
+        self.split_time = None
+        self.segment_time = None
+        self.best_segment = None
+        self.pb_split = None
+        self.focus_time = 0
+        self.focus_window = None
+        self.is_focusing = False
+
+
+def records(count):
+    """(run_id, name, split_time, segment_time, focus_time) tuples, one run per len(SPLIT_NAMES) splits"""
+    split_time = 0.0
+    for i in range(count):
+        position = i % len(SPLIT_NAMES)
+        if position == 0:
+            split_time = 0.0
+        segment_time = 600.0 + (i * 7919 % 1800)
+        split_time += segment_time
+        yield i // len(SPLIT_NAMES), SPLIT_NAMES[position], split_time, segment_time, segment_time * 0.8
+
+
+def build_objects(split_class, count):
+    splits = []
+    for _, name, split_time, segment_time, focus_time in records(count):
+        split = split_class(name)
+        split.split_time = split_time
+        split.segment_time = segment_time
+        split.focus_time = focus_time
+        splits.append(split)
+    return splits
+
+
+def build_table(count):
+    table = SplitTable()
+    for run_id, name, split_time, segment_time, focus_time in records(count):
+        table.append(run_id, name, split_time, segment_time, focus_time=focus_time)
+    return table
+
+
+def measure(build, count):
+    """Return (the built data, bytes allocated, seconds to build)"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    data = build(count)
+    elapsed = time.perf_counter() - started
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, allocated, elapsed
+
+
+def time_sum(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+    count = args.records
+
+    results = {"records": count}
+    cases = [
+        ("dict_split", lambda n: build_objects(DictSplit, n), lambda d: sum(s.segment_time for s in d)),
+        ("slots_split", lambda n: build_objects(Split, n), lambda d: sum(s.segment_time for s in d)),
+        ("split_table", build_table, lambda d: sum(d.segment_time)),
+    ]
+    try:
+        import numpy  # noqa: F401
+        cases.append(("split_table_numpy", build_table, lambda d: d.as_numpy("segment_time").sum()))
+    except ImportError:
+        pass
+
+    for label, build, total in cases:
+        data, allocated, build_s = measure(build, count)
+        results[label] = {
+            "bytes_per_record": allocated / count,
+            "total_mb": allocated / 1e6,
+            "build_s": build_s,
+            "sum_segments_s": time_sum(lambda: total(data))
+        }
+        del data
+        print(f"{label:18} {allocated / count:7.1f} B/record  {allocated / 1e6:8.1f} MB  "
+              f"build {build_s:6.2f} s  sum {results[label]['sum_segments_s'] * 1000:8.2f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
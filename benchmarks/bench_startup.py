@@ -0,0 +1,92 @@
+"""
+Cold-start benchmark: process start to first drawn frame of the timer window.
+
+Launches `timer.py --startup-benchmark` repeatedly with a scratch
+directory as its working and data directory (templates, run history and
+logs) and its control socket inside it, so the real files are never
+touched. Reports the wall time from spawning the process until it
+reports its first frame. Needs a display (use xvfb-run on headless CI).
+
+    python benchmarks/bench_startup.py --runs 10 --json startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+TIMER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "timer.py")
+
+
+def measure_once(workdir):
+    """Return (wall seconds to first frame, in-process seconds to first frame)"""
+    command = [sys.executable, TIMER_SCRIPT, "--startup-benchmark", "--data-dir", workdir]
+    if hasattr(socket, 'AF_UNIX'):
+        command += ["--control-socket", os.path.join(workdir, "control.sock")]
+    else:
+        command.append("--no-control-socket")  # The TCP fallback port could clash with a running timer
+
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        command,
+        cwd=workdir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    for line in proc.stdout:
+        if line.startswith("first_frame "):
+            wall = time.perf_counter() - started
+            in_process = float(line.split()[1])
+            break
+    else:
+        proc.wait()
+        raise RuntimeError(f"timer.py exited without drawing a frame:\n{proc.stderr.read()}")
+
+    proc.wait()
+    return wall, in_process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    walls = []
+    in_process = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(args.runs):
+            wall, inner = measure_once(workdir)
+            walls.append(wall)
+            in_process.append(inner)
+
+    results = {
+        "runs": args.runs,
+        "first_frame_s": {
+            "median": statistics.median(walls),
+            "min": min(walls),
+            "max": max(walls)
+        },
+        "in_process_first_frame_s": {
+            "median": statistics.median(in_process),
+            "min": min(in_process),
+            "max": max(in_process)
+        }
+    }
+
+    print(f"process start -> first frame: median {results['first_frame_s']['median'] * 1000:.1f} ms "
+          f"(min {results['first_frame_s']['min'] * 1000:.1f}, max {results['first_frame_s']['max'] * 1000:.1f})")
+    print(f"module import -> first frame: median {results['in_process_first_frame_s']['median'] * 1000:.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
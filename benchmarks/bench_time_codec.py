@@ -0,0 +1,112 @@
+"""
+Microbenchmark: cost of the time formatting done on every timer tick.
+
+One tick formats the main display and the current split's row (split,
+segment, best, focus, +/- PB, +/- best and sum of best). This times that
+work with the old inline HH:MM:SS formatter and with time_codec, plus a
+bulk export column through format_durations() and the parser.
+
+    python benchmarks/bench_time_codec.py --json time_codec.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from time_codec import cache_info, format_delta, format_duration, format_durations, parse_durations  # noqa: E402
+
+
+def legacy_format_time(seconds, precision=0):
+    """The formatter timer.py used before time_codec"""
+    if seconds is None:
+        return ""
+    scale = 10 ** precision
+    units = int(seconds * scale)
+    whole, fraction = divmod(units, scale)
+    hours = whole // 3600
+    minutes = (whole % 3600) // 60
+    seconds = whole % 60
+    if not precision:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{fraction:0{precision}d}"
+
+
+def legacy_format_delta(seconds):
+    if seconds is None:
+        return ""
+    return f"{'-' if seconds < 0 else '+'}{legacy_format_time(abs(seconds))}"
+
+
+def make_tick(format_time, format_delta, precision):
+    """A callable doing one tick's formatting at a moving elapsed time"""
+    state = {"elapsed": 3600.0}
+    best, pb_split, sum_of_best, focus = 1500.0, 3700.0, 9000.0, 1200.0
+
+    def tick():
+        elapsed = state["elapsed"] = state["elapsed"] + 0.016
+        segment = elapsed - 2400.0
+        format_time(elapsed, precision)
+        format_time(elapsed)
+        format_time(segment)
+        format_time(best)
+        format_time(focus)
+        format_delta(elapsed - pb_split)
+        format_delta(segment - best)
+        format_time(sum_of_best)
+    return tick
+
+
+def per_call_us(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=100_000)
+    parser.add_argument("--column", type=int, default=100_000, help="values in the bulk export column")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    for precision in (0, 2):
+        legacy = per_call_us(make_tick(legacy_format_time, legacy_format_delta, precision), args.ticks)
+        codec = per_call_us(make_tick(format_duration, format_delta, precision), args.ticks)
+        results[f"tick_precision_{precision}_us"] = {"legacy": legacy, "time_codec": codec}
+        print(f"tick, display precision {precision}: legacy {legacy:.2f} us, time_codec {codec:.2f} us "
+              f"({legacy / codec:.1f}x)")
+
+    rng = random.Random(1)
+    column = [rng.uniform(0, 86400) for _ in range(args.column)]
+    legacy = per_call_us(lambda: [legacy_format_time(v) for v in column], 1) / args.column * 1000
+    bulk = per_call_us(lambda: format_durations(column), 1) / args.column * 1000
+    results["format_column_ns_per_value"] = {"legacy": legacy, "format_durations": bulk}
+    print(f"format column: legacy {legacy:.0f} ns/value, format_durations {bulk:.0f} ns/value")
+
+    try:
+        import numpy as np
+        array = np.array(column)
+        numpy_bulk = per_call_us(lambda: format_durations(array), 1) / args.column * 1000
+        results["format_column_ns_per_value"]["format_durations_numpy"] = numpy_bulk
+        print(f"format column (NumPy input): {numpy_bulk:.0f} ns/value")
+    except ImportError:
+        pass
+
+    texts = format_durations(column)
+    parse = per_call_us(lambda: parse_durations(texts), 1) / args.column * 1000
+    results["parse_column_ns_per_value"] = parse
+    print(f"parse column: {parse:.0f} ns/value")
+
+    info = cache_info()
+    results["cache"] = {"hits": info.hits, "misses": info.misses}
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Best segments and PB splits per template, kept split by split.
+
+BestTimesIndex follows the engine's split, undo and finished events and
+updates only the split that changed (the sum of best is the engine's
+ComparisonIndex's job). Changes are persisted as deltas: one compact JSON
+line per changed split appended to a journal, which is folded into one
+line per split when it grows. best_times_from_history() recomputes
+everything from the run history in a few NumPy passes.
+"""
+import json
+import os
+from array import array
+
+from persistence import atomic_write_bytes
+from split_table import NAN, _pack
+
+
+class TemplateBests:
+    """Best segment and PB split time per position of one template"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.best = array('d', [NAN]) * len(self.names)
+        self.pb = array('d', [NAN]) * len(self.names)
+
+    def set_best(self, index, value):
+        """Returns True if the best segment changed"""
+        old, new = self.best[index], _pack(value)
+        if old == new or (old != old and new != new):
+            return False
+        self.best[index] = new
+        return True
+
+    def set_pb(self, index, value):
+        """Returns True if the PB split time changed"""
+        old, new = self.pb[index], _pack(value)
+        if old == new or (old != old and new != new):
+            return False
+        self.pb[index] = new
+        return True
+
+    @property
+    def pb_time(self):
+        if not self.pb or self.pb[-1] != self.pb[-1]:
+            return None
+        return self.pb[-1]
+
+
+class BestTimesIndex:
+    """
+    Best segment and PB split per (template, split name), persisted as a
+    delta journal of {"rt": run type, "n": split name, "b": best, "p": pb}
+    lines ("b"/"p" only when that value changed).
+
+    What's recorded here wins over a template file's own values (see
+    overlay()), so golds and PBs are kept without rewriting templates.
+    """
+
+    COMPACT_RATIO = 4  # Fold the journal once it has this many lines per split recorded
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}  # run type -> {split name: [best, pb]}
+        self.run_type = None
+        self.current = None  # TemplateBests for the engine's splits
+        self.engine = None
+        self.get_run_type = lambda: None
+
+        lines = self._load()
+        if lines > self.COMPACT_RATIO * max(1, sum(len(splits) for splits in self.records.values())):
+            self.compact()
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _load(self):
+        """Replay the journal; returns its line count"""
+        lines = 0
+        try:
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn last line
+                    lines += 1
+                    stored = self.records.setdefault(record["rt"], {}).setdefault(record["n"], [None, None])
+                    if "b" in record:
+                        stored[0] = record["b"]
+                    if "p" in record:
+                        stored[1] = record["p"]
+        except FileNotFoundError:
+            pass
+        return lines
+
+    def compact(self):
+        """Rewrite the journal as one line per split"""
+        data = b"".join(
+            self._encode({"rt": run_type, "n": name, "b": best, "p": pb})
+            for run_type, splits in self.records.items()
+            for name, (best, pb) in splits.items()
+        )
+        atomic_write_bytes(self.path, data)
+
+    @staticmethod
+    def _encode(record):
+        return json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+
+    def close(self):
+        os.close(self.fd)
+
+    def _record(self, run_type, name, best, pb):
+        """Store a split's values, appending a journal line only for what differs"""
+        stored = self.records.setdefault(run_type, {}).setdefault(name, [None, None])
+        delta = {}
+        if stored[0] != best:
+            stored[0] = delta["b"] = best
+        if stored[1] != pb:
+            stored[1] = delta["p"] = pb
+        if delta:
+            os.write(self.fd, self._encode(dict(rt=run_type, n=name, **delta)))
+
+    # Queries
+
+    def bests(self, run_type, name):
+        """(best segment, PB split) recorded for a split, or (None, None)"""
+        return tuple(self.records.get(run_type, {}).get(name, (None, None)))
+
+    def overlay(self, run_type, splits):
+        """Give freshly loaded template splits the best and PB times recorded for them"""
+        recorded = self.records.get(run_type)
+        if not recorded:
+            return
+        for split in splits:
+            stored = recorded.get(split.name)
+            if stored is not None:
+                split.best_segment, split.pb_split = stored
+
+    # Engine wiring
+
+    def attach(self, engine, get_run_type):
+        """Follow an engine's events; get_run_type() names the template its splits belong to"""
+        self.engine = engine
+        self.get_run_type = get_run_type
+        engine.subscribe("split", self.on_split)
+        engine.subscribe("undo", self.on_undo)
+        engine.subscribe("finished", self.on_finished)
+        engine.subscribe("splits_changed", self.rebind)
+        self.rebind()
+
+    def rebind(self):
+        """Start over from the engine's splits (new template, or splits edited or restored)"""
+        self.run_type = self.get_run_type()
+        self.current = TemplateBests(split.name for split in self.engine.splits)
+        for index, split in enumerate(self.engine.splits):
+            self.sync(index, split)
+
+    def sync(self, index, split):
+        """Pick up split `index`'s best and PB if they changed"""
+        if self.run_type != self.get_run_type():
+            self.rebind()  # Template saved under a new name
+            return
+        changed = self.current.set_best(index, split.best_segment)
+        changed = self.current.set_pb(index, split.pb_split) or changed
+        if changed:
+            self._record(self.run_type, split.name, split.best_segment, split.pb_split)
+
+    def on_split(self, index, split):
+        # A split can set a gold
+        self.sync(index, split)
+
+    def on_undo(self, index, split):
+        # Undoing puts the previous best back, and undoing the final split the previous PB
+        if index == len(self.engine.splits) - 1:
+            self.on_finished()
+        else:
+            self.sync(index, split)
+
+    def on_finished(self):
+        # A new PB changes every split's PB time
+        for index, split in enumerate(self.engine.splits):
+            self.sync(index, split)
+
+
+def best_times_from_history(table, names):
+    """
+    Best segment and PB split time for each of `names`, recomputed from a
+    SplitTable of past runs (RunHistory.split_table(clean=True), so reset
+    runs and segments spanning a skipped split are left out). The best
+    segment is the minimum recorded segment for the split name; the PB is
+    the run with the fastest time at the last split. Needs numpy. Returns
+    {name: (best, pb)}, with None where history has no time.
+    """
+    import numpy as np
+
+    result = {name: (None, None) for name in names}
+    if not len(table) or not names:
+        return result
+    codes = table.as_numpy("name_codes")
+    segments = table.as_numpy("segment_time")
+    split_times = table.as_numpy("split_time")
+    run_ids = table.as_numpy("run_ids")
+
+    # Per-name minimum segment in one unbuffered scatter (fmin skips NaN)
+    best = np.full(len(table.names), np.nan)
+    np.fmin.at(best, codes, segments)
+
+    pb = {}
+    last = table.name_code(names[-1])
+    if last is not None:
+        finals = np.where(codes == last, split_times, np.nan)
+        if not np.isnan(finals).all():
+            pb_run = run_ids[np.nanargmin(finals)]
+            in_run = np.flatnonzero(run_ids == pb_run)
+            pb = {table.names[code]: time for code, time in zip(codes[in_run].tolist(), split_times[in_run].tolist())}
+
+    for name in names:
+        code = table.name_code(name)
+        value = best[code] if code is not None else np.nan
+        pb_time = pb.get(name, NAN)
+        result[name] = (None if np.isnan(value) else float(value), None if pb_time != pb_time else pb_time)
+    return result
@@ -0,0 +1,257 @@
+import json
+import os
+import queue
+import selectors
+import socket
+import tempfile
+import threading
+
+TCP_FALLBACK_ADDRESS = ("127.0.0.1", 47321)
+MAX_LINE = 1024
+
+
+def default_address():
+    """Unix domain socket path where available, otherwise a localhost TCP port"""
+    if not hasattr(socket, 'AF_UNIX'):
+        return TCP_FALLBACK_ADDRESS
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    return os.path.join(runtime_dir, f"speedrun-timer-{uid}.sock")
+
+
+def engine_handlers(engine):
+    """
+    Default command table for a bare TimerEngine. Each handler is called as
+    handler(timestamp_ns, *args), with the engine clock reading taken when
+    the command arrived, and returns a reply string (or None for "ok").
+    """
+    def start(timestamp_ns):
+        engine.start(at_ns=timestamp_ns)
+
+    def stop(timestamp_ns):
+        engine.stop(at_ns=timestamp_ns)
+
+    def split(timestamp_ns):
+        if engine.current_split is None:
+            return "error no split in progress"
+        engine.split(at_ns=timestamp_ns)
+
+    def reset(timestamp_ns):
+        engine.reset()
+
+    def optional(method_name):
+        def handler(timestamp_ns, *args):
+            method = getattr(engine, method_name, None)
+            if method is None:
+                return f"error {method_name} is not supported"
+            method(*args)
+        return handler
+
+    def status(timestamp_ns):
+        current = engine.current_split
+        return "ok " + json.dumps({
+            "running": engine.is_running,
+            "elapsed": engine.elapsed_at(timestamp_ns),
+            "split_index": engine.current_split_index,
+            "split": current.name if current is not None else None,
+            "splits": len(engine.splits)
+        }, separators=(',', ':'))
+
+    return {
+        "start": start,
+        "stop": stop,
+        "split": split,
+        "undo": optional("undo_split"),
+        "skip": optional("skip_split"),
+        "reset": reset,
+        "status": status
+    }
+
+
+class ControlServer:
+    """
+    Local control socket for driving the timer without touching its window.
+
+    Line protocol: the client sends one command per line (start, stop,
+    split, undo, skip, reset, status) and gets one reply line back ("ok",
+    "ok <json>" or "error <reason>"). The engine clock is read as soon as
+    a command's bytes arrive, so the split lands at the moment of receipt
+    no matter how late the handler runs.
+
+    The server never blocks. Everything is registered with a selector;
+    call poll() when fileno() is readable (Tk: createfilehandler), or run
+    serve_forever() headless. Where there is no such descriptor (Windows),
+    serve_in_thread() runs the selector on a thread that stamps and queues
+    the commands, and drain() runs them on the caller's thread.
+    """
+
+    THREAD_TIMEOUT = 0.2  # How often the serving thread checks for close()
+
+    def __init__(self, handlers, clock, address=None):
+        self.handlers = handlers
+        self.clock = clock
+        self.address = address or default_address()
+        self.selector = selectors.DefaultSelector()
+        self._buffers = {}
+        self._queued = None  # (conn, line, received_ns) waiting for drain(), in threaded mode
+        self._thread = None
+
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(self.address)
+                except OSError:
+                    os.unlink(self.address)  # Stale socket from a previous run
+                else:
+                    raise OSError(f"Another timer is already listening on {self.address}")
+                finally:
+                    probe.close()
+            self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.listener.bind(self.address)
+            os.chmod(self.address, 0o600)
+        else:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            if hasattr(socket, 'SO_EXCLUSIVEADDRUSE'):
+                # Windows: SO_REUSEADDR there would let a second timer bind the same port
+                self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+            else:
+                self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind(self.address)
+        self.listener.listen(8)
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self._running = True
+
+    def fileno(self):
+        """A single descriptor that is readable whenever poll() has work (None if unsupported)"""
+        try:
+            return self.selector.fileno()
+        except AttributeError:
+            return None  # e.g. SelectSelector on Windows: poll() on a timer instead
+
+    def poll(self, timeout=0):
+        """Accept connections and run any complete commands; returns how many ran"""
+        handled = 0
+        for key, _ in self.selector.select(timeout):
+            if key.fileobj is self.listener:
+                self._accept()
+            else:
+                handled += self._read(key.fileobj)
+        return handled
+
+    def serve_forever(self, timeout=0.5):
+        while self._running:
+            self.poll(timeout)
+
+    def serve_in_thread(self):
+        """
+        Wait for commands on a daemon thread instead of poll(). Each command
+        is stamped on arrival, as usual, but its handler only runs when
+        drain() is called, so handlers stay on the caller's thread.
+        """
+        self._queued = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self.serve_forever, args=(self.THREAD_TIMEOUT,),
+                                        name="control-socket", daemon=True)
+        self._thread.start()
+
+    def drain(self):
+        """Run the commands queued by the serving thread; returns how many ran"""
+        handled = 0
+        while True:
+            try:
+                conn, line, received_ns = self._queued.get_nowait()
+            except queue.Empty:
+                return handled
+            self._reply(conn, self.dispatch(line, received_ns))
+            handled += 1
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+        for key in list(self.selector.get_map().values()):
+            self.selector.unregister(key.fileobj)
+            key.fileobj.close()
+        self.selector.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def _accept(self):
+        try:
+            conn, _ = self.listener.accept()
+        except BlockingIOError:
+            return
+        conn.setblocking(False)
+        self._buffers[conn] = b""
+        self.selector.register(conn, selectors.EVENT_READ)
+
+    def _drop(self, conn):
+        self.selector.unregister(conn)
+        self._buffers.pop(conn, None)
+        conn.close()
+
+    def _read(self, conn):
+        received_ns = self.clock()
+        try:
+            data = conn.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return 0
+        except OSError:
+            self._drop(conn)
+            return 0
+        if not data:
+            self._drop(conn)
+            return 0
+
+        buffer = self._buffers[conn] + data
+        lines = buffer.split(b"\n")
+        self._buffers[conn] = lines.pop()
+        if len(self._buffers[conn]) > MAX_LINE:
+            self._reply(conn, "error line too long")
+            self._drop(conn)
+            return 0
+
+        for line in lines:
+            line = line.decode('utf-8', 'replace')
+            if self._queued is not None:
+                self._queued.put((conn, line, received_ns))
+            else:
+                self._reply(conn, self.dispatch(line, received_ns))
+        return len(lines)
+
+    def dispatch(self, line, received_ns):
+        parts = line.strip().split()
+        if not parts:
+            return "error empty command"
+        handler = self.handlers.get(parts[0].lower())
+        if handler is None:
+            return f"error unknown command {parts[0]}"
+        try:
+            reply = handler(received_ns, *parts[1:])
+        except Exception as e:
+            return f"error {str(e)}"
+        return reply or "ok"
+
+    def _reply(self, conn, reply):
+        try:
+            conn.sendall(reply.encode('utf-8') + b"\n")
+        except OSError:
+            pass
+
+
+def send_command(command, address=None, timeout=2.0):
+    """Send one command to a running timer and return its reply line"""
+    address = address or default_address()
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall(command.encode('utf-8') + b"\n")
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            reply += chunk
+    return reply.decode('utf-8').strip()
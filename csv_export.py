@@ -0,0 +1,107 @@
+import csv
+import gzip
+import io
+from itertools import groupby, islice
+
+from time_codec import format_durations
+
+WRITE_BUFFER = 1 << 20
+HISTORY_BATCH = 1024  # Rows formatted per format_durations() call
+
+HISTORY_COLUMNS = ['Run Id', 'Run Type', 'Started At', 'Completed', 'Split Name',
+                   'Split Time', 'Segment Time', 'Focus Time', 'Focus %', 'Gold']
+NUMERIC_COLUMNS = ['Split Seconds', 'Segment Seconds', 'Focus Seconds']
+
+
+def focus_percent(focus_time, segment_time):
+    if focus_time and segment_time and segment_time > 0:
+        return f"{focus_time / segment_time * 100:.1f}%"
+    return ""
+
+
+def open_csv_output(path, compress=None):
+    """Open a buffered text stream for CSV output; gzip if asked or the path ends in .gz"""
+    if compress is None:
+        compress = str(path).endswith('.gz')
+    if compress:
+        raw = gzip.open(path, 'wb', compresslevel=6)
+        return io.TextIOWrapper(io.BufferedWriter(raw, WRITE_BUFFER), encoding='utf-8', newline='')
+    return open(path, 'w', newline='', buffering=WRITE_BUFFER)
+
+
+def write_run_csv(f, run_type, date, splits):
+    """Write one run in the layout of File > Export Times to CSV"""
+    writer = csv.writer(f)
+    writer.writerow(['Run Type', run_type])
+    writer.writerow(['Date', date])
+    writer.writerow([])
+    writer.writerow(['Split Name', 'Split Time', 'Segment Time', 'Best Segment', 'Focus Time', 'Focus %'])
+    splits = list(splits)
+    writer.writerows(zip(
+        (split.name for split in splits),
+        format_durations([split.split_time for split in splits]),
+        format_durations([split.segment_time for split in splits]),
+        format_durations([split.best_segment for split in splits]),
+        format_durations([split.focus_time or None for split in splits]),
+        (focus_percent(split.focus_time, split.segment_time) for split in splits)
+    ))
+
+
+def history_rows(split_rows, numeric=False):
+    """
+    Turn (run_id, run_type, started_at, completed, split_name, split_time,
+    segment_time, focus_time, is_gold) tuples into CSV rows, lazily,
+    formatting the time columns HISTORY_BATCH rows at a time.
+    """
+    split_rows = iter(split_rows)
+    while True:
+        batch = list(islice(split_rows, HISTORY_BATCH))
+        if not batch:
+            return
+        columns = zip(
+            format_durations([row[5] for row in batch]),
+            format_durations([row[6] for row in batch]),
+            format_durations([row[7] or None for row in batch])
+        )
+        for (run_id, run_type, started_at, completed, name, split_time, segment_time, focus_time, is_gold), \
+                (split_text, segment_text, focus_text) in zip(batch, columns):
+            row = [
+                run_id, run_type, started_at, "yes" if completed else "no", name,
+                split_text, segment_text, focus_text,
+                focus_percent(focus_time, segment_time),
+                "yes" if is_gold else ""
+            ]
+            if numeric:
+                row += [
+                    "" if split_time is None else f"{split_time:.3f}",
+                    "" if segment_time is None else f"{segment_time:.3f}",
+                    f"{focus_time:.3f}" if focus_time else ""
+                ]
+            yield row
+
+
+def write_history_csv(path, split_rows, numeric=False, compress=None, chunk_runs=64, progress=None):
+    """
+    Stream many runs to a (optionally gzip-compressed) CSV file.
+
+    `split_rows` is any iterable of split tuples as taken by history_rows(),
+    ordered by run; typically RunHistory.iter_split_rows(). Nothing is
+    materialised beyond `chunk_runs` runs at a time. progress(runs), if
+    given, is called after each chunk. Returns the number of runs written.
+    """
+    runs = 0
+    with open_csv_output(path, compress) as f:
+        writer = csv.writer(f)
+        writer.writerow(HISTORY_COLUMNS + (NUMERIC_COLUMNS if numeric else []))
+
+        chunk = []
+        for _, run_rows in groupby(history_rows(split_rows, numeric), key=lambda row: row[0]):
+            chunk.extend(run_rows)
+            runs += 1
+            if runs % chunk_runs == 0:
+                writer.writerows(chunk)
+                chunk.clear()
+                if progress is not None:
+                    progress(runs)
+        writer.writerows(chunk)
+    return runs
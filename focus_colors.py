@@ -0,0 +1,105 @@
+import json
+
+# Focus % -> row background, from distracted (pink) to fully focused (green)
+DEFAULT_FOCUS_STOPS = [
+    (0, "#FCC0C7"),
+    (5.5, "#eebcc7"),
+    (11, "#e4bcc4"),
+    (16.5, "#dabcc1"),
+    (22, "#d0bcbe"),
+    (27.5, "#c6bcbb"),
+    (33, "#bcbcb8"),
+    (38.5, "#b2bcb5"),
+    (44, "#a8bcb2"),
+    (49.5, "#9ebcaf"),
+    (55, "#94bcac"),
+    (59.5, "#8abca9"),
+    (66, "#80bca6"),
+    (71.5, "#76bca3"),
+    (77, "#6cbca0"),
+    (82.5, "#62bc9d"),
+    (88, "#58bc9a"),
+    (93.5, "#4EBC97"),
+    (99, "#00c62b")
+]
+
+
+def _rgb(color):
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _blend(low, high, t):
+    a, b = _rgb(low), _rgb(high)
+    return "#" + "".join(f"{round(x + (y - x) * t):02x}" for x, y in zip(a, b))
+
+
+def focus_tag(color):
+    """Name of the shared Treeview tag for a gradient colour"""
+    return f"focus_{color.lstrip('#').lower()}"
+
+
+class FocusGradient:
+    """
+    Focus percentage -> colour and Treeview tag, as 101-entry lookup tables.
+
+    Each whole percentage 0-100 gets the nearest stop's colour (or a
+    blend of the two stops either side when interpolate is set), worked
+    out once up front. The distinct colours form a fixed tag pool that
+    is registered with the Treeview once, so colouring a row is a clamp
+    and a list index.
+    """
+
+    def __init__(self, stops=DEFAULT_FOCUS_STOPS, interpolate=False):
+        self.stops = sorted((float(percent), color) for percent, color in stops)
+        self.interpolate = interpolate
+        self.colors = [self._color_at(percent) for percent in range(101)]
+        self.tags = [focus_tag(color) for color in self.colors]
+        self.palette = list(dict.fromkeys(self.colors))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Gradient from a JSON settings file {"interpolate": bool, "stops":
+        [[percent, "#rrggbb"], ...]}; the defaults for anything missing
+        """
+        try:
+            with open(path, 'r') as f:
+                settings = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        except ValueError as e:
+            print(f"Ignoring unreadable focus colour settings {path}: {str(e)}")
+            return cls()
+        return cls(settings.get("stops") or DEFAULT_FOCUS_STOPS, bool(settings.get("interpolate", False)))
+
+    def settings(self):
+        return {"interpolate": self.interpolate, "stops": [list(stop) for stop in self.stops]}
+
+    def _color_at(self, percent):
+        stops = self.stops
+        if not self.interpolate:
+            return min(stops, key=lambda stop: abs(stop[0] - percent))[1]
+        if percent <= stops[0][0]:
+            return stops[0][1]
+        for (low, low_color), (high, high_color) in zip(stops, stops[1:]):
+            if percent <= high:
+                return _blend(low_color, high_color, (percent - low) / (high - low) if high > low else 1.0)
+        return stops[-1][1]
+
+    @staticmethod
+    def index(percentage):
+        """Table index for a focus percentage (rounded, clamped to 0-100)"""
+        index = int(percentage + 0.5)
+        return 0 if index < 0 else 100 if index > 100 else index
+
+    def color(self, percentage):
+        return self.colors[self.index(percentage)]
+
+    def tag(self, percentage):
+        return self.tags[self.index(percentage)]
+
+    def register(self, tree):
+        """Configure the tag pool on a Treeview"""
+        for color in self.palette:
+            tree.tag_configure(focus_tag(color), background=color)
@@ -0,0 +1,256 @@
+import os
+import sys
+import time
+
+from timer_engine import NS_PER_SECOND
+
+
+class FocusTracker:
+    """
+    Reports which window has focus and notifies subscribers when it changes.
+
+    Subscribers are called as callback(window_title, timestamp_ns), where
+    the timestamp comes from the tracker's monotonic clock. Backends either
+    need polling (poll_interval is the number of seconds between poll()
+    calls) or are event driven (fileno() returns a descriptor to watch,
+    and dispatch() is called when it becomes readable).
+    """
+
+    poll_interval = None
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.active_title = None
+        self._listeners = []
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def active_window(self):
+        """Title of the window that currently has focus"""
+        raise NotImplementedError
+
+    def poll(self):
+        """Check for a focus change (polled backends only)"""
+        self._changed(self.active_window())
+
+    def fileno(self):
+        """Descriptor that becomes readable on focus events, or None if the backend polls"""
+        return None
+
+    def dispatch(self):
+        """Handle pending focus events (event-driven backends only)"""
+
+    def close(self):
+        pass
+
+    def _changed(self, title, timestamp_ns=None):
+        if title == self.active_title:
+            return
+        self.active_title = title
+        if timestamp_ns is None:
+            timestamp_ns = self.clock()
+        for callback in list(self._listeners):
+            callback(title, timestamp_ns)
+
+
+class Win32FocusTracker(FocusTracker):
+    """Polls GetForegroundWindow; the timestamp of a change is when it was seen"""
+
+    poll_interval = 0.25
+
+    def __init__(self, clock=time.perf_counter_ns):
+        super().__init__(clock)
+        import win32gui  # Windows-only
+
+        self.win32gui = win32gui
+        self.active_title = self.active_window()
+
+    def active_window(self):
+        return self.win32gui.GetWindowText(self.win32gui.GetForegroundWindow())
+
+
+class X11FocusTracker(FocusTracker):
+    """
+    Event-driven tracker for EWMH window managers (needs python-xlib).
+
+    Listens for PropertyNotify on the root window's _NET_ACTIVE_WINDOW, and
+    on the active window's title, so nothing runs while focus is unchanged.
+    """
+
+    def __init__(self, clock=time.perf_counter_ns, display_name=None):
+        super().__init__(clock)
+        from Xlib import X, display, error
+
+        self.X = X
+        self.XError = error.XError
+        self.display = display.Display(display_name)
+        self.root = self.display.screen().root
+        self.NET_ACTIVE_WINDOW = self.display.intern_atom('_NET_ACTIVE_WINDOW')
+        self.NET_WM_NAME = self.display.intern_atom('_NET_WM_NAME')
+        self.WM_NAME = self.display.intern_atom('WM_NAME')
+        self.window = None
+
+        self.root.change_attributes(event_mask=X.PropertyChangeMask)
+        self._watch_active_window()
+        self.active_title = self.active_window()
+        self.display.flush()
+
+    def _active_window_id(self):
+        prop = self.root.get_full_property(self.NET_ACTIVE_WINDOW, self.X.AnyPropertyType)
+        if not prop or not len(prop.value):
+            return 0
+        return prop.value[0]
+
+    def _watch_active_window(self):
+        """Follow title changes of the newly active window"""
+        window_id = self._active_window_id()
+        if self.window is not None and self.window.id == window_id:
+            return
+        self.window = self.display.create_resource_object('window', window_id) if window_id else None
+        if self.window is not None:
+            try:
+                self.window.change_attributes(event_mask=self.X.PropertyChangeMask)
+            except self.XError:
+                self.window = None
+
+    def active_window(self):
+        if self.window is None:
+            return None
+        try:
+            name = self.window.get_full_property(self.NET_WM_NAME, self.X.AnyPropertyType)
+            if name is None:
+                return self.window.get_wm_name()
+            value = name.value
+            return value.decode('utf-8', 'replace') if isinstance(value, bytes) else value
+        except self.XError:
+            return None
+
+    def fileno(self):
+        return self.display.fileno()
+
+    def dispatch(self):
+        timestamp_ns = self.clock()
+        changed = False
+        while self.display.pending_events():
+            event = self.display.next_event()
+            if event.type != self.X.PropertyNotify:
+                continue
+            if event.atom == self.NET_ACTIVE_WINDOW:
+                self._watch_active_window()
+                changed = True
+            elif event.atom in (self.NET_WM_NAME, self.WM_NAME) and self.window is not None \
+                    and event.window.id == self.window.id:
+                changed = True
+        if changed:
+            self._changed(self.active_window(), timestamp_ns)
+
+    def close(self):
+        self.display.close()
+
+
+class FakeFocusTracker(FocusTracker):
+    """In-memory tracker for tests: call set_active() to simulate focus changes"""
+
+    def __init__(self, clock=time.perf_counter_ns, title=None):
+        super().__init__(clock)
+        self.active_title = title
+
+    def active_window(self):
+        return self.active_title
+
+    def poll(self):
+        pass
+
+    def set_active(self, title, timestamp_ns=None):
+        self._changed(title, timestamp_ns)
+
+
+def create_focus_tracker(clock=time.perf_counter_ns):
+    """Pick the focus tracker backend for this platform, or None if there isn't one"""
+    if sys.platform == 'win32':
+        try:
+            return Win32FocusTracker(clock)
+        except ImportError:
+            return None
+    if os.environ.get('DISPLAY'):
+        try:
+            return X11FocusTracker(clock)
+        except Exception:
+            return None
+    return None
+
+
+class FocusTimer:
+    """
+    Accumulates focus time for one split at a time.
+
+    Focus time is measured between the tracker's change timestamps, so it
+    is exact regardless of how often (or whether) anything polls. flush()
+    folds the focus time so far into the split for live display.
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self.clock = tracker.clock
+        self.split = None
+        self.target = None
+        self.focused_since = None
+        self.paused = False
+        tracker.subscribe(self.on_focus_change)
+
+    def track(self, split, window_title):
+        """Start counting focus time for `split` while `window_title` is active"""
+        self.untrack()
+        self.split = split
+        self.target = window_title
+        split.focus_window = window_title
+        split.is_focusing = True
+        if not self.paused and self.tracker.active_title == window_title:
+            self.focused_since = self.clock()
+
+    def untrack(self, timestamp_ns=None):
+        """Stop tracking, keeping the focus time counted so far"""
+        if self.split is None:
+            return
+        self.flush(timestamp_ns)
+        self.split.is_focusing = False
+        self.split.focus_window = None
+        self.split = None
+        self.target = None
+        self.focused_since = None
+
+    def pause(self, timestamp_ns=None):
+        self.flush(timestamp_ns)
+        self.focused_since = None
+        self.paused = True
+
+    def resume(self, timestamp_ns=None):
+        self.paused = False
+        if self.split is not None and self.tracker.active_title == self.target:
+            self.focused_since = timestamp_ns if timestamp_ns is not None else self.clock()
+
+    def flush(self, timestamp_ns=None):
+        """Add the focus time accrued since the last flush to the split"""
+        if self.split is None or self.focused_since is None:
+            return
+        if timestamp_ns is None:
+            timestamp_ns = self.clock()
+        if timestamp_ns > self.focused_since:
+            self.split.focus_time += (timestamp_ns - self.focused_since) / NS_PER_SECOND
+            self.focused_since = timestamp_ns
+
+    def on_focus_change(self, title, timestamp_ns):
+        if self.split is None or self.paused:
+            return
+        if title == self.target:
+            if self.focused_since is None:
+                self.focused_since = timestamp_ns
+        else:
+            self.flush(timestamp_ns)
+            self.focused_since = None
@@ -0,0 +1,211 @@
+"""
+Timing instrumentation for the Tk event loop.
+
+Instrumentation.wrap() times a callback into a per-name histogram,
+tick_scheduled()/tick_fired() measure how late each `after` timer fires
+against when it was asked for, and SamplingProfiler periodically
+samples the UI thread's stack from a background thread. report() gives
+everything as plain JSON data.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+FRAME_BUDGET_NS = 16_666_667  # One frame at 60 Hz
+BUCKETS = 32
+
+
+class Histogram:
+    """
+    Durations in log2 buckets: bucket b holds [2**b, 2**(b+1)) microseconds
+    (bucket 0 also takes anything under 1 us). Recording is O(1) and the
+    memory is fixed, so it can stay on for a whole day run.
+    """
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.over_budget = 0
+
+    def record(self, duration_ns):
+        bucket = (duration_ns // 1000).bit_length() - 1
+        self.counts[0 if bucket < 0 else BUCKETS - 1 if bucket >= BUCKETS else bucket] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        if duration_ns > FRAME_BUDGET_NS:
+            self.over_budget += 1
+
+    def percentile(self, q):
+        """Upper bound (us) of the bucket holding the q-th percentile, or None if empty"""
+        if not self.count:
+            return None
+        target = q / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return 2 ** (bucket + 1)
+        return 2 ** BUCKETS
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else None,
+            "max_us": self.max_ns / 1000,
+            "p50_us": self.percentile(50),
+            "p99_us": self.percentile(99),
+            "over_frame_budget": self.over_budget,
+            "buckets_us": {f"<{2 ** (b + 1)}": n for b, n in enumerate(self.counts) if n}
+        }
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a
+    background thread (sys._current_frames), counting the innermost
+    function ("self") and every function on the stack ("total").
+    """
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.interval = interval
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.self_counts[self._label(frame)] += 1
+            seen = set()
+            while frame is not None:
+                label = self._label(frame)
+                if label not in seen:
+                    seen.add(label)
+                    self.total_counts[label] += 1
+                frame = frame.f_back
+
+    @staticmethod
+    def _label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def report(self, top=25):
+        def share(counts):
+            return [{"function": label, "samples": n, "percent": n / self.samples * 100}
+                    for label, n in counts.most_common(top)]
+        return {
+            "interval_s": self.interval,
+            "samples": self.samples,
+            "self": share(self.self_counts) if self.samples else [],
+            "total": share(self.total_counts) if self.samples else []
+        }
+
+
+class Instrumentation:
+    """Callback timing histograms, tick jitter and an optional sampling profiler"""
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.histograms = {}
+        self.jitter = Histogram()
+        self.early_ticks = 0
+        self.profiler = None
+        self._tick_due_ns = None
+        self._started_ns = clock()
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def wrap(self, name, func):
+        """func, timed into the `name` histogram on every call"""
+        histogram = self.histogram(name)
+        clock = self.clock
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.record(clock() - started)
+        return timed
+
+    def instrument(self, obj, method_names):
+        """Replace each named method on obj with a timed wrapper (before callbacks are bound)"""
+        for name in method_names:
+            setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+    def tick_scheduled(self, delay_ms):
+        """Call when an `after(delay_ms, ...)` tick is scheduled"""
+        self._tick_due_ns = self.clock() + delay_ms * 1_000_000
+
+    def tick_fired(self):
+        """Call first thing in the tick callback; records how late it fired"""
+        if self._tick_due_ns is None:
+            return
+        late = self.clock() - self._tick_due_ns
+        self._tick_due_ns = None
+        if late < 0:
+            self.early_ticks += 1
+            late = 0
+        self.jitter.record(late)
+
+    def tick_cancelled(self):
+        self._tick_due_ns = None
+
+    def set_profiling(self, enabled, interval=0.005):
+        if enabled:
+            if self.profiler is None:
+                self.profiler = SamplingProfiler(interval=interval)
+            self.profiler.start()
+        elif self.profiler is not None:
+            self.profiler.stop()
+
+    def report(self):
+        return {
+            "uptime_s": (self.clock() - self._started_ns) / 1e9,
+            "frame_budget_ms": FRAME_BUDGET_NS / 1e6,
+            "callbacks": {name: h.summary() for name, h in sorted(self.histograms.items()) if h.count},
+            "tick_jitter": dict(self.jitter.summary(), early=self.early_ticks),
+            "profile": self.profiler.report() if self.profiler is not None else None
+        }
+
+    def export_json(self, path, report=None):
+        """Write report() (or a report taken earlier, e.g. on another thread) to `path`"""
+        with open(path, 'w') as f:
+            json.dump(report if report is not None else self.report(), f, indent=4)
@@ -0,0 +1,86 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class IOService:
+    """
+    Runs blocking file work on background threads and hands the results
+    back to the Tk thread.
+
+    submit() queues a job on a small thread pool. Completion, error and
+    progress callbacks are not called on the worker: they are put on a
+    thread-safe queue that the Tk thread drains from a Scheduler job, so
+    they can touch widgets freely. The queue is only polled while jobs
+    are outstanding. With the default single worker, jobs run one at a
+    time in submission order, so writes to the same file never overlap.
+    """
+
+    POLL_MS = 15
+    JOB = "io_drain"
+
+    def __init__(self, scheduler, workers=1):
+        self.scheduler = scheduler
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="io")
+        self._results = queue.SimpleQueue()
+        self._pending = 0  # Only touched on the Tk thread
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def submit(self, func, *args, on_done=None, on_error=None, on_progress=None, **kwargs):
+        """
+        Run func(*args, **kwargs) on a worker. on_done(result) or
+        on_error(exception) follows on the Tk thread; errors without an
+        on_error are printed. If on_progress is given, func is also passed
+        progress=<callable> and each progress(value) reaches
+        on_progress(value) on the Tk thread.
+        """
+        if on_progress is not None:
+            kwargs["progress"] = lambda value: self._results.put((on_progress, value))
+
+        self._pending += 1
+        self._schedule_drain()
+        return self.executor.submit(self._run, func, args, kwargs, on_done, on_error)
+
+    def _run(self, func, args, kwargs, on_done, on_error):
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._results.put((on_error or self._report_error, e))
+        else:
+            self._results.put((on_done, result))
+        finally:
+            self._results.put((self._finished, None))
+
+    @staticmethod
+    def _report_error(e):
+        print(f"Background I/O failed: {str(e)}")
+
+    def _finished(self, _):
+        self._pending -= 1
+
+    def _schedule_drain(self):
+        if not self.scheduler.scheduled(self.JOB):
+            self.scheduler.call_later(self.JOB, self.POLL_MS / 1000, self.drain)
+
+    def drain(self):
+        """Run every queued callback on this (the Tk) thread"""
+        while True:
+            try:
+                callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if callback is not None:
+                try:
+                    callback(value)
+                except Exception as e:
+                    print(f"Error in I/O callback: {str(e)}")
+        if self._pending:
+            self._schedule_drain()
+
+    def shutdown(self):
+        """Finish queued jobs, then run their callbacks"""
+        self.executor.shutdown(wait=True)
+        self.drain()
+        self.scheduler.cancel(self.JOB)
@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Compact separators: templates and run state are read by code, not people
+JSON_SEPARATORS = (',', ':')
+
+
+def atomic_write_bytes(path, data):
+    """
+    Replace `path` with `data` so readers see either the old or the new
+    file, never a half-written one: write a temp file in the same
+    directory, fsync it, then rename it over the target.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Make the rename itself durable (not possible on Windows)
+    if os.name == 'posix':
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def dumps_json(data):
+    return json.dumps(data, separators=JSON_SEPARATORS).encode('utf-8')
+
+
+def atomic_write_json(path, data):
+    atomic_write_bytes(path, dumps_json(data))
+
+
+class DebouncedWriter:
+    """
+    Background thread that writes JSON files atomically, coalescing bursts.
+
+    schedule() only records the latest data for a path; the file is written
+    once no new data has arrived for `delay` seconds (or `max_delay` after
+    the first pending update, so a steady stream still gets saved). Data
+    must not be mutated after it is handed over.
+    """
+
+    def __init__(self, delay=0.5, max_delay=5.0, on_error=None):
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_error = on_error
+        self._pending = {}  # path -> [data, due, deadline, sequence]
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._sequence = 0
+        self._written = {}  # path -> sequence of the newest data on disk
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="DebouncedWriter", daemon=True)
+        self._thread.start()
+
+    def schedule(self, path, data):
+        now = time.monotonic()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("DebouncedWriter is closed")
+            self._sequence += 1
+            entry = self._pending.get(path)
+            if entry is None:
+                self._pending[path] = [data, now + self.delay, now + self.max_delay, self._sequence]
+            else:
+                entry[0] = data
+                entry[1] = min(now + self.delay, entry[2])
+                entry[3] = self._sequence
+            self._condition.notify()
+
+    def flush(self):
+        """Write everything pending now, on the calling thread"""
+        with self._condition:
+            pending = self._pending
+            self._pending = {}
+        for path, (data, _, _, sequence) in pending.items():
+            self._write(path, data, sequence)
+
+    def close(self):
+        """Flush pending writes and stop the background thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+
+    def _write(self, path, data, sequence):
+        with self._write_lock:
+            # A flush() may already have written newer data for this path
+            if sequence <= self._written.get(path, 0):
+                return
+            try:
+                atomic_write_json(path, data)
+                self._written[path] = sequence
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(path, e)
+                else:
+                    print(f"Error writing {path}: {str(e)}")
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    now = time.monotonic()
+                    due = [path for path, entry in self._pending.items() if entry[1] <= now]
+                    if due:
+                        break
+                    timeout = min((entry[1] for entry in self._pending.values()), default=None)
+                    self._condition.wait(None if timeout is None else timeout - now)
+                if self._closed:
+                    return
+                ready = [(path, self._pending.pop(path)) for path in due]
+
+            for path, (data, _, _, sequence) in ready:
+                self._write(path, data, sequence)
@@ -0,0 +1,207 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from split_table import SplitTable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_type TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    elapsed_time REAL
+);
+CREATE TABLE IF NOT EXISTS split_times (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    run_type TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    split_name TEXT NOT NULL,
+    split_time REAL,
+    segment_time REAL,
+    focus_time REAL,
+    is_gold INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_by_type_date ON runs (run_type, run_date);
+CREATE INDEX IF NOT EXISTS split_times_by_run ON split_times (run_id);
+CREATE INDEX IF NOT EXISTS split_times_by_name ON split_times (run_type, split_name, segment_time);
+"""
+
+# A segment that starts at the split before it: split times are stored only
+# for splits that were hit, so a gap in positions means a skipped split
+CLEAN_SEGMENT = (
+    "(split_times.position = 0 OR EXISTS (SELECT 1 FROM split_times AS previous "
+    "WHERE previous.run_id = split_times.run_id AND previous.position = split_times.position - 1))"
+)
+
+
+def percentile(sorted_values, pct):
+    """Linearly interpolated percentile (0-100) of an already sorted list"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class RunHistory:
+    """
+    Append-only SQLite store of every completed or reset run.
+
+    Rows are only ever inserted, never updated, so the full history of
+    each split stays queryable. Split rows carry their run type so the
+    per-split queries below are answered from the
+    (run_type, split_name, segment_time) index. A segment that follows a
+    skipped split spans both, so golds and the per-split statistics leave
+    it out (CLEAN_SEGMENT).
+    """
+
+    def __init__(self, db_path, check_same_thread=True):
+        self.db_path = db_path
+        # Pass check_same_thread=False to hand the connection to one worker thread
+        self.conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, run_type, splits, completed, elapsed_time=None, started_at=None):
+        """
+        Append a run. Only splits that have a segment time are stored.
+        A segment following a skipped split spans both, so it is never
+        marked as a gold. Returns the new run id.
+        """
+        if started_at is None:
+            started_at = datetime.now() - timedelta(seconds=elapsed_time or 0)
+
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (run_type, run_date, started_at, completed, elapsed_time) VALUES (?, ?, ?, ?, ?)",
+                (run_type, started_at.strftime('%Y-%m-%d'), started_at.isoformat(timespec='seconds'),
+                 int(bool(completed)), elapsed_time)
+            )
+            run_id = cursor.lastrowid
+
+            rows = []
+            golds = {}  # Best clean segment so far per split name
+            previous = None
+            for position, split in enumerate(splits):
+                clean = position == 0 or previous is not None
+                previous = split.segment_time
+                if split.segment_time is None:
+                    continue
+                if split.name not in golds:
+                    golds[split.name] = self._best_segment(run_type, split.name)
+                best = golds[split.name]
+                is_gold = clean and (best is None or split.segment_time < best)
+                if is_gold:
+                    golds[split.name] = split.segment_time
+                rows.append((run_id, run_type, position, split.name, split.split_time,
+                             split.segment_time, split.focus_time, int(is_gold)))
+
+            self.conn.executemany(
+                "INSERT INTO split_times (run_id, run_type, position, split_name, split_time, "
+                "segment_time, focus_time, is_gold) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return run_id
+
+    def _best_segment(self, run_type, split_name):
+        """Fastest clean segment recorded for a split: walks the name index upwards to the first clean row"""
+        row = self.conn.execute(
+            "SELECT segment_time FROM split_times WHERE run_type = ? AND split_name = ? "
+            "AND segment_time IS NOT NULL AND " + CLEAN_SEGMENT + " ORDER BY segment_time LIMIT 1",
+            (run_type, split_name)
+        ).fetchone()
+        return row[0] if row else None
+
+    def split_names(self, run_type):
+        """Split names seen for a run type, in template order"""
+        rows = self.conn.execute(
+            "SELECT split_name, MIN(position) AS first_position FROM split_times "
+            "WHERE run_type = ? GROUP BY split_name ORDER BY first_position",
+            (run_type,)
+        )
+        return [name for name, _ in rows]
+
+    def split_averages(self, run_type):
+        """Return {split name: (count, average segment, best segment)}"""
+        rows = self.conn.execute(
+            "SELECT split_name, COUNT(segment_time), AVG(segment_time), MIN(segment_time) "
+            "FROM split_times WHERE run_type = ? AND " + CLEAN_SEGMENT + " GROUP BY split_name",
+            (run_type,)
+        )
+        return {name: (count, average, best) for name, count, average, best in rows}
+
+    def segment_percentiles(self, run_type, split_name, percentiles=(10, 50, 90)):
+        """Return {pct: segment time} for one split"""
+        values = [value for (value,) in self.conn.execute(
+            "SELECT segment_time FROM split_times WHERE run_type = ? AND split_name = ? "
+            "AND segment_time IS NOT NULL AND " + CLEAN_SEGMENT + " ORDER BY segment_time",
+            (run_type, split_name)
+        )]
+        return {pct: percentile(values, pct) for pct in percentiles}
+
+    def sum_of_best(self, run_type):
+        """Sum of the best segment ever recorded for each split of a run type"""
+        (total,) = self.conn.execute(
+            "SELECT SUM(best) FROM (SELECT MIN(segment_time) AS best FROM split_times "
+            "WHERE run_type = ? AND " + CLEAN_SEGMENT + " GROUP BY split_name)",
+            (run_type,)
+        ).fetchone()
+        return total
+
+    def gold_history(self, run_type, split_name):
+        """Return [(started_at, segment time)] for each time the split's best was beaten"""
+        return self.conn.execute(
+            "SELECT runs.started_at, split_times.segment_time FROM split_times "
+            "JOIN runs ON runs.id = split_times.run_id "
+            "WHERE split_times.run_type = ? AND split_times.split_name = ? AND split_times.is_gold = 1 "
+            "ORDER BY runs.started_at, runs.id",
+            (run_type, split_name)
+        ).fetchall()
+
+    def iter_split_rows(self, run_type=None, clean=False):
+        """
+        Stream (run_id, run_type, started_at, completed, split_name, split_time,
+        segment_time, focus_time, is_gold) for every stored split, ordered by run.
+        With clean=True only completed runs are included, and a segment that
+        follows a skipped split comes back as None.
+        """
+        segment = f"CASE WHEN {CLEAN_SEGMENT} THEN split_times.segment_time END" if clean else "split_times.segment_time"
+        query = (
+            "SELECT runs.id, runs.run_type, runs.started_at, runs.completed, split_times.split_name, "
+            f"split_times.split_time, {segment}, split_times.focus_time, split_times.is_gold "
+            "FROM runs JOIN split_times ON split_times.run_id = runs.id WHERE 1 = 1"
+        )
+        params = []
+        if run_type is not None:
+            query += " AND runs.run_type = ?"
+            params.append(run_type)
+        if clean:
+            query += " AND runs.completed = 1"
+        cursor = self.conn.execute(query + " ORDER BY runs.id, split_times.position", params)
+        while True:
+            rows = cursor.fetchmany(1024)
+            if not rows:
+                return
+            yield from rows
+
+    def split_table(self, run_type=None, clean=False):
+        """Every stored split (optionally of one run type) as a columnar SplitTable; see iter_split_rows()"""
+        return SplitTable.from_rows(self.iter_split_rows(run_type, clean))
+
+    def runs(self, run_type=None, since=None, completed_only=False):
+        """Return [(id, run_type, run_date, started_at, completed, elapsed_time)] ordered by start"""
+        query = "SELECT id, run_type, run_date, started_at, completed, elapsed_time FROM runs WHERE 1 = 1"
+        params = []
+        if run_type is not None:
+            query += " AND run_type = ?"
+            params.append(run_type)
+        if since is not None:
+            query += " AND run_date >= ?"
+            params.append(since)
+        if completed_only:
+            query += " AND completed = 1"
+        return self.conn.execute(query + " ORDER BY started_at, id", params).fetchall()
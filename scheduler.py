@@ -0,0 +1,148 @@
+import math
+import time
+
+
+class Job:
+    __slots__ = ("name", "due_ns", "interval_ns", "callback")
+
+    def __init__(self, name, due_ns, interval_ns, callback):
+        self.name = name
+        self.due_ns = due_ns
+        self.interval_ns = interval_ns  # None for a one-shot job
+        self.callback = callback
+
+
+class Scheduler:
+    """
+    The one Tk `after` timer behind every periodic and one-shot job.
+
+    Jobs are registered by name, and registering a name again replaces
+    the old job, so a polling loop can't be started twice. Only the
+    earliest job is armed with root.after. Jobs falling due within
+    COALESCE_MS of it are run in the same wakeup (a few ms late rather
+    than ever early). Work queued with after_batch() during a wakeup,
+    such as redrawing the display, runs once after all the due jobs.
+    """
+
+    COALESCE_MS = 4
+
+    def __init__(self, root, clock=time.perf_counter_ns, instruments=None):
+        self.root = root
+        self.clock = clock
+        self.instruments = instruments
+        self._jobs = {}  # name -> Job
+        self._batch = {}  # name -> callback, run at the end of the wakeup
+        self._after_id = None
+        self._wake_ns = None
+        self._dispatching = False
+        if instruments is not None:
+            self._dispatch = instruments.wrap("scheduler_wakeup", self._dispatch)
+
+    def call_at(self, name, due_ns, callback):
+        """Run callback() once at clock reading `due_ns`"""
+        self._jobs[name] = Job(name, due_ns, None, callback)
+        self._arm()
+
+    def call_later(self, name, delay, callback):
+        """Run callback() once, `delay` seconds from now"""
+        self.call_at(name, self.clock() + round(delay * 1e9), callback)
+
+    def every(self, name, interval, callback, delay=None):
+        """Run callback() every `interval` seconds, first after `delay` (default: one interval)"""
+        interval_ns = round(interval * 1e9)
+        due_ns = self.clock() + (interval_ns if delay is None else round(delay * 1e9))
+        self._jobs[name] = Job(name, due_ns, interval_ns, callback)
+        self._arm()
+
+    def cancel(self, name):
+        if self._jobs.pop(name, None) is not None:
+            self._arm()
+
+    def scheduled(self, name):
+        return name in self._jobs
+
+    def after_batch(self, name, callback):
+        """
+        Run callback() once at the end of the current wakeup, however many
+        jobs ask for it. Outside a wakeup it runs on the next pass of the
+        Tk loop, so a burst of events also coalesces.
+        """
+        self._batch[name] = callback
+        self._arm()
+
+    def shutdown(self):
+        self._jobs.clear()
+        self._batch.clear()
+        self._arm()
+
+    def _next_wake(self):
+        if self._batch:
+            return self.clock()
+        if not self._jobs:
+            return None
+        dues = sorted(job.due_ns for job in self._jobs.values())
+        wake = dues[0]
+        # Stretch the wakeup to cover jobs due just after the first
+        for due in dues[1:]:
+            if due - dues[0] > self.COALESCE_MS * 1_000_000:
+                break
+            wake = due
+        return wake
+
+    def _arm(self):
+        if self._dispatching:
+            return  # Re-armed once the wakeup finishes
+        wake = self._next_wake()
+        if self._after_id is not None and (wake == self._wake_ns or self._batch and self._wake_ns <= wake):
+            return  # Already armed for then (or sooner, for batched work)
+
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+            if self.instruments is not None:
+                self.instruments.tick_cancelled()
+        self._wake_ns = wake
+        if wake is None:
+            return
+
+        delay_ms = max(0, math.ceil((wake - self.clock()) / 1_000_000))
+        self._after_id = self.root.after(delay_ms, self._dispatch)
+        if self.instruments is not None:
+            self.instruments.tick_scheduled(delay_ms)
+
+    def _dispatch(self):
+        self._after_id = None
+        self._wake_ns = None
+        if self.instruments is not None:
+            self.instruments.tick_fired()
+
+        self._dispatching = True
+        try:
+            now = self.clock()
+            for job in sorted((job for job in self._jobs.values() if job.due_ns <= now),
+                              key=lambda job: job.due_ns):
+                if self._jobs.get(job.name) is not job:
+                    continue  # Cancelled or replaced by an earlier job in this wakeup
+                if job.interval_ns is None:
+                    del self._jobs[job.name]
+                else:
+                    # A late wakeup doesn't bunch up the missed runs
+                    job.due_ns += job.interval_ns
+                    if job.due_ns <= now:
+                        job.due_ns = now + job.interval_ns
+                self._run(job.name, job.callback)
+
+            while self._batch:
+                batch, self._batch = self._batch, {}
+                for name, callback in batch.items():
+                    self._run(name, callback)
+        finally:
+            self._dispatching = False
+            self._arm()
+
+    @staticmethod
+    def _run(name, callback):
+        try:
+            callback()
+        except Exception as e:
+            print(f"Error in scheduled job {name}: {str(e)}")
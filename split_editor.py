@@ -0,0 +1,255 @@
+"""
+Model behind the Edit Splits window, plus bulk split list parsing.
+
+The editor works on SplitEditorModel rather than on formatted cell
+text: times stay floats (full precision) until a cell is actually
+edited, each row remembers the Split it came from, and only rows that
+changed are written back on apply. parse_split_list() reads pasted or
+imported CSV, TSV or LiveSplit .lss XML in a single pass.
+"""
+import csv
+import io
+import itertools
+import xml.etree.ElementTree as ET
+
+from time_codec import format_duration, parse_duration, parse_durations
+from timer_engine import Split
+
+TIME_FIELDS = ("split_time", "segment_time", "best_segment")
+FIELDS = ("name",) + TIME_FIELDS
+
+# Header spellings accepted in CSV/TSV imports (lower case) -> field
+HEADER_ALIASES = {
+    "name": "name", "split": "name", "split name": "name", "segment": "name",
+    "split time": "split_time", "time": "split_time",
+    "segment time": "segment_time",
+    "best segment": "best_segment", "best": "best_segment",
+    "pb": "pb_split", "pb split": "pb_split", "personal best": "pb_split"
+}
+
+
+class EditorRow:
+    """One row of the editor; `source` is the Split it was loaded from (None if new)"""
+
+    __slots__ = ("iid", "source", "name", "split_time", "segment_time", "best_segment", "pb_split", "dirty")
+
+    _ids = itertools.count()
+
+    def __init__(self, source=None, name="", split_time=None, segment_time=None, best_segment=None, pb_split=None):
+        self.iid = f"edit_{next(EditorRow._ids)}"
+        self.source = source
+        if source is not None:
+            name, split_time = source.name, source.split_time
+            segment_time, best_segment, pb_split = source.segment_time, source.best_segment, source.pb_split
+        self.name = name
+        self.split_time = split_time
+        self.segment_time = segment_time
+        self.best_segment = best_segment
+        self.pb_split = pb_split
+        self.dirty = source is None
+
+    def values(self):
+        """Cell text for the editor Treeview (milliseconds shown only when there are any)"""
+        def cell(seconds):
+            if seconds is None:
+                return ""
+            return format_duration(seconds, 3 if seconds % 1 else 0)
+        return (self.name,) + tuple(cell(getattr(self, field)) for field in TIME_FIELDS)
+
+
+class SplitEditorModel:
+    """Editable copy of a split list with dirty tracking"""
+
+    def __init__(self, splits):
+        self.rows = [EditorRow(split) for split in splits]
+        self._original = list(splits)
+        self._by_iid = {row.iid: row for row in self.rows}
+
+    def row(self, iid):
+        return self._by_iid[iid]
+
+    def index(self, iid):
+        return self.rows.index(self._by_iid[iid])
+
+    @property
+    def structure_changed(self):
+        return [row.source for row in self.rows] != self._original
+
+    @property
+    def dirty(self):
+        return self.structure_changed or any(row.dirty for row in self.rows)
+
+    def set_value(self, iid, field, text):
+        """Set a cell from user text; raises ValueError for a bad time. Returns True if it changed"""
+        row = self._by_iid[iid]
+        if field == "name":
+            value = text.strip()
+            if not value:
+                raise ValueError("Split name can't be empty")
+        else:
+            value = parse_duration(text)
+            old = getattr(row, field)
+            # Retyping what's shown mustn't lose the hidden precision
+            if old is not None and value is not None and row.values()[FIELDS.index(field)] == str(text).strip():
+                return False
+        if getattr(row, field) == value:
+            return False
+        setattr(row, field, value)
+        row.dirty = True
+        return True
+
+    def insert(self, records, index=None):
+        """Insert rows built from dicts of field values (as from parse_split_list); returns the new rows"""
+        new_rows = [EditorRow(None, **record) for record in records]
+        if index is None:
+            index = len(self.rows)
+        self.rows[index:index] = new_rows
+        self._by_iid.update((row.iid, row) for row in new_rows)
+        return new_rows
+
+    def delete(self, iids):
+        doomed = set(iids)
+        self.rows = [row for row in self.rows if row.iid not in doomed]
+        for iid in doomed:
+            self._by_iid.pop(iid, None)
+
+    def move(self, iids, offset):
+        """Move the given rows up (-1) or down (+1) one place, keeping their order"""
+        selected = set(iids)
+        indexes = [i for i, row in enumerate(self.rows) if row.iid in selected]
+        for i in (indexes if offset < 0 else reversed(indexes)):
+            j = i + offset
+            if 0 <= j < len(self.rows) and self.rows[j].iid not in selected:
+                self.rows[i], self.rows[j] = self.rows[j], self.rows[i]
+
+    def apply(self, engine):
+        """
+        Write the edits into the engine. Changed rows update their Split in
+        place, so focus data, groups and row ids survive. Only a structural
+        change (rows added, deleted or moved) replaces the split list,
+        which the engine only allows between runs: raises ValueError once
+        a run has got past its first split. The split and segment times of
+        splits already hit in an unfinished run are the run's own record,
+        so changing those raises ValueError too. Returns the number of rows
+        written.
+        """
+        if self.structure_changed and engine.current_split_index > 0:
+            raise ValueError("Reset the run before adding, deleting or moving splits")
+        if not engine.is_finished:
+            for row in self.rows[:engine.current_split_index]:
+                if row.dirty and (row.split_time, row.segment_time) != (row.source.split_time, row.source.segment_time):
+                    raise ValueError(f"Reset the run before changing the times of completed split {row.source.name!r}")
+
+        changed = 0
+        splits = []
+        for row in self.rows:
+            split = row.source if row.source is not None else Split(row.name)
+            if row.dirty:
+                split.name = row.name
+                split.split_time = row.split_time
+                split.segment_time = row.segment_time
+                split.best_segment = row.best_segment
+                split.pb_split = row.pb_split
+                row.dirty = False
+                changed += 1
+            row.source = split
+            splits.append(split)
+
+        if splits != self._original:
+            engine.set_splits(splits)
+        elif changed:
+            engine.splits_edited()
+        self._original = splits
+        return changed
+
+
+# Bulk import
+
+def parse_split_list(text):
+    """
+    Split records from pasted or imported text. LiveSplit .lss XML is
+    recognised by its leading '<'; anything else is read as CSV, or TSV
+    if the first line has a tab. A header row (e.g. "Split Name, Best
+    Segment") maps columns by name, and rows above it are skipped, so
+    files from Export Times to CSV import as is. Without a header the
+    columns are name, split time, segment time, best segment; a plain
+    list of names works too. Raises ValueError naming the bad line.
+    """
+    stripped = text.lstrip()
+    if stripped.startswith("<"):
+        return parse_livesplit(stripped)
+
+    first_line = stripped.split("\n", 1)[0]
+    delimiter = "\t" if "\t" in first_line else ","
+    rows = list(csv.reader(io.StringIO(text), delimiter=delimiter))
+
+    columns = list(FIELDS)
+    start = 0
+    for line_number, row in enumerate(rows[:20]):
+        fields = [HEADER_ALIASES.get(cell.strip().lower()) for cell in row]
+        if "name" in fields:
+            columns, start = fields, line_number + 1
+            break
+
+    # Collect each time column's cells, then parse every column in one go
+    records = []
+    line_numbers = []
+    cells = {}  # field -> [(record index, cell text)]
+    for line_number, row in enumerate(rows[start:], start + 1):
+        if not any(cell.strip() for cell in row):
+            continue
+        record = {}
+        for field, cell in zip(columns, row):
+            if field == "name":
+                record["name"] = cell.strip()
+            elif field is not None:
+                cells.setdefault(field, []).append((len(records), cell))
+        if not record.get("name"):
+            raise ValueError(f"Line {line_number}: missing split name")
+        records.append(record)
+        line_numbers.append(line_number)
+
+    for field, column in cells.items():
+        texts = [cell for _, cell in column]
+        try:
+            values = parse_durations(texts)
+        except ValueError:
+            # Find the offending cell to name its line
+            for (index, cell), value in zip(column, parse_durations(texts, errors="coerce")):
+                if value is None and cell.strip():
+                    try:
+                        parse_duration(cell)
+                    except ValueError as e:
+                        raise ValueError(f"Line {line_numbers[index]}: {str(e)}")
+            raise
+        for (index, _), value in zip(column, values):
+            records[index][field] = value
+    return records
+
+
+def parse_livesplit(text):
+    """Split records from a LiveSplit .lss file: names, gold segments and PB split times"""
+    try:
+        root = ET.fromstring(text)
+    except ET.ParseError as e:
+        raise ValueError(f"Not a LiveSplit file: {str(e)}")
+
+    def real_time(element):
+        if element is None:
+            return None
+        real = element.find("RealTime")
+        return parse_duration(real.text) if real is not None and real.text else None
+
+    records = []
+    for segment in root.iter("Segment"):
+        name = (segment.findtext("Name") or "").strip()
+        pb = None
+        for split_time in segment.iter("SplitTime"):
+            if split_time.get("name") == "Personal Best":
+                pb = real_time(split_time)
+        records.append({"name": name or f"Split {len(records) + 1}",
+                        "best_segment": real_time(segment.find("BestSegmentTime")),
+                        "pb_split": pb})
+    if not records:
+        raise ValueError("No segments found in the LiveSplit file")
+    return records
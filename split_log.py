@@ -0,0 +1,234 @@
+import json
+import os
+import threading
+import time
+
+
+class SplitLog:
+    """
+    Write-ahead log of the current run, one compact JSON line per event.
+
+    Every start, split, undo, skip, stop and finish is appended with a single
+    os.write() before anything else happens, so the record survives the
+    process dying straight afterwards. fsync (needed to also survive a
+    power cut) costs milliseconds, so by default it is done by a
+    background thread shortly after each append (group commit) rather
+    than on the split hot path; pass sync=True to fsync inline.
+
+    A reset truncates the log, so it only ever holds the run in progress.
+    replay() turns it back into timer state.
+    """
+
+    SYNC_DELAY = 0.05  # Seconds to batch appends before the background fsync
+
+    def __init__(self, path, sync=False):
+        self.path = path
+        self.sync = sync
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.has_header = os.fstat(self.fd).st_size > 0
+        self.get_run_type = lambda: None
+        self.engine = None
+
+        self._dirty = threading.Event()
+        self._closed = False
+        self._lock = threading.Lock()
+        if not sync:
+            self._syncer = threading.Thread(target=self._sync_loop, name="SplitLogSync", daemon=True)
+            self._syncer.start()
+
+    def append(self, record):
+        data = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self._lock:
+            os.write(self.fd, data)
+        if self.sync:
+            os.fsync(self.fd)
+        else:
+            self._dirty.set()
+
+    def truncate(self):
+        with self._lock:
+            os.ftruncate(self.fd, 0)
+            self.has_header = False
+        self._dirty.set()
+
+    def close(self):
+        self._closed = True
+        self._dirty.set()
+        if not self.sync:
+            self._syncer.join()
+        os.fsync(self.fd)
+        os.close(self.fd)
+
+    def _sync_loop(self):
+        while not self._closed:
+            self._dirty.wait()
+            if self._closed:
+                return
+            time.sleep(self.SYNC_DELAY)
+            self._dirty.clear()
+            with self._lock:
+                os.fsync(self.fd)
+
+    # Engine wiring
+
+    def attach(self, engine, get_run_type):
+        """Log an engine's events; get_run_type() names the run in the header"""
+        self.engine = engine
+        self.get_run_type = get_run_type
+        engine.subscribe("started", self.on_started)
+        engine.subscribe("split", self.on_split)
+        engine.subscribe("undo", self.on_undo)
+        engine.subscribe("skip", self.on_skip)
+        engine.subscribe("stopped", self.on_stopped)
+        engine.subscribe("finished", self.on_finished)
+        engine.subscribe("reset", self.truncate)
+
+    def _ensure_header(self):
+        if self.has_header:
+            return
+        self.append({
+            "ev": "run",
+            "run_type": self.get_run_type(),
+            "splits": [split.name for split in self.engine.splits],
+            "best": self.engine.prior_bests()
+        })
+        self.has_header = True
+
+    def rewrite(self):
+        """Replace the log with the engine's current run, e.g. after a saved run is loaded"""
+        engine = self.engine
+        self.truncate()
+        if engine.current_split_index == 0 and not engine.elapsed_ns:
+            return
+        self._ensure_header()
+        for index, split in enumerate(engine.splits[:engine.current_split_index]):
+            if split.split_time is None:
+                self.on_skip(index, split)
+            else:
+                self.on_split(index, split)
+        self.on_stopped()
+        if engine.is_finished:
+            self.on_finished()
+
+    def on_started(self):
+        self._ensure_header()
+        self.append({
+            "ev": "start",
+            "e": self.engine.elapsed_time,
+            "i": self.engine.current_split_index,
+            "wall": time.time()
+        })
+
+    def on_split(self, index, split):
+        self._ensure_header()
+        self.append({
+            "ev": "split",
+            "i": index,
+            "t": split.split_time,
+            "seg": split.segment_time,
+            "focus": split.focus_time
+        })
+
+    def on_undo(self, index, split):
+        self.append({"ev": "undo", "i": index})
+
+    def on_skip(self, index, split):
+        self._ensure_header()
+        self.append({"ev": "skip", "i": index})
+
+    def on_stopped(self):
+        if not self.has_header:
+            return
+        current_split = self.engine.current_split
+        self.append({
+            "ev": "stop",
+            "e": self.engine.elapsed_time,
+            "focus": current_split.focus_time if current_split is not None else 0
+        })
+
+    def on_finished(self):
+        self.append({"ev": "finish"})
+
+
+def replay(path, now=None):
+    """
+    Rebuild the run recorded in a split log. Returns None if there is no
+    run, otherwise a dict with run_type, names, best (bests from before
+    the run; empty if unknown), splits (index ->
+    (split_time, segment_time, focus_time), None times for a skipped
+    split), current_split_index,
+    last_split_time, elapsed_time, current_focus_time, is_running and
+    finished. A run that was running when the log ends is assumed to
+    have kept running, so its elapsed time is advanced to `now`.
+    """
+    try:
+        with open(path, 'rb') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+
+    state = None
+    start_wall = None
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            break  # Torn final write
+
+        event = record.get("ev")
+        if event == "run":
+            state = {
+                "run_type": record.get("run_type"),
+                "names": record.get("splits", []),
+                "best": record.get("best", []),
+                "splits": {},
+                "current_split_index": 0,
+                "last_split_time": 0,
+                "elapsed_time": 0,
+                "current_focus_time": 0,
+                "is_running": False,
+                "finished": False
+            }
+        elif state is None:
+            continue
+        elif event == "start":
+            if record["i"] == 0 and not record["e"] and (state["splits"] or state["finished"]):
+                # A new run appended to an old one's log: start over (its bests are the current ones)
+                state.update(splits={}, best=[], last_split_time=0, current_focus_time=0, finished=False)
+            state["is_running"] = True
+            state["elapsed_time"] = record["e"]
+            state["current_split_index"] = record["i"]
+            start_wall = (record["wall"], record["e"])
+        elif event == "split":
+            state["splits"][record["i"]] = (record["t"], record["seg"], record.get("focus", 0))
+            state["current_split_index"] = record["i"] + 1
+            state["last_split_time"] = record["t"]
+            state["elapsed_time"] = record["t"]
+            state["current_focus_time"] = 0
+        elif event == "skip":
+            state["splits"][record["i"]] = (None, None, 0)
+            state["current_split_index"] = record["i"] + 1
+            state["current_focus_time"] = 0
+        elif event == "undo":
+            index = record["i"]
+            state["splits"].pop(index, None)
+            state["current_split_index"] = index
+            state["last_split_time"] = max(
+                (t for i, (t, _, _) in state["splits"].items() if i < index and t is not None), default=0
+            )
+            state["current_focus_time"] = 0
+            state["finished"] = False
+        elif event == "stop":
+            state["is_running"] = False
+            state["elapsed_time"] = record["e"]
+            state["current_focus_time"] = record.get("focus", 0)
+        elif event == "finish":
+            state["finished"] = True
+            state["is_running"] = False
+
+    if state is not None and state["is_running"] and start_wall is not None:
+        wall, elapsed = start_wall
+        if now is None:
+            now = time.time()
+        state["elapsed_time"] = max(state["elapsed_time"], elapsed + (now - wall))
+    return state
@@ -0,0 +1,175 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+from time_codec import NAN
+from timer_engine import Split
+
+
+def _pack(value):
+    return NAN if value is None else value
+
+
+def _unpack(value):
+    return None if value != value else value
+
+
+class SplitTable:
+    """
+    Many split records stored as columns instead of Split objects.
+
+    Each record is a run id, an interned split name and five float64
+    columns (split, segment, best segment, PB split and focus time) held
+    in stdlib arrays, with NaN standing in for None: about 54 bytes per
+    record against 250-300 as Split objects (benchmarks/bench_memory.py). Rows
+    are read through SplitView, which looks like a read-only Split, and
+    as_numpy() wraps a column as a NumPy array without copying.
+
+    Records are expected to be appended grouped by run, in run id order
+    (as RunHistory.iter_split_rows() yields them), so run() can bisect.
+    """
+
+    FLOAT_COLUMNS = ("split_time", "segment_time", "best_segment", "pb_split", "focus_time")
+
+    def __init__(self):
+        self.names = []  # Distinct split names; name_codes index into this
+        self._name_codes = {}
+        self.run_ids = array('q')
+        self.name_codes = array('i')
+        self.split_time = array('d')
+        self.segment_time = array('d')
+        self.best_segment = array('d')
+        self.pb_split = array('d')
+        self.focus_time = array('d')
+        self.is_gold = array('b')
+
+    @classmethod
+    def from_rows(cls, split_rows):
+        """Build from RunHistory.iter_split_rows() tuples"""
+        table = cls()
+        for run_id, _, _, _, name, split_time, segment_time, focus_time, is_gold in split_rows:
+            table.append(run_id, name, split_time, segment_time, focus_time=focus_time, is_gold=is_gold)
+        return table
+
+    @classmethod
+    def from_splits(cls, splits, run_id=0):
+        table = cls()
+        table.extend(run_id, splits)
+        return table
+
+    def _code(self, name):
+        code = self._name_codes.get(name)
+        if code is None:
+            code = self._name_codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def name_code(self, name):
+        """Code of a split name in name_codes, or None if the table doesn't have it"""
+        return self._name_codes.get(name)
+
+    def append(self, run_id, name, split_time=None, segment_time=None, best_segment=None,
+               pb_split=None, focus_time=0, is_gold=False):
+        self.run_ids.append(run_id)
+        self.name_codes.append(self._code(name))
+        self.split_time.append(_pack(split_time))
+        self.segment_time.append(_pack(segment_time))
+        self.best_segment.append(_pack(best_segment))
+        self.pb_split.append(_pack(pb_split))
+        self.focus_time.append(focus_time or 0.0)
+        self.is_gold.append(bool(is_gold))
+
+    def extend(self, run_id, splits):
+        """Append every split of one run (Split objects or views)"""
+        for split in splits:
+            self.append(run_id, split.name, split.split_time, split.segment_time,
+                        split.best_segment, split.pb_split, split.focus_time)
+
+    def __len__(self):
+        return len(self.run_ids)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("split table index out of range")
+        return SplitView(self, index)
+
+    def __iter__(self):
+        return (SplitView(self, index) for index in range(len(self)))
+
+    def run(self, run_id):
+        """Views of one run's splits, in order"""
+        start = bisect_left(self.run_ids, run_id)
+        end = bisect_right(self.run_ids, run_id, start)
+        return [SplitView(self, index) for index in range(start, end)]
+
+    def run_ids_unique(self):
+        """Distinct run ids, in table order"""
+        return list(dict.fromkeys(self.run_ids))
+
+    @property
+    def nbytes(self):
+        """Bytes held by the column buffers (names excluded)"""
+        columns = [self.run_ids, self.name_codes, self.is_gold] + [getattr(self, c) for c in self.FLOAT_COLUMNS]
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def as_numpy(self, column):
+        """Zero-copy NumPy view of a column (needs numpy); NaN marks missing times"""
+        import numpy as np
+        data = getattr(self, column)
+        return np.frombuffer(data, dtype=data.typecode) if len(data) else np.array([], dtype=data.typecode)
+
+
+class SplitView:
+    """Read-only, Split-shaped view of one SplitTable row"""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def run_id(self):
+        return self.table.run_ids[self.index]
+
+    @property
+    def name(self):
+        return self.table.names[self.table.name_codes[self.index]]
+
+    @property
+    def split_time(self):
+        return _unpack(self.table.split_time[self.index])
+
+    @property
+    def segment_time(self):
+        return _unpack(self.table.segment_time[self.index])
+
+    @property
+    def best_segment(self):
+        return _unpack(self.table.best_segment[self.index])
+
+    @property
+    def pb_split(self):
+        return _unpack(self.table.pb_split[self.index])
+
+    @property
+    def focus_time(self):
+        return self.table.focus_time[self.index]
+
+    @property
+    def is_gold(self):
+        return bool(self.table.is_gold[self.index])
+
+    def to_split(self):
+        """A detached, editable Split with this row's times"""
+        split = Split(self.name)
+        split.split_time = self.split_time
+        split.segment_time = self.segment_time
+        split.best_segment = self.best_segment
+        split.pb_split = self.pb_split
+        split.focus_time = self.focus_time
+        return split
+
+    def __repr__(self):
+        return f"SplitView({self.name!r}, split_time={self.split_time}, segment_time={self.segment_time})"
@@ -0,0 +1,86 @@
+import csv
+import io
+import os
+from datetime import date, datetime
+
+
+class SleepStatsStore:
+    """
+    Date-keyed, cached view of speedrun_stats.csv.
+
+    The file is parsed once into a dict of Date -> row. Every lookup
+    revalidates against the file's mtime and size: an unchanged file is a
+    plain dict hit, a file that only had rows appended is parsed from the
+    previous end offset, and anything else triggers a full reload.
+    """
+
+    # Bytes before the previous end-of-file that must be unchanged for an
+    # append-only reload to be trusted
+    ANCHOR_SIZE = 64
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.rows = {}
+        self.fieldnames = None
+        self._mtime_ns = None
+        self._size = 0
+        self._anchor = b""
+
+    def refresh(self):
+        """Bring the index up to date with the file on disk"""
+        stat = os.stat(self.csv_path)
+        if stat.st_mtime_ns == self._mtime_ns and stat.st_size == self._size:
+            return
+
+        with open(self.csv_path, 'rb') as f:
+            if self.fieldnames and stat.st_size > self._size and self._anchor_matches(f):
+                f.seek(self._size)
+                data = f.read()
+                # Leave a half-written trailing row for the next refresh
+                data = data[:data.rfind(b'\n') + 1]
+                self._index(data, header=False)
+                self._size += len(data)
+            else:
+                self.rows = {}
+                self.fieldnames = None
+                f.seek(0)  # The anchor check may have moved the file position
+                data = f.read()
+                self._index(data, header=True)
+                self._size = len(data)
+
+            f.seek(max(0, self._size - self.ANCHOR_SIZE))
+            self._anchor = f.read(self.ANCHOR_SIZE)
+        self._mtime_ns = stat.st_mtime_ns
+
+    def _anchor_matches(self, f):
+        f.seek(max(0, self._size - self.ANCHOR_SIZE))
+        return f.read(len(self._anchor)) == self._anchor
+
+    def _index(self, data, header):
+        text = io.StringIO(data.decode('utf-8-sig'), newline='')
+        if header:
+            reader = csv.DictReader(text)
+            rows = reader
+            self.fieldnames = reader.fieldnames
+        else:
+            rows = csv.DictReader(text, fieldnames=self.fieldnames)
+
+        for row in rows:
+            # Keep the first row per date, as the old df[df['Date'] == today].iloc[0] did
+            self.rows.setdefault(row.get('Date'), row)
+
+    def get(self, day=None):
+        """Return the stats row for `day` (a date or 'YYYY-MM-DD', default today), or None"""
+        self.refresh()
+        if day is None:
+            day = date.today()
+        if isinstance(day, date):
+            day = day.strftime('%Y-%m-%d')
+        return self.rows.get(day)
+
+    def wake_time(self, day=None):
+        """Return the wake time for `day` as a datetime.time, or None if there is no row"""
+        row = self.get(day)
+        if not row or not row.get('Wake Time'):
+            return None
+        return datetime.strptime(row['Wake Time'], '%I:%M %p').time()
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from persistence import atomic_write_bytes, atomic_write_json, dumps_json
+
+# Characters Windows won't allow in a file name (this also covers both path separators)
+INVALID_NAME_CHARS = set('<>:"/\\|?*') | {chr(code) for code in range(32)}
+RESERVED_NAMES = {"CON", "PRN", "AUX", "NUL"} | {f"{port}{n}" for port in ("COM", "LPT") for n in range(1, 10)}
+
+
+def _locked(method):
+    """Serialise a TemplateLibrary method, so imports can run on an I/O thread"""
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class TemplateLibrary:
+    """
+    Directory of run templates, one JSON file per template, plus a manifest.
+
+    The manifest records name, split count, mtime, size and content hash
+    for every template, so listing the library never parses a template.
+    It is revalidated with a directory scan (stat only); only files that
+    changed on disk are re-read. Parsed templates are kept in a small
+    LRU cache keyed by name and checked against the manifest entry.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory, cache_size=8):
+        self.directory = directory
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # name -> (hash, template data)
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._read_manifest()
+        self.refresh()
+
+    def _path(self, name):
+        check_template_name(name)
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.directory, self.MANIFEST), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_manifest(self):
+        atomic_write_json(os.path.join(self.directory, self.MANIFEST), self.manifest)
+
+    def _index(self, name, data, stat):
+        template = json.loads(data)
+        self.manifest[name] = {
+            "splits": len(template_splits(template)),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": hashlib.sha1(data).hexdigest()
+        }
+        return template
+
+    @_locked
+    def refresh(self):
+        """Bring the manifest up to date with the directory, parsing only changed files"""
+        changed = False
+        seen = set()
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.json') or entry.name == self.MANIFEST or not entry.is_file():
+                continue
+            name = entry.name[:-len('.json')]
+            seen.add(name)
+            stat = entry.stat()
+            known = self.manifest.get(name)
+            if known and known["mtime_ns"] == stat.st_mtime_ns and known["size"] == stat.st_size:
+                continue
+            try:
+                with open(entry.path, 'rb') as f:
+                    self._index(name, f.read(), stat)
+                changed = True
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable template {entry.name}: {str(e)}")
+
+        for name in [name for name in self.manifest if name not in seen]:
+            del self.manifest[name]
+            self._cache.pop(name, None)
+            changed = True
+
+        if changed:
+            self._write_manifest()
+
+    @_locked
+    def names(self):
+        return sorted(self.manifest)
+
+    @_locked
+    def entries(self):
+        """Manifest entries as (name, info) pairs, sorted by name"""
+        return [(name, self.manifest[name]) for name in self.names()]
+
+    @_locked
+    def __contains__(self, name):
+        return name in self.manifest
+
+    @_locked
+    def load(self, name):
+        """Parsed template data for `name`; raises KeyError if it isn't in the library"""
+        info = self.manifest[name]
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == info["hash"]:
+            self._cache.move_to_end(name)
+            return cached[1]
+
+        path = self._path(name)
+        with open(path, 'rb') as f:
+            data = f.read()
+        stat = os.stat(path)
+        if stat.st_mtime_ns != info["mtime_ns"] or stat.st_size != info["size"]:
+            template = self._index(name, data, stat)
+            self._write_manifest()
+        else:
+            template = json.loads(data)
+        self._remember(name, self.manifest[name]["hash"], template)
+        return template
+
+    @_locked
+    def save(self, name, template):
+        """Write a template into the library and update its manifest entry"""
+        path = self._path(name)
+        data = dumps_json(template)
+        atomic_write_bytes(path, data)
+        stat = os.stat(path)
+        self.manifest[name] = {
+            "splits": len(template_splits(template)),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": hashlib.sha1(data).hexdigest()
+        }
+        self._write_manifest()
+        self._remember(name, self.manifest[name]["hash"], template)
+
+    @_locked
+    def delete(self, name):
+        os.remove(self._path(name))
+        self.manifest.pop(name, None)
+        self._cache.pop(name, None)
+        self._write_manifest()
+
+    @_locked
+    def import_file(self, file_path, name=None):
+        """Copy a template file into the library (named after the file by default)"""
+        with open(file_path, 'r') as f:
+            template = json.load(f)
+        if name is None:
+            name = os.path.splitext(os.path.basename(file_path))[0]
+        self.save(name, template)
+        return name
+
+    @_locked
+    def migrate_legacy(self, legacy_path):
+        """One-off import of templates from the old single run_templates.json"""
+        try:
+            with open(legacy_path, 'r') as f:
+                legacy = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+        migrated = 0
+        for name, split_names in legacy.items():
+            if name not in self.manifest:
+                try:
+                    self.save(name, {"Current_Template": {"splits": [{"name": n, "best_segment": None} for n in split_names]}})
+                except ValueError as e:
+                    print(f"Skipping legacy template: {str(e)}")
+                    continue
+                migrated += 1
+        return migrated
+
+    def _remember(self, name, content_hash, template):
+        self._cache[name] = (content_hash, template)
+        self._cache.move_to_end(name)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def check_template_name(name):
+    """Raise ValueError unless `name` is usable as a template file name on every platform"""
+    if not name or not name.strip():
+        raise ValueError("Template name is empty")
+    if any(char in INVALID_NAME_CHARS for char in name):
+        raise ValueError(f"Template name {name!r} contains a character that isn't allowed in file names")
+    if name in (".", "..") or name.endswith((".", " ")):
+        raise ValueError(f"Template name {name!r} can't end with a dot or a space")
+    if name.split(".")[0].upper() in RESERVED_NAMES:
+        raise ValueError(f"Template name {name!r} is reserved on Windows")
+    if name + ".json" == TemplateLibrary.MANIFEST:
+        raise ValueError(f"Template name {name!r} is used by the library itself")
+
+
+def template_splits(template):
+    """Split entries of a template in either the current or the old list-of-names format"""
+    if not isinstance(template, dict):
+        return []
+    template_data = template.get("Current_Template", {})
+    if isinstance(template_data, dict):
+        return template_data.get("splits", [])
+    return [{"name": name} for name in template_data]
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from analytics import RunAnalytics, SegmentColumns, grouped_regression, rolling_mean, rolling_mean_by_date
+from run_history import RunHistory
+from timer_engine import Split
+
+
+def split(name, segment_time, split_time=None):
+    result = Split(name)
+    result.segment_time = segment_time
+    result.split_time = split_time
+    return result
+
+
+@pytest.fixture
+def history():
+    history = RunHistory(":memory:")
+    yield history
+    history.close()
+
+
+def test_reset_runs_are_left_out(history):
+    history.record_run("day", [split("A", 10, 10), split("B", 20, 30)], True, 30,
+                       started_at=datetime(2024, 1, 1, 8))
+    history.record_run("day", [split("A", 1, 1)], False, 2, started_at=datetime(2024, 1, 2, 8))
+
+    run_ids, dates, totals = SegmentColumns.from_history(history, "day").run_totals()
+    assert len(run_ids) == 1
+    assert list(dates) == [np.datetime64('2024-01-01')]
+    assert list(totals) == [30.0]
+
+
+def test_segment_after_a_skip_is_left_out(history):
+    history.record_run("day", [split("A", 10, 10), split("B", None), split("C", 25, 35)], True, 35,
+                       started_at=datetime(2024, 1, 1, 8))
+
+    segments = SegmentColumns.from_history(history, "day")
+    assert segments.split_names == ["A", "C"]
+    assert np.isnan(segments.segment_times[1])
+    assert list(segments.run_totals()[2]) == [35.0]  # The run time still counts the merged segment
+
+
+def test_segment_trend_skips_merged_segments(history, tmp_path):
+    history.record_run("day", [split("A", 10, 10), split("B", 5, 15)], True, 15, started_at=datetime(2024, 1, 1, 8))
+    history.record_run("day", [split("A", None), split("B", 14, 14)], True, 14, started_at=datetime(2024, 1, 2, 8))
+    history.record_run("day", [split("A", 9, 9), split("B", 7, 16)], True, 16, started_at=datetime(2024, 1, 3, 8))
+    sleep_csv = tmp_path / "sleep.csv"
+    sleep_csv.write_text("Date,Sleep Duration\n2024-01-01,7\n2024-01-03,8\n")
+
+    dates, times, means = RunAnalytics(history, sleep_csv).segment_trend("day", "B", window=2)
+    assert list(dates) == [np.datetime64('2024-01-01'), np.datetime64('2024-01-03')]
+    assert list(times) == [5.0, 7.0]
+    assert list(means) == [5.0, 6.0]
+
+
+def test_grouped_regression_ignores_nan_pairs():
+    groups = np.array([0, 0, 0, 1, 1])
+    x = np.array([1.0, 2.0, 3.0, 1.0, np.nan])
+    y = np.array([2.0, 4.0, 6.0, 5.0, 5.0])
+    n, r, slope = grouped_regression(groups, x, y, 2)
+    assert list(n) == [3, 1]
+    assert r[0] == pytest.approx(1.0)
+    assert slope[0] == pytest.approx(2.0)
+
+
+def test_rolling_means_skip_nans_and_date_gaps():
+    assert list(rolling_mean(np.array([1.0, np.nan, 3.0, 5.0]), 2)) == [1.0, 1.0, 3.0, 4.0]
+
+    dates = np.array(['2024-01-01', '2024-01-02', '2024-01-10'], dtype='datetime64[D]')
+    assert list(rolling_mean_by_date(dates, np.array([2.0, 4.0, 9.0]), 7)) == [2.0, 3.0, 9.0]
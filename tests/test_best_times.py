@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from best_times import BestTimesIndex, best_times_from_history
+from split_table import SplitTable
+from timer_engine import Split, TimerEngine
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return str(tmp_path / "best_times.jsonl")
+
+
+def journal_lines(path):
+    with open(path, 'rb') as f:
+        return [json.loads(line) for line in f]
+
+
+def attached(path, engine, run_type="day"):
+    index = BestTimesIndex(path)
+    index.attach(engine, lambda: run_type)
+    return index
+
+
+def test_golds_are_journalled_as_deltas(journal, clock):
+    engine = TimerEngine([Split("A"), Split("B")], clock=clock)
+    index = attached(journal, engine)
+    engine.start()
+    clock.advance(10)
+    engine.split()
+    index.close()
+
+    assert journal_lines(journal) == [{"rt": "day", "n": "A", "b": 10.0}]
+    assert index.bests("day", "A") == (10.0, None)
+
+
+def test_journal_replay_overlays_template_splits(journal, clock):
+    with open(journal, 'wb') as f:
+        f.write(b'{"rt":"day","n":"A","b":12.0}\n'
+                b'{"rt":"day","n":"A","p":30.0}\n'
+                b'{"rt":"day","n":"A","b":11.0}\n'
+                b'{"rt":"day","n":"B","b"')  # Torn by a crash
+
+    index = BestTimesIndex(journal)
+    splits = [Split("A"), Split("B")]
+    index.overlay("day", splits)
+    index.close()
+
+    assert (splits[0].best_segment, splits[0].pb_split) == (11.0, 30.0)
+    assert splits[1].best_segment is None
+    assert index.bests("other", "A") == (None, None)
+
+
+def test_long_journal_is_compacted_on_load(journal):
+    with open(journal, 'wb') as f:
+        for best in range(20, 10, -1):
+            f.write(BestTimesIndex._encode({"rt": "day", "n": "A", "b": float(best)}))
+        f.write(BestTimesIndex._encode({"rt": "day", "n": "A", "p": 40.0}))
+
+    index = BestTimesIndex(journal)
+    index.close()
+
+    assert journal_lines(journal) == [{"rt": "day", "n": "A", "b": 11.0, "p": 40.0}]
+    assert BestTimesIndex(journal).bests("day", "A") == (11.0, 40.0)
+
+
+def test_undo_journals_the_previous_best(journal, clock):
+    engine = TimerEngine([Split("A"), Split("B")], clock=clock)
+    engine.splits[0].best_segment = 12.0
+    index = attached(journal, engine)
+    engine.start()
+    clock.advance(10)
+    engine.split()
+    engine.undo_split()
+    index.close()
+
+    # The template's best is picked up on attach, then the gold and its undo
+    assert [line.get("b") for line in journal_lines(journal)] == [12.0, 10.0, 12.0]
+    assert index.bests("day", "A") == (12.0, None)
+
+
+def test_best_times_from_history():
+    pytest.importorskip("numpy")
+    rows = [
+        (1, "day", "", 1, "A", 10.0, 10.0, 0.0, 1),
+        (1, "day", "", 1, "B", 30.0, 20.0, 0.0, 1),
+        (2, "day", "", 1, "A", 12.0, 12.0, 0.0, 0),
+        (2, "day", "", 1, "B", 27.0, 15.0, 0.0, 1),
+        (3, "day", "", 1, "A", 9.0, 9.0, 0.0, 1),  # Merged segment left out by clean=True
+        (3, "day", "", 1, "B", 40.0, float('nan'), 0.0, 0),
+    ]
+    table = SplitTable.from_rows(rows)
+
+    assert best_times_from_history(table, ["A", "B"]) == {"A": (9.0, 12.0), "B": (15.0, 27.0)}
+    # No PB without a time at the (new) last split
+    assert best_times_from_history(table, ["A", "B", "C"])["B"] == (15.0, None)
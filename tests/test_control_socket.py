@@ -0,0 +1,103 @@
+import json
+import socket
+import time
+
+import pytest
+
+from control_socket import ControlServer, engine_handlers
+from timer_engine import Split, TimerEngine
+
+
+@pytest.fixture
+def server(clock, tmp_path):
+    engine = TimerEngine([Split("A"), Split("B")], clock=clock)
+    if hasattr(socket, 'AF_UNIX'):
+        address = str(tmp_path / "control.sock")
+    else:
+        address = ("127.0.0.1", 0)
+    server = ControlServer(engine_handlers(engine), clock, address)
+    server.engine = engine
+    yield server
+    server.close()
+
+
+def connect(server):
+    address = server.listener.getsockname()
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    client = socket.socket(family, socket.SOCK_STREAM)
+    client.settimeout(2)
+    client.connect(address)
+    return client
+
+
+def command(server, client, line):
+    """Send one command, let the server handle it and return its reply"""
+    client.sendall(line.encode('utf-8') + b"\n")
+    for _ in range(50):
+        if server.poll(0.1):
+            break
+    return client.recv(4096).decode('utf-8').strip()
+
+
+def test_commands_drive_the_engine(server, clock):
+    client = connect(server)
+    engine = server.engine
+    try:
+        assert command(server, client, "start") == "ok"
+        assert engine.is_running
+
+        clock.advance(12)
+        assert command(server, client, "split") == "ok"
+        assert engine.splits[0].split_time == 12.0
+
+        clock.advance(3)
+        status = command(server, client, "status")
+        assert status.startswith("ok ")
+        assert json.loads(status[3:]) == {"running": True, "elapsed": 15.0, "split_index": 1,
+                                          "split": "B", "splits": 2}
+
+        assert command(server, client, "undo") == "ok"
+        assert engine.current_split_index == 0
+    finally:
+        client.close()
+
+
+def test_split_uses_the_receipt_time(server, clock):
+    engine = server.engine
+    engine.start()
+    clock.advance(10)
+    received_ns = clock.ns
+    clock.advance(2)  # Handled late
+
+    assert server.dispatch("split", received_ns) == "ok"
+    assert engine.splits[0].split_time == 10.0
+    assert engine.elapsed_time == 12.0
+
+
+def test_errors_are_replied(server):
+    assert server.dispatch("", 0) == "error empty command"
+    assert server.dispatch("jump", 0) == "error unknown command jump"
+    server.engine.current_split_index = len(server.engine.splits)
+    assert server.dispatch("split", 0) == "error no split in progress"
+
+
+def test_threaded_commands_keep_their_receipt_time(server, clock):
+    server.serve_in_thread()
+    engine = server.engine
+    engine.start()
+    client = connect(server)
+    try:
+        clock.advance(10)
+        client.sendall(b"split\n")
+        for _ in range(50):
+            if not server._queued.empty():
+                break
+            time.sleep(0.02)
+        clock.advance(2)  # The Tk thread gets round to it late
+
+        assert server.drain() == 1
+        assert client.recv(4096) == b"ok\n"
+        assert engine.splits[0].split_time == 10.0
+        assert server.drain() == 0
+    finally:
+        client.close()
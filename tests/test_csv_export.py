@@ -0,0 +1,62 @@
+import csv
+import gzip
+import io
+
+from csv_export import HISTORY_COLUMNS, NUMERIC_COLUMNS, focus_percent, history_rows, write_history_csv, write_run_csv
+from timer_engine import Split
+
+
+def rows_for(runs, splits_per_run=2):
+    for run_id in range(1, runs + 1):
+        for position in range(splits_per_run):
+            yield (run_id, "day", "2026-01-01T08:00:00", 1, f"S{position}",
+                   60.0 * (position + 1), 60.0, 30.0 if position else 0, position == 0)
+
+
+def test_history_rows_format_times_and_flags():
+    rows = list(history_rows(rows_for(1), numeric=True))
+    assert rows[0] == [1, "day", "2026-01-01T08:00:00", "yes", "S0", "00:01:00", "00:01:00", "", "", "yes",
+                       "60.000", "60.000", ""]
+    assert rows[1][5:10] == ["00:02:00", "00:01:00", "00:00:30", "50.0%", ""]
+    assert rows[1][10:] == ["120.000", "60.000", "30.000"]
+
+
+def test_history_rows_is_lazy_and_batches_across_the_batch_size():
+    rows = history_rows(rows_for(1500, 1))
+    assert next(rows)[0] == 1
+    assert sum(1 for _ in rows) == 1499
+
+
+def test_missing_times_are_blank():
+    (row,) = history_rows([(1, "day", "", 0, "A", None, None, None, False)])
+    assert row[3:10] == ["no", "A", "", "", "", "", ""]
+
+
+def test_write_history_csv_round_trips_through_gzip(tmp_path):
+    path = tmp_path / "history.csv.gz"
+    progress = []
+    runs = write_history_csv(str(path), rows_for(5), numeric=True, chunk_runs=2, progress=progress.append)
+
+    with gzip.open(path, 'rt', newline='') as f:
+        rows = list(csv.reader(f))
+    assert runs == 5
+    assert progress == [2, 4]
+    assert rows[0] == HISTORY_COLUMNS + NUMERIC_COLUMNS
+    assert len(rows) == 1 + 5 * 2
+
+
+def test_write_run_csv_layout():
+    split = Split("Wake")
+    split.split_time, split.segment_time, split.best_segment, split.focus_time = 90.5, 90.5, 80.0, 45.25
+    f = io.StringIO()
+    write_run_csv(f, "day", "2026-01-01", [split, Split("Eat")])
+
+    rows = list(csv.reader(io.StringIO(f.getvalue())))
+    assert rows[:3] == [["Run Type", "day"], ["Date", "2026-01-01"], []]
+    assert rows[4] == ["Wake", "00:01:30", "00:01:30", "00:01:20", "00:00:45", "50.0%"]
+    assert rows[5] == ["Eat", "", "", "", "", ""]
+
+
+def test_focus_percent():
+    assert focus_percent(30, 60) == "50.0%"
+    assert focus_percent(0, 60) == focus_percent(30, 0) == focus_percent(None, None) == ""
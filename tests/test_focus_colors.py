@@ -0,0 +1,59 @@
+import json
+
+from focus_colors import DEFAULT_FOCUS_STOPS, FocusGradient, focus_tag
+
+STOPS = [(0, "#000000"), (50, "#640000"), (100, "#ffffff")]
+
+
+def test_nearest_stop_is_used_without_interpolation():
+    gradient = FocusGradient(STOPS)
+    assert gradient.color(10) == "#000000"
+    assert gradient.color(30) == "#640000"
+    assert gradient.color(99.6) == "#ffffff"
+    assert gradient.palette == ["#000000", "#640000", "#ffffff"]
+
+
+def test_interpolation_blends_neighbouring_stops():
+    gradient = FocusGradient(STOPS, interpolate=True)
+    assert gradient.color(25) == "#320000"
+    assert gradient.color(50) == "#640000"
+    assert len(gradient.palette) > len(STOPS)
+
+
+def test_percentages_are_rounded_and_clamped():
+    gradient = FocusGradient()
+    assert FocusGradient.index(-20) == 0
+    assert FocusGradient.index(42.5) == 43
+    assert FocusGradient.index(250) == 100
+    assert gradient.tag(250) == focus_tag(DEFAULT_FOCUS_STOPS[-1][1]) == "focus_00c62b"
+
+
+def test_register_configures_each_colour_once():
+    class Tree:
+        def __init__(self):
+            self.tags = {}
+
+        def tag_configure(self, tag, background):
+            assert tag not in self.tags
+            self.tags[tag] = background
+
+    gradient = FocusGradient(STOPS)
+    tree = Tree()
+    gradient.register(tree)
+    assert tree.tags == {"focus_000000": "#000000", "focus_640000": "#640000", "focus_ffffff": "#ffffff"}
+
+
+def test_settings_round_trip(tmp_path):
+    path = tmp_path / "focus_colors.json"
+    path.write_text(json.dumps(FocusGradient(STOPS, interpolate=True).settings()))
+
+    loaded = FocusGradient.load(str(path))
+    assert loaded.interpolate
+    assert loaded.colors == FocusGradient(STOPS, interpolate=True).colors
+
+
+def test_missing_or_broken_settings_fall_back_to_defaults(tmp_path):
+    assert FocusGradient.load(str(tmp_path / "missing.json")).colors == FocusGradient().colors
+    broken = tmp_path / "broken.json"
+    broken.write_text("{")
+    assert FocusGradient.load(str(broken)).colors == FocusGradient().colors
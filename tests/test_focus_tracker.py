@@ -0,0 +1,111 @@
+from focus_tracker import FakeFocusTracker, FocusTimer
+from timer_engine import Split
+
+EDITOR = "Editor"
+
+
+def make_timer(clock, title=None):
+    tracker = FakeFocusTracker(clock, title)
+    return tracker, FocusTimer(tracker)
+
+
+def test_counts_time_while_the_window_has_focus(clock):
+    tracker, timer = make_timer(clock)
+    split = Split("A")
+    timer.track(split, EDITOR)
+
+    clock.advance(5)
+    tracker.set_active(EDITOR)
+    clock.advance(10)
+    tracker.set_active("Browser")
+    clock.advance(20)
+    tracker.set_active(EDITOR)
+    clock.advance(3)
+    timer.untrack()
+
+    assert split.focus_time == 13.0
+    assert not split.is_focusing and split.focus_window is None
+
+
+def test_change_timestamps_are_used_not_the_poll_time(clock):
+    tracker, timer = make_timer(clock, EDITOR)
+    split = Split("A")
+    timer.track(split, EDITOR)
+
+    clock.advance(30)
+    tracker.set_active("Browser", timestamp_ns=clock.ns - 20_000_000_000)
+
+    assert split.focus_time == 10.0
+
+
+def test_flush_shows_live_focus_time_without_double_counting(clock):
+    tracker, timer = make_timer(clock, EDITOR)
+    split = Split("A")
+    timer.track(split, EDITOR)
+
+    clock.advance(4)
+    timer.flush()
+    assert split.focus_time == 4.0
+    clock.advance(6)
+    timer.flush()
+    timer.flush()
+    assert split.focus_time == 10.0
+
+
+def test_paused_time_is_not_counted(clock):
+    tracker, timer = make_timer(clock, EDITOR)
+    split = Split("A")
+    timer.track(split, EDITOR)
+
+    clock.advance(5)
+    timer.pause()
+    clock.advance(100)
+    timer.resume()
+    clock.advance(5)
+    timer.untrack()
+
+    assert split.focus_time == 10.0
+
+
+def test_tracking_a_new_split_stops_the_old_one(clock):
+    tracker, timer = make_timer(clock, EDITOR)
+    first, second = Split("A"), Split("B")
+    timer.track(first, EDITOR)
+    clock.advance(7)
+    timer.track(second, EDITOR)
+    clock.advance(2)
+    timer.untrack()
+
+    assert (first.focus_time, second.focus_time) == (7.0, 2.0)
+
+
+def test_untrack_leaves_the_split_alone_afterwards(clock):
+    tracker, timer = make_timer(clock, EDITOR)
+    split = Split("A")
+    timer.track(split, EDITOR)
+    clock.advance(4)
+    timer.untrack()
+
+    clock.advance(10)
+    timer.resume()
+    timer.flush()
+    tracker.set_active("Browser")
+    tracker.set_active(EDITOR)
+    clock.advance(10)
+    timer.flush()
+
+    assert split.focus_time == 4.0
+    assert timer.split is None
+
+
+def test_unsubscribed_listener_is_not_called(clock):
+    tracker = FakeFocusTracker(clock)
+    seen = []
+    callback = tracker.subscribe(lambda title, timestamp_ns: seen.append((title, timestamp_ns)))
+    clock.advance(1)
+    tracker.set_active(EDITOR)
+    tracker.set_active(EDITOR)  # Not a change
+    tracker.unsubscribe(callback)
+    tracker.set_active("Browser")
+
+    assert seen == [(EDITOR, 1_000_000_000)]
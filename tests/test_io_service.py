@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from io_service import IOService
+
+
+class FakeScheduler:
+    """Records the drain job instead of arming a Tk timer"""
+
+    def __init__(self):
+        self.jobs = {}
+
+    def scheduled(self, name):
+        return name in self.jobs
+
+    def call_later(self, name, delay, callback):
+        self.jobs[name] = callback
+
+    def cancel(self, name):
+        self.jobs.pop(name, None)
+
+    def run(self, name):
+        self.jobs.pop(name)()
+
+
+@pytest.fixture
+def io():
+    service = IOService(FakeScheduler())
+    yield service
+    service.shutdown()
+
+
+def wait(future):
+    future.result(timeout=5)
+
+
+def test_callbacks_run_on_the_draining_thread(io):
+    caller = threading.get_ident()
+    seen = []
+    wait(io.submit(threading.get_ident, on_done=lambda worker: seen.append((worker, threading.get_ident()))))
+
+    assert seen == []  # Nothing happens until the scheduler drains
+    assert io.busy
+    io.scheduler.run(IOService.JOB)
+    [(worker, callback)] = seen
+    assert worker != caller
+    assert callback == caller
+    assert not io.busy
+    assert not io.scheduler.scheduled(IOService.JOB)  # Polling stops once idle
+
+
+def test_errors_go_to_on_error(io, capsys):
+    def fail():
+        raise OSError("disk full")
+
+    errors = []
+    wait(io.submit(fail, on_error=errors.append))
+    wait(io.submit(fail))
+    io.drain()
+
+    assert [str(e) for e in errors] == ["disk full"]
+    assert "Background I/O failed: disk full" in capsys.readouterr().out
+
+
+def test_progress_and_order(io):
+    events = []
+
+    def job(name, progress):
+        progress(f"{name} half")
+        return name
+
+    for name in ("first", "second"):
+        io.submit(job, name, on_done=events.append, on_progress=events.append)
+    io.shutdown()
+
+    assert events == ["first half", "first", "second half", "second"]
+    assert not io.busy
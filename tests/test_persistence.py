@@ -0,0 +1,72 @@
+import json
+import os
+import time
+
+import pytest
+
+from persistence import DebouncedWriter, atomic_write_bytes, atomic_write_json
+
+
+def read_json(path):
+    with open(path, 'rb') as f:
+        return json.load(f)
+
+
+def test_atomic_write_replaces_the_file_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "state.json"
+    atomic_write_json(str(path), {"a": 1})
+    atomic_write_json(str(path), {"a": 2})
+
+    assert read_json(path) == {"a": 2}
+    assert os.listdir(tmp_path) == ["state.json"]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / "state.json"
+    atomic_write_json(str(path), {"a": 1})
+
+    with pytest.raises(TypeError):
+        atomic_write_bytes(str(path), "not bytes")
+
+    assert read_json(path) == {"a": 1}
+    assert os.listdir(tmp_path) == ["state.json"]
+
+
+def test_writer_coalesces_a_burst_into_the_latest_data(tmp_path):
+    path = str(tmp_path / "state.json")
+    writes = []
+    writer = DebouncedWriter(delay=0.05, max_delay=1.0)
+    original = writer._write
+    writer._write = lambda *args: (writes.append(args[1]), original(*args))
+    try:
+        for value in range(10):
+            writer.schedule(path, {"value": value})
+        deadline = time.monotonic() + 2
+        while not writes and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        writer.close()
+
+    assert writes == [{"value": 9}]
+    assert read_json(path) == {"value": 9}
+
+
+def test_close_flushes_pending_writes(tmp_path):
+    path = str(tmp_path / "state.json")
+    writer = DebouncedWriter(delay=60, max_delay=60)
+    writer.schedule(path, [1, 2, 3])
+    writer.close()
+
+    assert read_json(path) == [1, 2, 3]
+    with pytest.raises(RuntimeError):
+        writer.schedule(path, [])
+
+
+def test_write_errors_go_to_on_error(tmp_path):
+    errors = []
+    writer = DebouncedWriter(delay=60, on_error=lambda path, e: errors.append(path))
+    missing = str(tmp_path / "missing" / "state.json")
+    writer.schedule(missing, {})
+    writer.close()
+
+    assert errors == [missing]
@@ -0,0 +1,75 @@
+import pytest
+
+from run_history import RunHistory, percentile
+from timer_engine import Split
+
+
+def split(name, segment_time, split_time=None, focus_time=0):
+    result = Split(name)
+    result.segment_time = segment_time
+    result.split_time = split_time
+    result.focus_time = focus_time
+    return result
+
+
+@pytest.fixture
+def history():
+    history = RunHistory(":memory:")
+    yield history
+    history.close()
+
+
+def stored(history, run_id):
+    return history.conn.execute(
+        "SELECT position, split_name, segment_time, is_gold FROM split_times WHERE run_id = ? ORDER BY position",
+        (run_id,)
+    ).fetchall()
+
+
+def test_golds_are_marked_against_earlier_runs(history):
+    first = history.record_run("day", [split("A", 10, 10), split("B", 20, 30)], True, 30)
+    second = history.record_run("day", [split("A", 12, 12), split("B", 15, 27)], True, 27)
+
+    assert stored(history, first) == [(0, "A", 10.0, 1), (1, "B", 20.0, 1)]
+    assert stored(history, second) == [(0, "A", 12.0, 0), (1, "B", 15.0, 1)]
+    assert history.gold_history("day", "B") == [
+        (history.runs()[0][3], 20.0), (history.runs()[1][3], 15.0)
+    ]
+
+
+def test_segment_after_a_skip_is_left_out(history):
+    history.record_run("day", [split("A", 10, 10), split("B", 20, 30), split("C", 30, 60)], True, 60)
+    # B skipped: C's segment covers B and C
+    run_id = history.record_run("day", [split("A", 11, 11), split("B", None), split("C", 25, 36)], True, 36)
+
+    assert stored(history, run_id) == [(0, "A", 11.0, 0), (2, "C", 25.0, 0)]
+    assert history.split_averages("day")["C"] == (1, 30.0, 30.0)
+    assert history.segment_percentiles("day", "C", (50,)) == {50: 30.0}
+    assert history.sum_of_best("day") == 60.0
+
+    # The next clean C is compared with the clean best, not the merged one
+    later = history.record_run("day", [split("A", 11, 11), split("B", 20, 31), split("C", 28, 59)], True, 59)
+    assert stored(history, later)[2] == (2, "C", 28.0, 1)
+
+
+def test_clean_split_table_drops_reset_runs_and_merged_segments(history):
+    history.record_run("day", [split("A", 10, 10), split("B", None), split("C", 8, 20)], True, 20)
+    history.record_run("day", [split("A", 5, 5)], False, 6)
+
+    table = history.split_table("day", clean=True)
+    assert len(table) == 2
+    assert list(table.segment_time)[0] == 10.0
+    assert list(table.segment_time)[1] != list(table.segment_time)[1]  # NaN
+    assert len(history.split_table("day")) == 3
+
+
+def test_split_names_follow_template_order(history):
+    history.record_run("day", [split("Wake", 1, 1), split("Eat", 2, 3)], True, 3)
+    history.record_run("other", [split("Zzz", 1, 1)], True, 1)
+    assert history.split_names("day") == ["Wake", "Eat"]
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) is None
+    assert percentile([1.0, 3.0], 50) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 90) == pytest.approx(4.6)
@@ -0,0 +1,124 @@
+import pytest
+
+from scheduler import Scheduler
+
+
+class FakeRoot:
+    """Stands in for Tk: after() only records the timer, fire() runs it"""
+
+    def __init__(self):
+        self.timers = {}
+        self._ids = 0
+
+    def after(self, delay_ms, callback):
+        self._ids += 1
+        self.timers[self._ids] = (delay_ms, callback)
+        return self._ids
+
+    def after_cancel(self, after_id):
+        del self.timers[after_id]
+
+    @property
+    def delay(self):
+        [(delay_ms, _)] = self.timers.values()
+        return delay_ms
+
+    def fire(self):
+        [(after_id, (_, callback))] = self.timers.items()
+        del self.timers[after_id]
+        callback()
+
+
+@pytest.fixture
+def root():
+    return FakeRoot()
+
+
+@pytest.fixture
+def scheduler(root, clock):
+    return Scheduler(root, clock=clock)
+
+
+def test_only_the_earliest_job_is_armed(scheduler, root, clock):
+    ran = []
+    scheduler.call_later("slow", 1.0, lambda: ran.append("slow"))
+    scheduler.call_later("fast", 0.1, lambda: ran.append("fast"))
+    assert root.delay == 100
+
+    clock.advance(0.1)
+    root.fire()
+    assert ran == ["fast"]
+    assert root.delay == 900
+
+    scheduler.cancel("slow")
+    assert root.timers == {}
+
+
+def test_jobs_due_close_together_share_a_wakeup(scheduler, root, clock):
+    ran = []
+    scheduler.call_later("a", 0.010, lambda: ran.append("a"))
+    scheduler.call_later("b", 0.012, lambda: ran.append("b"))  # Within COALESCE_MS
+    scheduler.call_later("c", 0.030, lambda: ran.append("c"))
+    assert root.delay == 12
+
+    clock.advance(0.012)
+    root.fire()
+    assert ran == ["a", "b"]
+
+
+def test_periodic_jobs_skip_missed_runs(scheduler, root, clock):
+    ran = []
+    scheduler.every("tick", 0.1, lambda: ran.append(clock.ns))
+    clock.advance(0.35)  # A late wakeup
+    root.fire()
+    assert len(ran) == 1
+    assert root.delay == 100
+    assert scheduler.scheduled("tick")
+
+
+def test_batched_work_runs_once_after_the_due_jobs(scheduler, root, clock):
+    ran = []
+
+    def job(name):
+        ran.append(name)
+        scheduler.after_batch("redraw", lambda: ran.append("redraw"))
+
+    scheduler.call_later("a", 0.01, lambda: job("a"))
+    scheduler.call_later("b", 0.01, lambda: job("b"))
+    clock.advance(0.01)
+    root.fire()
+
+    assert ran == ["a", "b", "redraw"]
+    assert root.timers == {}
+
+
+def test_batch_outside_a_wakeup_runs_on_the_next_pass(scheduler, root):
+    ran = []
+    for _ in range(3):
+        scheduler.after_batch("redraw", lambda: ran.append("redraw"))
+    assert root.delay == 0
+    root.fire()
+    assert ran == ["redraw"]
+
+
+def test_a_failing_job_doesnt_stop_the_others(scheduler, root, clock, capsys):
+    ran = []
+    scheduler.call_later("bad", 0.01, lambda: 1 / 0)
+    scheduler.call_later("good", 0.01, lambda: ran.append("good"))
+    clock.advance(0.01)
+    root.fire()
+
+    assert ran == ["good"]
+    assert "Error in scheduled job bad" in capsys.readouterr().out
+
+
+def test_replacing_a_job_during_a_wakeup(scheduler, root, clock):
+    ran = []
+    scheduler.call_later("first", 0.01, lambda: scheduler.cancel("second"))
+    scheduler.call_later("second", 0.01, lambda: ran.append("second"))
+    clock.advance(0.01)
+    root.fire()
+    assert ran == []
+
+    scheduler.shutdown()
+    assert root.timers == {}
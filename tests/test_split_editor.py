@@ -0,0 +1,86 @@
+import pytest
+
+from split_editor import SplitEditorModel, parse_split_list
+from timer_engine import Split, TimerEngine
+
+
+@pytest.fixture
+def engine(clock):
+    return TimerEngine([Split("A"), Split("B"), Split("C")], clock=clock)
+
+
+def test_edits_are_written_in_place(engine):
+    a = engine.splits[0]
+    a.focus_time = 4.0
+    a.best_segment = 10.123456
+    model = SplitEditorModel(engine.splits)
+    iid = model.rows[0].iid
+
+    assert not model.set_value(iid, "best_segment", "00:00:10.123")  # Retyping what's shown keeps the precision
+    assert model.set_value(iid, "name", " Wake ")
+    assert model.apply(engine) == 1
+
+    assert engine.splits[0] is a
+    assert (a.name, a.best_segment, a.focus_time) == ("Wake", 10.123456, 4.0)
+    with pytest.raises(ValueError):
+        model.set_value(iid, "segment_time", "soon")
+
+
+def test_structure_changes_wait_for_a_reset(engine, clock):
+    engine.start()
+    clock.advance(5)
+    engine.split()
+    model = SplitEditorModel(engine.splits)
+    model.insert([{"name": "D"}])
+
+    with pytest.raises(ValueError):
+        model.apply(engine)
+    engine.reset()
+    model.apply(engine)
+    assert [split.name for split in engine.splits] == ["A", "B", "C", "D"]
+
+
+def test_completed_split_times_are_locked_during_a_run(engine, clock):
+    engine.start()
+    clock.advance(5)
+    engine.split()
+    model = SplitEditorModel(engine.splits)
+    iid = model.rows[0].iid
+
+    model.set_value(iid, "split_time", "0:04")
+    with pytest.raises(ValueError):
+        model.apply(engine)
+    assert engine.splits[0].split_time == 5.0
+
+    # Best segments and names of completed splits can still be edited
+    model.set_value(iid, "split_time", "0:05")
+    model.set_value(iid, "best_segment", "0:03")
+    assert model.apply(engine) == 1
+    assert engine.splits[0].best_segment == 3.0
+
+
+def test_csv_with_a_header_row():
+    text = "Run,Today\nSplit Name,Best Segment,Split Time\nWake,0:30,0:30\nEat,,1:00:00\n"
+    assert parse_split_list(text) == [
+        {"name": "Wake", "best_segment": 30.0, "split_time": 30.0},
+        {"name": "Eat", "best_segment": None, "split_time": 3600.0},
+    ]
+
+
+def test_bad_cells_name_their_line():
+    with pytest.raises(ValueError, match="Line 3"):
+        parse_split_list("Wake\t0:10\nEat\t1:00\nWork\tlater\n")
+    assert parse_split_list("Wake\nEat\n") == [{"name": "Wake"}, {"name": "Eat"}]
+
+
+def test_livesplit_segments():
+    lss = (
+        "<Run><Segments><Segment><Name>Wake</Name>"
+        "<BestSegmentTime><RealTime>00:00:30.5</RealTime></BestSegmentTime>"
+        "<SplitTimes><SplitTime name=\"Personal Best\"><RealTime>00:00:40</RealTime></SplitTime></SplitTimes>"
+        "</Segment><Segment><Name></Name></Segment></Segments></Run>"
+    )
+    assert parse_split_list(lss) == [
+        {"name": "Wake", "best_segment": 30.5, "pb_split": 40.0},
+        {"name": "Split 2", "best_segment": None, "pb_split": None},
+    ]
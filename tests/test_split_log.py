@@ -0,0 +1,120 @@
+from split_log import SplitLog, replay
+from timer_engine import Split, TimerEngine
+
+
+def logged_engine(clock, path):
+    engine = TimerEngine([Split(name) for name in ("A", "B", "C")], clock=clock)
+    engine.splits[1].best_segment = 7.0
+    log = SplitLog(str(path), sync=True)
+    log.attach(engine, lambda: "morning")
+    return engine, log
+
+
+def test_replay_rebuilds_splits_skips_and_undos(clock, tmp_path):
+    path = tmp_path / "split_log.jsonl"
+    engine, log = logged_engine(clock, path)
+    engine.start()
+    clock.advance(10)
+    engine.split()
+    clock.advance(5)
+    engine.skip_split()
+    clock.advance(5)
+    engine.split()
+    engine.undo_split()
+    clock.advance(2)
+    engine.stop()
+    log.close()
+
+    state = replay(str(path))
+
+    assert state["run_type"] == "morning"
+    assert state["names"] == ["A", "B", "C"]
+    assert state["best"] == [None, 7.0, None]
+    assert state["splits"] == {0: (10.0, 10.0, 0), 1: (None, None, 0)}
+    assert state["current_split_index"] == 2
+    assert state["last_split_time"] == 10.0
+    assert state["elapsed_time"] == 22.0
+    assert not state["is_running"] and not state["finished"]
+
+
+def test_running_run_is_advanced_to_now(clock, tmp_path):
+    path = tmp_path / "split_log.jsonl"
+    engine, log = logged_engine(clock, path)
+    engine.start()
+    log.close()
+
+    state = replay(str(path), now=float("inf"))
+    assert state["is_running"]
+    assert state["elapsed_time"] == float("inf")
+
+
+def test_reset_empties_the_log(clock, tmp_path):
+    path = tmp_path / "split_log.jsonl"
+    engine, log = logged_engine(clock, path)
+    engine.start()
+    clock.advance(10)
+    engine.split()
+    engine.reset()
+    log.close()
+
+    assert replay(str(path)) is None
+
+
+def test_rewrite_matches_the_restored_run(clock, tmp_path):
+    path = tmp_path / "split_log.jsonl"
+    engine, log = logged_engine(clock, path)
+    engine.splits[0].split_time = engine.splits[0].segment_time = 10.0
+    engine.restore(25.0, 2, 10.0)
+    log.rewrite()
+    log.close()
+
+    state = replay(str(path))
+    assert state["splits"] == {0: (10.0, 10.0, 0), 1: (None, None, 0)}
+    assert state["current_split_index"] == 2
+    assert state["elapsed_time"] == 25.0
+
+
+def finish_run(engine, clock):
+    engine.start()
+    for _ in engine.splits:
+        clock.advance(10)
+        engine.split()
+
+
+def test_run_appended_after_a_finished_one_replays_on_its_own(clock, tmp_path):
+    path = tmp_path / "split_log.jsonl"
+    engine, log = logged_engine(clock, path)
+    finish_run(engine, clock)
+    assert replay(str(path))["finished"]
+
+    # An old log that was never cleared: the next run is appended after the finish
+    engine.restore(0, 0, 0)
+    engine.start()
+    clock.advance(4)
+    engine.split()
+    log.close()
+
+    state = replay(str(path))
+    assert not state["finished"]
+    assert state["is_running"]
+    assert state["splits"] == {0: (4.0, 4.0, 0)}
+    assert state["best"] == []  # The old header's bests predate the finished run
+
+
+def test_truncated_log_starts_the_next_run_with_a_fresh_header(clock, tmp_path):
+    path = tmp_path / "split_log.jsonl"
+    engine, log = logged_engine(clock, path)
+    finish_run(engine, clock)
+    log.truncate()
+
+    engine.reset()
+    engine.set_splits([Split("X"), Split("Y")])
+    engine.start()
+    clock.advance(3)
+    engine.split()
+    log.close()
+
+    state = replay(str(path))
+    assert state["names"] == ["X", "Y"]
+    assert state["splits"] == {0: (3.0, 3.0, 0)}
+    assert not state["finished"]
@@ -0,0 +1,63 @@
+import pytest
+
+from split_table import SplitTable
+from timer_engine import Split
+
+
+def split(name, split_time=None, segment_time=None, best_segment=None):
+    result = Split(name)
+    result.split_time = split_time
+    result.segment_time = segment_time
+    result.best_segment = best_segment
+    return result
+
+
+def test_views_read_back_the_splits():
+    table = SplitTable.from_splits([split("A", 10.0, 10.0, 9.0), split("B")], run_id=3)
+
+    a, b = table
+    assert (a.run_id, a.name, a.split_time, a.segment_time, a.best_segment) == (3, "A", 10.0, 10.0, 9.0)
+    assert b.split_time is None and b.pb_split is None  # Stored as NaN
+    assert table[-1].name == "B"
+    with pytest.raises(IndexError):
+        table[2]
+
+    detached = a.to_split()
+    detached.split_time = 11.0
+    assert table[0].split_time == 10.0
+
+
+def test_names_are_interned():
+    table = SplitTable()
+    for run_id in (1, 2):
+        table.extend(run_id, [split("A"), split("B")])
+    assert table.names == ["A", "B"]
+    assert list(table.name_codes) == [0, 1, 0, 1]
+    assert table.name_code("B") == 1
+    assert table.name_code("C") is None
+
+
+def test_runs_are_found_by_id():
+    rows = [
+        (1, "day", "2024-01-01T08:00:00", 1, "A", 10.0, 10.0, 0.0, 1),
+        (1, "day", "2024-01-01T08:00:00", 1, "B", 30.0, 20.0, 0.0, 1),
+        (4, "day", "2024-01-02T08:00:00", 1, "A", 9.0, 9.0, 2.5, 1),
+    ]
+    table = SplitTable.from_rows(rows)
+
+    assert [view.name for view in table.run(1)] == ["A", "B"]
+    assert [view.focus_time for view in table.run(4)] == [2.5]
+    assert table.run(2) == []
+    assert table.run_ids_unique() == [1, 4]
+    assert table[2].is_gold
+
+
+def test_as_numpy_is_a_view():
+    np = pytest.importorskip("numpy")
+    table = SplitTable.from_splits([split("A", 10.0), split("B")])
+
+    split_times = table.as_numpy("split_time")
+    assert split_times[0] == 10.0 and np.isnan(split_times[1])
+    table.split_time[0] = 12.0
+    assert split_times[0] == 12.0
+    assert len(SplitTable().as_numpy("segment_time")) == 0
@@ -0,0 +1,53 @@
+import os
+from datetime import date, time
+
+from stats_store import SleepStatsStore
+
+HEADER = "Date,Bed Time,Wake Time,Sleep Duration\n"
+
+
+def write(path, text, mode='w'):
+    with open(path, mode, newline='') as f:
+        f.write(text)
+    # Make sure the store sees a new mtime even on coarse filesystems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_lookup_by_date_keeps_the_first_row(tmp_path):
+    path = tmp_path / "stats.csv"
+    write(path, HEADER + "2025-11-28,12:41 AM,08:40 AM,479\n2025-11-28,01:00 AM,09:00 AM,400\n")
+    store = SleepStatsStore(str(path))
+
+    assert store.get("2025-11-28")["Sleep Duration"] == "479"
+    assert store.get(date(2025, 11, 28))["Bed Time"] == "12:41 AM"
+    assert store.wake_time("2025-11-28") == time(8, 40)
+    assert store.get("2025-11-29") is None
+    assert store.wake_time("2025-11-29") is None
+
+
+def test_appended_rows_are_picked_up(tmp_path):
+    path = tmp_path / "stats.csv"
+    write(path, HEADER + "2025-11-28,12:41 AM,08:40 AM,479\n")
+    store = SleepStatsStore(str(path))
+    assert store.get("2025-11-28") is not None
+
+    # A half-written row waits for the next refresh
+    write(path, "2025-11-29,11:00 PM,07:00 AM,480\n2025-11-30,11:", mode='a')
+    assert store.get("2025-11-29")["Wake Time"] == "07:00 AM"
+    assert store.get("2025-11-30") is None
+
+    write(path, "30 PM,07:30 AM,450\n", mode='a')
+    assert store.get("2025-11-30")["Bed Time"] == "11:30 PM"
+    assert store.get("2025-11-28") is not None
+
+
+def test_rewritten_file_is_reloaded(tmp_path):
+    path = tmp_path / "stats.csv"
+    write(path, HEADER + "2025-11-28,12:41 AM,08:40 AM,479\n")
+    store = SleepStatsStore(str(path))
+    store.refresh()
+
+    write(path, HEADER + "2025-12-01,10:00 PM,06:00 AM,480\n2025-12-02,10:00 PM,06:00 AM,480\n")
+    assert store.get("2025-11-28") is None
+    assert store.get("2025-12-01") is not None
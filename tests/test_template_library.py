@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+from template_library import TemplateLibrary, template_splits
+
+
+def template(*names):
+    return {"Current_Template": {"splits": [{"name": name, "best_segment": None} for name in names]}}
+
+
+@pytest.fixture
+def library(tmp_path):
+    return TemplateLibrary(str(tmp_path / "templates"))
+
+
+def test_save_and_load_round_trip(library, tmp_path):
+    library.save("Morning", template("Wake", "Eat"))
+
+    assert library.names() == ["Morning"]
+    assert library.entries()[0][1]["splits"] == 2
+    assert library.load("Morning") == template("Wake", "Eat")
+
+    # A fresh library lists the template from the manifest alone
+    reopened = TemplateLibrary(str(tmp_path / "templates"))
+    assert reopened.names() == ["Morning"]
+    assert template_splits(reopened.load("Morning"))[1]["name"] == "Eat"
+
+
+def test_files_changed_on_disk_are_reindexed(library):
+    library.save("Morning", template("Wake"))
+    path = os.path.join(library.directory, "Morning.json")
+    with open(path, 'w') as f:
+        json.dump(template("Wake", "Eat", "Work"), f)
+    os.utime(path, ns=(0, 0))
+
+    library.refresh()
+    assert library.manifest["Morning"]["splits"] == 3
+    assert len(template_splits(library.load("Morning"))) == 3
+
+    os.remove(path)
+    library.refresh()
+    assert "Morning" not in library
+
+
+@pytest.mark.parametrize("name", ["", "  ", "../escape", "a/b", "a\\b", "..", "what?", "trailing.", "CON", "com1.x", "manifest"])
+def test_unsafe_names_are_rejected(library, name):
+    with pytest.raises(ValueError):
+        library.save(name, template("Wake"))
+    assert os.listdir(library.directory) == []
+
+
+def test_legacy_templates_with_bad_names_are_skipped(library, tmp_path):
+    legacy = tmp_path / "run_templates.json"
+    legacy.write_text(json.dumps({"Morning": ["Wake"], "a/b": ["Eat"]}))
+
+    assert library.migrate_legacy(str(legacy)) == 1
+    assert library.names() == ["Morning"]
+
+
+def test_old_list_format_is_understood():
+    assert template_splits({"Current_Template": ["Wake", "Eat"]}) == [{"name": "Wake"}, {"name": "Eat"}]
+    assert template_splits([]) == []
@@ -0,0 +1,46 @@
+import pytest
+
+from time_codec import format_delta, format_duration, format_durations, parse_duration, parse_durations
+
+VALUES = [None, float('nan'), 0, 0.999, 59.5, 61, 3599.99, 3600, 86400 + 62.25, -75.5]
+TEXTS = ["", " ", "0", "7", "1:05", "01:02:03", "10:00:00.5", "-1:30", " 00:00:59.125 ", "123:45:06.7"]
+
+
+def test_formatting():
+    assert format_duration(None) == ""
+    assert format_duration(3725.9) == "01:02:05"
+    assert format_duration(3725.987, precision=2) == "01:02:05.98"  # Truncated, not rounded
+    assert format_duration(-61) == "-00:01:01"
+    assert format_delta(-1.5, 1) == "-00:00:01.5"
+    assert format_delta(0) == "+00:00:00"
+
+
+@pytest.mark.parametrize("precision", [0, 1, 3])
+def test_bulk_formatting_matches_scalar(precision):
+    assert format_durations(VALUES, precision) == [format_duration(value, precision) for value in VALUES]
+
+
+def test_bulk_formatting_takes_numpy_columns():
+    np = pytest.importorskip("numpy")
+    values = np.array([1.5, np.nan, 7322.0])
+    assert format_durations(values, 1) == ["00:00:01.5", "", "02:02:02.0"]
+
+
+def test_parsing():
+    assert parse_duration("") is None
+    assert parse_duration("1:02:03.5") == 3723.5
+    assert parse_duration("-0:30") == -30.0
+    assert parse_duration(12) == 12.0
+    for text in ("abc", "1:60", "1:60:00", "--5", "1::2"):
+        with pytest.raises(ValueError):
+            parse_duration(text)
+
+
+def test_bulk_parsing_matches_scalar():
+    assert parse_durations(TEXTS) == [parse_duration(text) for text in TEXTS]
+
+
+def test_bulk_parsing_errors():
+    with pytest.raises(ValueError):
+        parse_durations(["1:00", "nope"])
+    assert parse_durations(["1:00", "nope", "", "0:75"], errors="coerce") == [60.0, None, None, None]
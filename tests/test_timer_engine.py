@@ -0,0 +1,130 @@
+import pytest
+
+from timer_engine import Split, TimerEngine
+
+
+def make_engine(clock, names=("A", "B", "C"), best=None, pb=None):
+    splits = [Split(name) for name in names]
+    for index, split in enumerate(splits):
+        split.best_segment = best[index] if best else None
+        split.pb_split = pb[index] if pb else None
+    return TimerEngine(splits, clock=clock)
+
+
+def run_splits(engine, clock, segments):
+    engine.start()
+    for seconds in segments:
+        clock.advance(seconds)
+        engine.split()
+
+
+def test_split_records_times_and_golds(clock):
+    engine = make_engine(clock, best=[12.0, 8.0, None])
+    events = []
+    engine.subscribe("split", lambda index, split: events.append(index))
+
+    run_splits(engine, clock, [10, 9])
+
+    a, b, c = engine.splits
+    assert (a.split_time, a.segment_time, a.best_segment) == (10.0, 10.0, 10.0)
+    assert (b.split_time, b.segment_time, b.best_segment) == (19.0, 9.0, 8.0)
+    assert engine.current_split is c
+    assert events == [0, 1]
+
+
+def test_stop_and_resume_keep_the_elapsed_time(clock):
+    engine = make_engine(clock)
+    events = []
+    for event in ("started", "stopped", "tick"):
+        engine.subscribe(event, lambda *args, event=event: events.append(event))
+
+    engine.start()
+    clock.advance(5)
+    engine.tick()
+    engine.stop()
+    clock.advance(100)  # Stopped time doesn't count
+    engine.start()
+    clock.advance(2.5)
+    engine.tick()
+
+    assert engine.elapsed_time == 7.5
+    assert engine.splits[0].split_time == 7.5
+    assert events == ["started", "tick", "stopped", "started", "tick"]
+
+
+def test_backdated_split_keeps_the_clock_running(clock):
+    engine = make_engine(clock)
+    engine.start()
+    clock.advance(10.5)
+    engine.split(at_ns=clock.ns - 500_000_000)
+
+    assert engine.splits[0].split_time == 10.0
+    assert engine.elapsed_time == 10.5
+    assert engine.is_running
+
+
+def test_undo_restores_the_previous_best(clock):
+    engine = make_engine(clock, best=[12.0, 8.0, 5.0])
+    run_splits(engine, clock, [10])
+
+    undone = engine.undo_split()
+
+    assert undone is engine.splits[0]
+    assert engine.current_split_index == 0
+    assert undone.best_segment == 12.0
+    assert undone.split_time is None and undone.segment_time is None
+    assert engine.undo_split() is None
+
+
+def test_skipped_split_segment_is_never_a_gold(clock):
+    engine = make_engine(clock, best=[12.0, 8.0, 30.0])
+    run_splits(engine, clock, [10])
+    clock.advance(5)
+    engine.skip_split()
+    clock.advance(5)
+    engine.split()
+
+    a, b, c = engine.splits
+    assert b.split_time is None and b.segment_time is None
+    assert c.segment_time == 10.0  # Spans the skipped split
+    assert c.best_segment == 30.0
+
+
+def test_finishing_faster_sets_the_pb_and_undo_takes_it_back(clock):
+    engine = make_engine(clock, pb=[10.0, 20.0, 30.0])
+    finished = []
+    engine.subscribe("finished", lambda: finished.append(True))
+
+    run_splits(engine, clock, [9, 9, 9])
+
+    assert finished == [True]
+    assert engine.is_finished and not engine.is_running
+    assert [split.pb_split for split in engine.splits] == [9.0, 18.0, 27.0]
+
+    engine.undo_split()
+    assert engine.is_running
+    assert [split.pb_split for split in engine.splits] == [10.0, 20.0, 30.0]
+
+
+def test_slower_finish_keeps_the_pb(clock):
+    engine = make_engine(clock, pb=[10.0, 20.0, 30.0])
+    run_splits(engine, clock, [11, 11, 11])
+    assert [split.pb_split for split in engine.splits] == [10.0, 20.0, 30.0]
+
+
+def test_reset_clears_run_times_but_keeps_bests(clock):
+    engine = make_engine(clock)
+    run_splits(engine, clock, [10, 10])
+    clock.advance(3)
+    engine.tick()
+
+    engine.reset()
+
+    assert engine.current_split_index == 0 and engine.elapsed_time == 0
+    assert all(split.split_time is None and split.segment_time is None for split in engine.splits)
+    assert [split.best_segment for split in engine.splits] == [10.0, 10.0, None]
+
+
+def test_unknown_event_is_rejected(clock):
+    with pytest.raises(ValueError):
+        make_engine(clock).subscribe("nope", print)
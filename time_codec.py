@@ -0,0 +1,182 @@
+"""
+Durations to and from text: [-]HH:MM:SS with optional fractional seconds.
+
+format_duration() is on the per-tick path. Whole seconds (the default
+display) are looked up in a precomputed MM:SS table and memoised per
+second, so repainting splits that haven't changed costs a dict hit.
+The bulk variants take whole columns (lists or NumPy arrays) for
+exports and imports.
+"""
+import re
+from functools import lru_cache
+
+NAN = float('nan')
+
+# "MM:SS" for every second of an hour, so formatting is a divmod and a lookup
+_MINUTES_SECONDS = [f"{m:02d}:{s:02d}" for m in range(60) for s in range(60)]
+
+# [-]H:MM:SS[.fff], [-]M:SS[.fff] or [-]S[.fff]
+_DURATION = re.compile(r"\s*(-)?(?:(?:(\d+):)?(\d+):)?(\d+(?:\.\d*)?)\s*$")
+
+
+@lru_cache(maxsize=8192)
+def _format_whole(whole):
+    hours, rest = divmod(whole, 3600)
+    return f"{hours:02d}:{_MINUTES_SECONDS[rest]}"
+
+
+def format_duration(seconds, precision=0):
+    """HH:MM:SS with `precision` truncated decimal places; '' for None/NaN"""
+    if seconds is None or seconds != seconds:
+        return ""
+    if seconds < 0:
+        return f"-{format_duration(-seconds, precision)}"
+    if not precision:
+        return _format_whole(int(seconds))
+    scale = 10 ** precision
+    whole, fraction = divmod(int(seconds * scale + 1e-9), scale)
+    return f"{_format_whole(whole)}.{fraction:0{precision}d}"
+
+
+def format_delta(seconds, precision=0):
+    """Signed duration (+HH:MM:SS / -HH:MM:SS) for comparison columns; '' for None"""
+    if seconds is None:
+        return ""
+    return f"{'-' if seconds < 0 else '+'}{format_duration(abs(seconds), precision)}"
+
+
+def parse_duration(text):
+    """
+    Seconds for "[-]H:MM:SS[.fff]" (hours and minutes may be left off);
+    None for an empty string. Raises ValueError for anything else.
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    if not text.strip():
+        return None
+    match = _DURATION.match(text)
+    if match is None:
+        raise ValueError(f"Invalid time {text!r}, expected HH:MM:SS")
+    sign, hours, minutes, seconds = match.groups()
+    seconds = float(seconds)
+    if minutes is not None:
+        if seconds >= 60 or (hours is not None and int(minutes) >= 60):
+            raise ValueError(f"Invalid time {text!r}, minutes and seconds must be under 60")
+        seconds += int(minutes) * 60 + int(hours or 0) * 3600
+    return -seconds if sign else seconds
+
+
+def format_durations(values, precision=0):
+    """
+    format_duration() over a column of seconds (list, array or NumPy
+    array; None and NaN give ''). With NumPy the column is split into
+    hours/rest with array arithmetic before the per-item string work.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return [format_duration(value, precision) for value in values]
+    if hasattr(values, "dtype"):
+        values = np.asarray(values, dtype=float)
+    else:
+        values = np.fromiter((NAN if value is None else value for value in values), dtype=float)
+    missing = np.isnan(values)
+    negative = values < 0
+    scale = 10 ** precision
+    units = np.floor(np.abs(np.where(missing, 0, values)) * scale + 1e-9).astype(np.int64)
+    whole, fraction = np.divmod(units, scale)
+    hours, rest = np.divmod(whole, 3600)
+    table = _MINUTES_SECONDS
+    return [
+        "" if m else f"{'-' if n else ''}{h:02d}:{table[r]}" + (f".{f:0{precision}d}" if precision else "")
+        for m, n, h, r, f in zip(missing.tolist(), negative.tolist(), hours.tolist(),
+                                 rest.tolist(), fraction.tolist())
+    ]
+
+
+def parse_durations(texts, errors="raise"):
+    """
+    parse_duration() over a column of strings. With NumPy the column is
+    split into sign, hours, minutes and seconds with vectorised string
+    operations and its digits read straight from the code points. If
+    anything doesn't parse (or NumPy is missing) the column goes through
+    parse_duration() item by item, which raises for the first bad entry
+    or, with errors="coerce", gives None for it.
+    """
+    texts = list(texts)
+    if texts and all(type(text) is str for text in texts):
+        values = _parse_column(texts)
+        if values is not None:
+            return values
+
+    result = []
+    for text in texts:
+        try:
+            result.append(parse_duration(text))
+        except ValueError:
+            if errors != "coerce":
+                raise
+            result.append(None)
+    return result
+
+
+def _parse_column(texts):
+    """Seconds (None for blanks) for a list of strings, or None if NumPy is missing or any is invalid"""
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    strings = getattr(np, "strings", None)
+    if not hasattr(strings, "partition"):
+        return None  # NumPy older than 2.2
+
+    def decimal(part, required):
+        # (value, digit count, ok) for each string of ASCII digits, '' allowed unless required
+        width = part.dtype.itemsize // 4
+        if width == 0:  # All empty
+            zeros = np.zeros(len(part), dtype=np.int64)
+            return zeros, zeros, np.logical_not(required) | np.zeros(len(part), dtype=bool)
+        if width > 15:
+            return None
+        codes = np.ascontiguousarray(part).view(np.uint32).reshape(len(part), width).astype(np.int64)
+        used = codes != 0
+        digit = codes - 48
+        count = used.sum(axis=1)
+        ok = (((digit >= 0) & (digit <= 9)) | ~used).all(axis=1) & (used[:, :-1] | ~used[:, 1:]).all(axis=1)
+        ok &= (count > 0) | np.logical_not(required)
+        power = np.clip(count[:, None] - 1 - np.arange(width), 0, None)
+        value = (np.where(used, digit, 0) * 10 ** power).sum(axis=1)
+        return value, count, ok
+
+    column = strings.strip(np.array(texts, dtype=str))
+    blank = column == ""
+    body = strings.lstrip(column, "-")
+    signs = strings.str_len(column) - strings.str_len(body)
+    rest, colon, seconds = strings.rpartition(body, ":")
+    hours, hour_colon, minutes = strings.rpartition(rest, ":")
+    whole, _, fraction = strings.partition(seconds, ".")
+    has_minutes = colon == ":"
+    has_hours = hour_colon == ":"
+
+    parts = [decimal(whole, ~blank), decimal(fraction, False),
+             decimal(minutes, has_minutes), decimal(hours, has_hours)]
+    if any(part is None for part in parts):
+        return None
+    (whole, _, whole_ok), (fraction, places, fraction_ok), (minute, _, minute_ok), (hour, _, hour_ok) = parts
+    if not (blank | ((signs <= 1) & whole_ok & fraction_ok & minute_ok & hour_ok)).all():
+        return None
+    if ((has_minutes & (whole >= 60)) | (has_hours & (minute >= 60))).any():
+        return None
+
+    scale = 10.0 ** places
+    value = (whole * scale + fraction) / scale + (minute * 60 + hour * 3600)
+    value = np.where(signs > 0, -value, value)
+    return [None if missing else seconds for missing, seconds in zip(blank.tolist(), value.tolist())]
+
+
+def cache_info():
+    """Hit/miss counts for the whole-second format cache"""
+    return _format_whole.cache_info()
+
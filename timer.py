@@ -1,15 +1,37 @@
+import time
+
+# Reference point for --startup-benchmark, taken before any other imports
+_STARTUP_T0 = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk
-from tkinter import filedialog, messagebox
-import time
-import csv
+from tkinter import filedialog, messagebox, simpledialog
 import json
 from datetime import datetime, timedelta
-import pandas as pd
 from pathlib import Path
 import os
-import subprocess
-import win32gui
+import sys
+import argparse
+from timer_engine import Split, TimerEngine
+from stats_store import SleepStatsStore
+from run_history import RunHistory
+from focus_colors import FocusGradient
+from focus_tracker import FocusTimer, create_focus_tracker
+from persistence import DebouncedWriter, atomic_write_json
+from split_log import SplitLog, replay
+from csv_export import write_history_csv, write_run_csv
+from time_codec import format_delta, format_duration
+from template_library import TemplateLibrary, template_splits
+from control_socket import ControlServer, engine_handlers
+from instrumentation import Instrumentation
+from io_service import IOService
+from scheduler import Scheduler
+from split_table import SplitTable
+from split_editor import FIELDS, SplitEditorModel, parse_split_list
+from best_times import BestTimesIndex, best_times_from_history
+
+# Fitbit export with one row of sleep stats per date
+SLEEP_STATS_CSV = r"C:\Users\Kegs\Desktop\fitbit\Data\speedrun_stats.csv"
 
 class Tooltip:
     def __init__(self, widget, text=''):
@@ -42,37 +64,94 @@ class Tooltip:
             self.tooltip.destroy()
             self.tooltip = None
 
-class Split:
-    def __init__(self, name):
-        self.name = name
-        self.split_time = None
-        self.segment_time = None
-        self.best_segment = None
-        self.focus_time = 0  # Total focused time
-        self.focus_window = None  # Window to track
-        self.is_focusing = False  # Currently tracking focus?
-
 class SpeedrunTimerGUI:
 
-    LAST_TEMPLATE_FILE = "last_template_path.txt"
-
-    def __init__(self, root):
+    # Data files live next to this script unless SpeedrunTimerGUI(data_dir=...) says otherwise
+    DATA_DIR = os.path.dirname(os.path.realpath(__file__))
+    LAST_TEMPLATE_FILE = "last_template_path.txt"  # In the working directory by default
+    CURRENT_RUN_FILE = "current_run_state.json"
+    RUN_HISTORY_FILE = "run_history.db"
+    SPLIT_COLUMNS = ("Split Name", "Split Time", "Segment Time", "Best Segment", "Focus Time",
+                     "+/- PB", "+/- Best", "Sum of Best")
+    AUTOSAVE_INTERVAL = 5  # Seconds between current run autosaves while running
+    # Templates longer than this get a windowed splits table: completed splits collapse
+    # into one summary row and only SPLIT_WINDOW rows around the current split exist
+    VIRTUAL_SPLITS_THRESHOLD = 40
+    SPLIT_WINDOW = 24
+    SPLITS_BEFORE_CURRENT = 2
+    EDITOR_ROWS = 16  # Rows the Edit Splits table holds at once, however long the template
+    DONE_ROW = "summary_done"
+    REST_ROW = "summary_rest"
+    # UI-thread callbacks timed into Edit > Diagnostics histograms
+    INSTRUMENTED = ("update_timer", "update_timer_display", "update_splits_display", "update_current_split_row",
+                    "toggle_timer", "start_timer", "stop_timer", "hit_split", "reset_timer",
+                    "update_tick_display", "autosave_current_run", "poll_focus", "on_focus_change",
+                    "poll_control_server")
+    # Golds and PBs per template, as a journal of changes
+    BEST_TIMES_FILE = "best_times.jsonl"
+    SPLIT_LOG_FILE = "split_log.jsonl"
+    TEMPLATE_DIR = "templates"
+    # Optional {"interpolate": bool, "stops": [[percent, "#rrggbb"], ...]} overriding the focus gradient
+    FOCUS_COLORS_FILE = "focus_colors.json"
+    CONTROL_POLL_INTERVAL = 0.1  # Seconds between runs of threaded control commands (no file handlers)
+
+    def __init__(self, root, timings_json=None, data_dir=None, control_address=None):
         self.root = root
+        # Every file the timer reads and writes (templates, run history, logs, settings) goes in data_dir
+        self.data_dir = data_dir or self.DATA_DIR
+        # Files that have always been relative to the working directory stay so without a data_dir
+        self.work_dir = data_dir or ""
+        self.control_address = control_address  # Control socket path or address; False for none
+        # Wrap the hot paths before anything binds them as callbacks
+        self.instruments = Instrumentation()
+        self.instruments.instrument(self, self.INSTRUMENTED)
+        self.timings_json = timings_json  # Write the timing report here on exit
+        self.profiling = tk.BooleanVar(value=False)
         self.always_on_top = tk.BooleanVar(value=False)  # Track always-on-top state
+        self.display_precision = tk.IntVar(value=0)  # Decimal places shown on the timer
+        self.focus_gradient = FocusGradient.load(self.data_path(self.FOCUS_COLORS_FILE))
+        self.blend_focus_colors = tk.BooleanVar(value=self.focus_gradient.interpolate)
+        # Every timed callback (timer ticks, polling, I/O results) goes through one after() timer
+        self.scheduler = Scheduler(self.root, instruments=self.instruments)
         self.root.title("Speedrun Timer")
         self.root.configure(bg="white")
 
-        # Timer variables
-        self.start_time = None
-        self.is_running = False
-        self.current_split_index = 0
-        self.last_split_time = 0
-        self.splits = []
-        self.elapsed_time = 0
+        # Timing state lives in the engine; the GUI only renders it
+        self.engine = TimerEngine()
         self.run_type = "DEFAULT"
+        self.sleep_stats = SleepStatsStore(SLEEP_STATS_CSV)
+        # History is only touched from the I/O thread once the window is up
+        self.run_history = RunHistory(self.data_path(self.RUN_HISTORY_FILE), check_same_thread=False)
+
+        # Focus tracking backend, created on first use
+        self.focus_tracker = None
+        self.focus_timer = None
+
+        # Template and run state writes go through a debounced background writer
+        self.writer = DebouncedWriter()
+        self.io = IOService(self.scheduler)  # Blocking file work, off the Tk thread
+        self.last_autosave = None
+
+        # One file per template plus a manifest; the old single run_templates.json is migrated once
+        self.templates = TemplateLibrary(self.data_path(self.TEMPLATE_DIR))
+        self.templates.migrate_legacy(os.path.join(self.work_dir, 'run_templates.json'))
+        self.template_choice = tk.StringVar()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Rendered state of the splits table: row id -> (values, tags)
+        self.split_rows = {}
+        self.split_row_order = []
+        self.split_row_index = {}  # Row id -> split index, for the rows that exist
+        self.virtual_splits = tk.BooleanVar(value=True)
+        self.split_scroll = 0  # Rows scrolled by hand away from the current split
 
         self.create_menu()
         self.create_gui()
+        self.subscribe_to_engine()
+
+        # Follows every split from here on, so it sees the template load below
+        self.best_times = BestTimesIndex(self.data_path(self.BEST_TIMES_FILE))
+        self.best_times.attach(self.engine, lambda: self.run_type)
         self.update_timer()
 
         # Try to load last exported template
@@ -82,12 +161,226 @@ class SpeedrunTimerGUI:
         else:
             # Load default template as fallback
             self.load_run_template("RIGID_SCHEDULE")
-            self.run_type = "RIGID_SCHEDULE"
+
+        # Pick up a run the process died in the middle of, then log from here on
+        resume_state = replay(self.data_path(self.SPLIT_LOG_FILE))
+        self.split_log = SplitLog(self.data_path(self.SPLIT_LOG_FILE))
+        self.split_log.attach(self.engine, lambda: self.run_type)
+        self.resume_from_split_log(resume_state)
+
+        self.control_server = None
+        if self.control_address is not False:
+            self.start_control_server()
+
+    def data_path(self, name):
+        """Path of one of the timer's data files"""
+        return os.path.join(self.data_dir, name)
+
+    def start_control_server(self):
+        """Accept start/split/undo/skip/reset commands over the local control socket (see timerctl.py)"""
+        handlers = engine_handlers(self.engine)
+        handlers.update({
+            "start": lambda timestamp_ns: self.start_timer(at_ns=timestamp_ns),
+            "stop": lambda timestamp_ns: self.stop_timer(at_ns=timestamp_ns),
+            "reset": lambda timestamp_ns: self.reset_timer()
+        })
+        try:
+            self.control_server = ControlServer(handlers, self.engine.clock, self.control_address)
+        except OSError as e:
+            print(f"Control socket disabled: {str(e)}")
+            return
+
+        # Tk wakes us as soon as a command arrives. Without file handlers (Windows) a thread
+        # waits for commands and stamps them on arrival; they run on the next poll
+        fileno = self.control_server.fileno()
+        try:
+            if fileno is None:
+                raise tk.TclError("no file handlers")
+            self.root.tk.createfilehandler(fileno, tk.READABLE, lambda *args: self.control_server.poll())
+        except (tk.TclError, AttributeError):
+            self.control_server.serve_in_thread()
+            self.scheduler.every("control_server", self.CONTROL_POLL_INTERVAL, self.poll_control_server)
+
+    def poll_control_server(self):
+        self.control_server.drain()
+
+    def resume_from_split_log(self, state):
+        """
+        Rebuild the engine from a replayed split log. A finished run is
+        brought back too (stopped), since it's only recorded in the run
+        history on reset or close.
+        """
+        if not state or (state["current_split_index"] == 0 and not state["is_running"]):
+            self.split_log.truncate()  # Nothing to resume: the next run starts a fresh log
+            return
+
+        try:
+            names = state["names"]
+            splits = self.engine.splits
+            if [split.name for split in splits] != names:
+                splits = [Split(name) for name in names]
+                for split, best in zip(splits, state["best"]):
+                    split.best_segment = best
+
+            for index, (split_time, segment_time, focus_time) in state["splits"].items():
+                split = splits[index]
+                split.split_time = split_time
+                split.segment_time = segment_time
+                split.focus_time = focus_time
+                # Segments after a skipped split span several splits, so they're never golds
+                clean = index == 0 or splits[index - 1].split_time is not None
+                if segment_time is not None and clean and (split.best_segment is None or segment_time < split.best_segment):
+                    split.best_segment = segment_time
+            if state["current_split_index"] < len(splits):
+                splits[state["current_split_index"]].focus_time = state["current_focus_time"]
+
+            if state["run_type"]:
+                self.run_type = state["run_type"]
+            self.engine.restore(
+                state["elapsed_time"],
+                state["current_split_index"],
+                state["last_split_time"],
+                splits,
+                prior_best=state["best"]  # From the log header, so undo restores bests the run beat
+            )
+            self.update_timer_display()
+            if state["is_running"] and not state["finished"]:
+                self.engine.start()
+            print(f"Resumed run from split log at split {state['current_split_index']}")
+
+        except Exception as e:
+            print(f"Error resuming from split log: {str(e)}")
+
+    def subscribe_to_engine(self):
+        """Hook the GUI up to timer engine events"""
+        self.engine.subscribe("started", self.on_timer_started)
+        self.engine.subscribe("stopped", self.on_timer_stopped)
+        self.engine.subscribe("reset", self.on_timer_reset)
+        self.engine.subscribe("tick", self.on_timer_tick)
+        self.engine.subscribe("split", self.on_split)
+        self.engine.subscribe("undo", self.on_split)
+        self.engine.subscribe("skip", self.on_split)
+        self.engine.subscribe("splits_changed", self.on_splits_changed)
+
+    def on_timer_started(self):
+        self.start_button.config(text="Stop")
+        self.split_button.config(state=tk.NORMAL)
+        self.skip_button.config(state=tk.NORMAL)
+        if self.focus_timer:
+            self.focus_timer.resume()
+        self.update_timer()
+
+    def on_timer_stopped(self):
+        self.start_button.config(text="Start")
+        self.split_button.config(state=tk.DISABLED)
+        self.skip_button.config(state=tk.DISABLED)
+        if self.focus_timer:
+            self.focus_timer.pause()
+        self.cancel_timer_update()
+        self.update_timer_display()
+        self.autosave_current_run()
+
+    def on_timer_reset(self):
+        if self.focus_timer and self.focus_timer.split is not None:
+            split = self.focus_timer.split
+            self.stop_focus_tracking()
+            split.focus_time = 0  # Cleared by the reset, but the stop that came with it flushed into it
+        self.last_autosave = None
+        self.comparison_text = None
+        self.update_timer_display()
+        self.update_splits_display()
+
+    def on_timer_tick(self, elapsed_time):
+        if self.focus_timer:
+            self.focus_timer.flush()
+        # Drawn once, after everything else due in this wakeup
+        self.scheduler.after_batch("tick_display", self.update_tick_display)
+
+        if self.last_autosave is None or elapsed_time - self.last_autosave >= self.AUTOSAVE_INTERVAL:
+            self.autosave_current_run()
+
+    def update_tick_display(self):
+        self.update_timer_display()
+        # Only the current split changes between splits
+        self.update_current_split_row()
+
+    def update_timer_display(self):
+        self.timer_display.config(text=self.format_time(self.engine.elapsed_time, self.display_precision.get()))
+        self.update_comparison_display()
+
+    def update_comparison_display(self):
+        """Best possible final time and PB, from the engine's prefix sums"""
+        engine = self.engine
+        comparisons = engine.comparisons
+        current_split = engine.current_split
+        if current_split is None:
+            best_possible = engine.last_split_time if engine.is_finished else None
+        else:
+            best_possible = comparisons.best_possible_time(
+                engine.current_split_index,
+                engine.last_split_time,
+                engine.elapsed_time - engine.last_split_time
+            )
+        text = f"Best possible: {self.format_time(best_possible) or '-'}    PB: {self.format_time(comparisons.pb_time) or '-'}"
+        if text != self.comparison_text:
+            self.comparison_text = text
+            self.comparison_display.config(text=text)
+
+    def on_splits_changed(self):
+        # New or restored splits: the split being tracked may not be current, or not exist, any more
+        if self.focus_timer and self.focus_timer.split is not self.engine.current_split:
+            self.stop_focus_tracking()
+        self.split_scroll = 0  # An offset into the old list may point past the end of the new one
+        self.update_splits_display()
+        self.update_comparison_display()
+
+    def on_split(self, index, split):
+        # Focus is only tracked for the current split
+        self.stop_focus_tracking()
+        self.split_scroll = 0  # Follow the run again
+        self.update_splits_display()
+        self.autosave_current_run()
+
+    def record_run(self, completed):
+        """Append the current run to the run history database (on the I/O thread)"""
+        # Only splits actually hit: the current one only has live partial times, later ones none.
+        # Snapshot now: a reset clears the splits before the worker gets to them
+        elapsed_time = self.engine.elapsed_time
+        splits = self.engine.splits[:self.engine.current_split_index]
+        self.io.submit(
+            self.run_history.record_run, self.run_type, SplitTable.from_splits(splits),
+            completed, elapsed_time, datetime.now() - timedelta(seconds=elapsed_time),
+            on_error=lambda e: print(f"Error recording run history: {str(e)}")
+        )
+
+    def on_close(self):
+        """Flush pending writes before the window goes away"""
+        if self.engine.is_running:
+            self.autosave_current_run()
+        finished = self.engine.is_finished
+        if finished:
+            self.record_run(completed=True)  # Not reset yet, so not recorded yet
+        self.io.shutdown()
+        if finished:
+            self.split_log.truncate()  # Recorded now, so there's nothing to resume
+        self.scheduler.shutdown()
+        self.writer.close()
+        self.split_log.close()
+        self.best_times.close()
+        if self.control_server:
+            self.control_server.close()
+        self.instruments.set_profiling(False)
+        if self.timings_json:
+            try:
+                self.instruments.export_json(self.timings_json)
+            except OSError as e:
+                print(f"Error writing timings: {str(e)}")
+        self.root.destroy()
 
     def save_last_template_path(self, file_path):
         """Save the path of the last exported template"""
         try:
-            with open(self.LAST_TEMPLATE_FILE, 'w') as f:
+            with open(os.path.join(self.work_dir, self.LAST_TEMPLATE_FILE), 'w') as f:
                 f.write(file_path)
         except Exception as e:
             print(f"Error saving last template path: {str(e)}")
@@ -95,8 +388,9 @@ class SpeedrunTimerGUI:
     def get_last_template_path(self):
         """Get the path of the last exported template"""
         try:
-            if os.path.exists(self.LAST_TEMPLATE_FILE):
-                with open(self.LAST_TEMPLATE_FILE, 'r') as f:
+            path = os.path.join(self.work_dir, self.LAST_TEMPLATE_FILE)
+            if os.path.exists(path):
+                with open(path, 'r') as f:
                     path = f.read().strip()
                     if os.path.exists(path):
                         return path
@@ -117,18 +411,33 @@ class SpeedrunTimerGUI:
         file_menu.add_command(label="Export Run Template", command=self.export_run_template)
         file_menu.add_separator()
         file_menu.add_command(label="Export Times to CSV", command=self.export_times_to_csv)
+        file_menu.add_command(label="Export Run History to CSV", command=self.export_history_to_csv)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.on_close)
 
 
+        # Templates Menu (rebuilt from the library manifest each time it opens)
+        self.templates_menu = tk.Menu(menubar, tearoff=0, postcommand=self.build_templates_menu)
+        menubar.add_cascade(label="Templates", menu=self.templates_menu)
+
         # Edit Menu
         edit_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Edit", menu=edit_menu)
         edit_menu.add_command(label="Edit Splits", command=self.edit_splits)
+        edit_menu.add_command(label="Rebuild Best Times from History", command=self.rebuild_best_times)
         edit_menu.add_separator()
         edit_menu.add_command(label="Save Current Run", command=self.save_current_run)
         edit_menu.add_command(label="Load Current Run", command=self.load_current_run)
 
+        diagnostics_menu = tk.Menu(edit_menu, tearoff=0)
+        edit_menu.add_cascade(label="Diagnostics", menu=diagnostics_menu)
+        diagnostics_menu.add_checkbutton(
+            label="Sampling Profiler",
+            variable=self.profiling,
+            command=lambda: self.instruments.set_profiling(self.profiling.get())
+        )
+        diagnostics_menu.add_command(label="Export Timings...", command=self.export_timings)
+
         # Preferences Menu
         preferences_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Preferences", menu=preferences_menu)
@@ -138,13 +447,76 @@ class SpeedrunTimerGUI:
             command=self.toggle_always_on_top
         )
 
+        precision_menu = tk.Menu(preferences_menu, tearoff=0)
+        preferences_menu.add_cascade(label="Timer Precision", menu=precision_menu)
+        for label, places in (("Seconds", 0), ("Tenths", 1), ("Hundredths", 2), ("Milliseconds", 3)):
+            precision_menu.add_radiobutton(
+                label=label,
+                variable=self.display_precision,
+                value=places,
+                command=self.update_timer
+            )
+
+        preferences_menu.add_checkbutton(
+            label="Collapse Long Split Lists",
+            variable=self.virtual_splits,
+            command=self.update_splits_display
+        )
+        preferences_menu.add_checkbutton(
+            label="Blend Focus Colours",
+            variable=self.blend_focus_colors,
+            command=self.toggle_blend_focus_colors
+        )
+
+    def build_templates_menu(self):
+        """List library templates from the manifest without parsing any of them"""
+        menu = self.templates_menu
+        menu.delete(0, tk.END)
+        self.templates.refresh()
+        self.template_choice.set(self.run_type)
+        for name, info in self.templates.entries():
+            menu.add_radiobutton(
+                label=f"{name} ({info['splits']} splits)",
+                variable=self.template_choice,
+                value=name,
+                command=lambda name=name: self.switch_template(name)
+            )
+        if self.templates.names():
+            menu.add_separator()
+        menu.add_command(label="Save Current as Template...", command=self.save_template_as)
+
+    def switch_template(self, template_name):
+        """Load another library template, abandoning the current run"""
+        if self.engine.is_running and not messagebox.askyesno(
+                "Switch Template", "A run is in progress. Reset it and switch templates?"):
+            self.template_choice.set(self.run_type)
+            return
+        self.reset_timer()
+        if not self.load_run_template(template_name):
+            messagebox.showerror("Error", f"Template '{template_name}' could not be loaded")
+
+    def save_template_as(self):
+        name = simpledialog.askstring("Save Template", "Template name:", initialvalue=self.run_type, parent=self.root)
+        if name:
+            self.save_run_template(
+                name,
+                on_done=lambda _: setattr(self, "run_type", name),
+                on_error=lambda e: messagebox.showerror("Error", f"Error saving template: {str(e)}")
+            )
+
     def edit_splits(self):
         edit_window = tk.Toplevel(self.root)
         edit_window.title("Edit Splits")
-        edit_window.geometry("600x400")
+        edit_window.geometry("600x480")
 
-        # Create Treeview for editing
-        edit_tree = ttk.Treeview(edit_window, columns=("Split Name", "Split Time", "Segment Time", "Best Segment"), show="headings")
+        # Edits go to the model; nothing touches the engine until Save Changes
+        model = SplitEditorModel(self.engine.splits)
+
+        # Create Treeview for editing; it only ever holds the EDITOR_ROWS rows in view
+        table_frame = ttk.Frame(edit_window)
+        edit_tree = ttk.Treeview(table_frame, columns=("Split Name", "Split Time", "Segment Time", "Best Segment"),
+                                 show="headings", height=self.EDITOR_ROWS)
+        view_start = 0  # Index in model.rows of the top row shown
 
         for col in ("Split Name", "Split Time", "Segment Time", "Best Segment"):
             edit_tree.heading(col, text=col, anchor="center")
@@ -155,32 +527,54 @@ class SpeedrunTimerGUI:
         button_frame.pack(fill=tk.X, padx=10, pady=5, side=tk.BOTTOM)
 
         # 1. Define all helper functions first
-        def validate_time_format(time_str):
-            if time_str == "":
-                return True
-            try:
-                parts = time_str.split(':')
-                if len(parts) != 3:
-                    return False
-                hours, minutes, seconds = parts
-                hours = int(hours)
-                minutes = int(minutes)
-                seconds = int(seconds)
-                return True
-            except:
-                return False
-
-        def parse_time_to_seconds(time_str):
-            if not time_str or time_str == "":
-                return None
-            try:
-                parts = time_str.split(':')
-                hours = int(parts[0])
-                minutes = int(parts[1])
-                seconds = float(parts[2])
-                return hours * 3600 + minutes * 60 + seconds
-            except:
-                return None
+        def mark_dirty():
+            edit_window.title("Edit Splits *" if model.dirty else "Edit Splits")
+
+        def show_window():
+            rows = model.rows[view_start:view_start + self.EDITOR_ROWS]
+            shown = set(edit_tree.get_children())
+            wanted = {row.iid for row in rows}
+            gone = shown - wanted
+            if gone:
+                edit_tree.delete(*gone)
+            for index, row in enumerate(rows):
+                if row.iid in shown:
+                    edit_tree.item(row.iid, values=row.values())
+                    edit_tree.move(row.iid, "", index)
+                else:
+                    edit_tree.insert("", index, iid=row.iid, values=row.values())
+            total = max(1, len(model.rows))
+            scrollbar.set(view_start / total, min(1.0, (view_start + self.EDITOR_ROWS) / total))
+
+        def scroll_to(start):
+            nonlocal view_start
+            view_start = max(0, min(start, len(model.rows) - self.EDITOR_ROWS))
+            show_window()
+
+        def ensure_visible(index):
+            if index < view_start:
+                scroll_to(index)
+            elif index >= view_start + self.EDITOR_ROWS:
+                scroll_to(index - self.EDITOR_ROWS + 1)
+            else:
+                show_window()
+
+        def on_scrollbar(action, amount, unit=None):
+            if action == "moveto":
+                scroll_to(int(float(amount) * len(model.rows)))
+            else:
+                scroll_to(view_start + int(amount) * (self.EDITOR_ROWS if unit == "pages" else 1))
+
+        def on_mouse_wheel(event):
+            if event.num == 4 or event.delta > 0:
+                scroll_to(view_start - 3)
+            else:
+                scroll_to(view_start + 3)
+            return "break"
+
+        def insert_index():
+            selected = edit_tree.selection()
+            return model.index(selected[-1]) + 1 if selected else len(model.rows)
 
         def on_double_click(event):
             region = edit_tree.identify("region", event.x, event.y)
@@ -203,139 +597,157 @@ class SpeedrunTimerGUI:
             entry = ttk.Entry(edit_tree, width=20)
             entry.place(x=x, y=y, width=w, height=h)
 
-            current_values = edit_tree.item(item)['values']
-            entry.insert(0, current_values[column_index] if current_values[column_index] else "")
+            entry.insert(0, model.row(item).values()[column_index])
             entry.select_range(0, tk.END)
             entry.focus()
 
             def on_entry_complete(event=None):
-                new_value = entry.get()
+                try:
+                    model.set_value(item, FIELDS[column_index], entry.get())
+                except ValueError as e:
+                    messagebox.showerror("Error", f"{str(e)}. Use HH:MM:SS or HH:MM:SS.mmm")
+                    return
 
-                if column_index in [1, 2, 3]:
-                    if new_value and not validate_time_format(new_value):
-                        messagebox.showerror("Error", "Invalid time format. Use HH:MM:SS")
-                        return
-
-                current_values = list(edit_tree.item(item)['values'])
-                current_values[column_index] = new_value
-
-                edit_tree.item(item, values=current_values)
+                edit_tree.item(item, values=model.row(item).values())
                 entry.destroy()
+                mark_dirty()
 
             entry.bind('<Return>', on_entry_complete)
             entry.bind('<FocusOut>', on_entry_complete)
 
         def add_split():
-            split_name = f"New Split {len(self.splits) + 1}"
-            edit_tree.insert("", "end", values=(split_name, "", "", ""))
+            index = insert_index()
+            rows = model.insert([{"name": f"New Split {len(model.rows) + 1}"}], index)
+            ensure_visible(index)
+            edit_tree.selection_set(rows[0].iid)
+            mark_dirty()
 
-        def move_up():
-            selected = edit_tree.selection()
-            if not selected:
+        def add_bulk(text, source):
+            try:
+                records = parse_split_list(text)
+            except ValueError as e:
+                messagebox.showerror("Error", f"Couldn't read splits from {source}: {str(e)}")
+                return
+            if not records:
                 return
+            index = insert_index()
+            rows = model.insert(records, index)
+            ensure_visible(index)
+            edit_tree.selection_set([row.iid for row in rows if edit_tree.exists(row.iid)])
+            mark_dirty()
 
-            for item in selected:
-                idx = edit_tree.index(item)
-                if idx > 0:
-                    values = edit_tree.item(item)['values']
-                    edit_tree.delete(item)
-                    edit_tree.insert("", idx-1, values=values)
-                    edit_tree.selection_set(edit_tree.get_children()[idx-1])
+        def paste_splits(event=None):
+            try:
+                text = edit_window.clipboard_get()
+            except tk.TclError:
+                return
+            add_bulk(text, "the clipboard")
 
-        def move_down():
+        def import_splits():
+            file_path = filedialog.askopenfilename(
+                parent=edit_window,
+                filetypes=[("Split lists", "*.csv *.tsv *.txt *.lss"), ("All Files", "*.*")]
+            )
+            if not file_path:
+                return
+            try:
+                with open(file_path, 'r', encoding='utf-8-sig') as f:
+                    text = f.read()
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to read {file_path}: {str(e)}")
+                return
+            add_bulk(text, os.path.basename(file_path))
+
+        def move(offset):
             selected = edit_tree.selection()
             if not selected:
                 return
-
-            for item in reversed(selected):
-                idx = edit_tree.index(item)
-                if idx < len(edit_tree.get_children()) - 1:
-                    values = edit_tree.item(item)['values']
-                    edit_tree.delete(item)
-                    edit_tree.insert("", idx+1, values=values)
-                    edit_tree.selection_set(edit_tree.get_children()[idx+1])
+            model.move(selected, offset)
+            # Follow the selection off the edge of the window
+            ensure_visible(model.index(selected[0] if offset < 0 else selected[-1]))
+            mark_dirty()
 
         def delete_selected():
-            selected = edit_tree.selection()
-            for item in selected:
-                edit_tree.delete(item)
+            model.delete(edit_tree.selection())
+            scroll_to(view_start)
+            mark_dirty()
 
         def save_changes():
-            self.splits.clear()
-            for item in edit_tree.get_children():
-                values = edit_tree.item(item)['values']
-                split = Split(values[0])
-
-                if values[1]:  # Split Time
-                    try:
-                        time_parts = values[1].split(':')
-                        hours = int(time_parts[0])
-                        minutes = int(time_parts[1])
-                        seconds = float(time_parts[2])
-                        split.split_time = hours * 3600 + minutes * 60 + seconds
-                    except:
-                        split.split_time = None
-
-                if values[2]:  # Segment Time
-                    try:
-                        time_parts = values[2].split(':')
-                        hours = int(time_parts[0])
-                        minutes = int(time_parts[1])
-                        seconds = float(time_parts[2])
-                        split.segment_time = hours * 3600 + minutes * 60 + seconds
-                    except:
-                        split.segment_time = None
-
-                if values[3]:  # Best Segment
-                    try:
-                        time_parts = values[3].split(':')
-                        hours = int(time_parts[0])
-                        minutes = int(time_parts[1])
-                        seconds = float(time_parts[2])
-                        split.best_segment = hours * 3600 + minutes * 60 + seconds
-                    except:
-                        split.best_segment = None
-
-                self.splits.append(split)
-
-            self.update_splits_display()
+            # Only changed rows are written back; untouched splits keep their focus data and full precision
+            if model.dirty:
+                try:
+                    model.apply(self.engine)
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e), parent=edit_window)
+                    return
             edit_window.destroy()
 
         # 2. Bind events
         edit_tree.bind('<Double-1>', on_double_click)
+        edit_window.bind('<Control-v>', paste_splits)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            edit_tree.bind(sequence, on_mouse_wheel)
 
         # 3. Populate tree
-        for item in edit_tree.get_children():
-            edit_tree.delete(item)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=on_scrollbar)
+        show_window()
 
-        for split in self.splits:
-            edit_tree.insert("", "end", values=(
-                split.name,
-                self.format_time(split.split_time) if split.split_time is not None else "",
-                self.format_time(split.segment_time) if split.segment_time is not None else "",
-                self.format_time(split.best_segment) if split.best_segment is not None else ""
-            ))
-
-        edit_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        edit_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         # 4. Create all buttons
         add_button = ttk.Button(button_frame, text="➕", width=3, command=add_split)
         add_button.pack(side=tk.LEFT, padx=2)
 
-        up_button = ttk.Button(button_frame, text="↑", width=3, command=move_up)
+        up_button = ttk.Button(button_frame, text="↑", width=3, command=lambda: move(-1))
         up_button.pack(side=tk.LEFT, padx=2)
 
-        down_button = ttk.Button(button_frame, text="↓", width=3, command=move_down)
+        down_button = ttk.Button(button_frame, text="↓", width=3, command=lambda: move(1))
         down_button.pack(side=tk.LEFT, padx=2)
 
         delete_button = ttk.Button(button_frame, text="🗑️", width=3, command=delete_selected)
         delete_button.pack(side=tk.LEFT, padx=2)
 
+        paste_button = ttk.Button(button_frame, text="Paste", command=paste_splits)
+        paste_button.pack(side=tk.LEFT, padx=2)
+
+        import_button = ttk.Button(button_frame, text="Import...", command=import_splits)
+        import_button.pack(side=tk.LEFT, padx=2)
+
         save_button = ttk.Button(button_frame, text="Save Changes", command=save_changes)
         save_button.pack(side=tk.RIGHT, pady=10, padx=10)
 
-    def update_best_segments(self, template_file_path):
-        """Update best segments in the template file if they're different"""
+    def rebuild_best_times(self):
+        """Recompute the template's best segments and PB splits from the run history (on the I/O thread)"""
+        run_type = self.run_type
+        names = [split.name for split in self.engine.splits]
+
+        def rebuild():
+            return best_times_from_history(self.run_history.split_table(run_type, clean=True), names)
+
+        def on_done(bests):
+            if run_type != self.run_type or names != [split.name for split in self.engine.splits]:
+                return  # Another template was loaded meanwhile
+            updated = 0
+            for split in self.engine.splits:
+                best, pb = bests[split.name]
+                if best is not None and best != split.best_segment:
+                    split.best_segment = best
+                    updated += 1
+                if pb is not None and pb != split.pb_split:
+                    split.pb_split = pb
+                    updated += 1
+            if updated:
+                self.engine.splits_edited()
+            messagebox.showinfo("Success", f"Best times rebuilt from history ({updated} updated)")
+
+        self.io.submit(rebuild, on_done=on_done,
+                       on_error=lambda e: messagebox.showerror("Error", f"Error rebuilding best times: {str(e)}"))
+
+    @staticmethod
+    def update_best_segments(template_file_path, segment_times):
+        """Write faster segments into the template file as new best segments (safe to run on the I/O thread)"""
         try:
             with open(template_file_path, 'r') as f:
                 template_data = json.load(f)
@@ -343,17 +755,16 @@ class SpeedrunTimerGUI:
             template_splits = template_data["Current_Template"]["splits"]
             updated = False
 
-            for i, split in enumerate(self.splits):
-                if split.segment_time is not None:
+            for i, segment_time in enumerate(segment_times):
+                if segment_time is not None:
                     current_best = template_splits[i].get("best_segment")
-                    # Update if the segment time is different from current best
-                    if current_best != split.segment_time:
-                        template_splits[i]["best_segment"] = split.segment_time
+                    # Only a faster segment is a new best
+                    if current_best is None or segment_time < current_best:
+                        template_splits[i]["best_segment"] = segment_time
                         updated = True
 
             if updated:
-                with open(template_file_path, 'w') as f:
-                    json.dump(template_data, f, indent=4)
+                atomic_write_json(template_file_path, template_data)
                 return True
             return False
 
@@ -370,37 +781,68 @@ class SpeedrunTimerGUI:
                 title="Import Run Template"
             )
 
-        if file_path:
+        if not file_path:
+            return
+
+        if file_path == self.get_last_template_path():
+            # Auto-load at startup: the run log is replayed against it straight afterwards
             try:
                 with open(file_path, 'r') as f:
-                    templates = json.load(f)
-
-                self.splits.clear()
-
-                # Set run_type based on the file name
-                self.run_type = Path(file_path).stem  # Gets filename without extension
-
-                if isinstance(templates, dict):
-                    template_data = templates.get("Current_Template", {})
-                    if isinstance(template_data, dict):
-                        splits_data = template_data.get("splits", [])
-                        for split_data in splits_data:
-                            split = Split(split_data["name"])
-                            split.best_segment = split_data.get("best_segment")
-                            self.splits.append(split)
-                    else:
-                        # Handle old format for backward compatibility
-                        self.splits = [Split(name) for name in template_data]
-
-                self.update_splits_display()
-                self.reset_timer()
-                if file_path == self.get_last_template_path():
-                    print("Last template loaded successfully")
-                else:
-                    messagebox.showinfo("Success", "Template loaded successfully")
-
+                    self.apply_imported_template(file_path, json.load(f))
+                print("Last template loaded successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Error loading template: {str(e)}")
+            return
+
+        def read_and_store():
+            with open(file_path, 'r') as f:
+                templates = json.load(f)
+            # Keep a copy in the library so it can be switched to from the Templates menu
+            self.templates.save(Path(file_path).stem, templates)
+            return templates
+
+        def on_done(templates):
+            self.apply_imported_template(file_path, templates)
+            messagebox.showinfo("Success", "Template loaded successfully")
+
+        self.io.submit(read_and_store, on_done=on_done,
+                       on_error=lambda e: messagebox.showerror("Error", f"Error loading template: {str(e)}"))
+
+    def apply_imported_template(self, file_path, templates):
+        # Records the run on the old template first
+        self.reset_timer()
+        # Set run_type based on the file name
+        self.run_type = Path(file_path).stem  # Gets filename without extension
+        self.engine.set_splits(self.splits_from_template(templates))
+
+    def splits_from_template(self, template):
+        """
+        Build fresh Split objects from template data (handles the old
+        list-of-names format). Best and PB times recorded for the current
+        run type replace the template's own.
+        """
+        splits = []
+        for split_data in template_splits(template):
+            split = Split(split_data["name"], split_data.get("group") or ())
+            split.best_segment = split_data.get("best_segment")
+            split.pb_split = split_data.get("pb_split")
+            splits.append(split)
+        self.best_times.overlay(self.run_type, splits)
+        return splits
+
+    def current_template(self):
+        return {
+            "Current_Template": {
+                "splits": [
+                    {
+                        "name": split.name,
+                        "best_segment": split.best_segment,
+                        "pb_split": split.pb_split,
+                        **({"group": list(split.group)} if split.group else {})
+                    } for split in self.engine.splits
+                ]
+            }
+        }
 
     def export_run_template(self):
         """Export current run template to a JSON file"""
@@ -411,28 +853,15 @@ class SpeedrunTimerGUI:
         )
 
         if file_path:
-            try:
-                template_data = {
-                    "Current_Template": {
-                        "splits": [
-                            {
-                                "name": split.name,
-                                "best_segment": split.best_segment
-                            } for split in self.splits
-                        ]
-                    }
-                }
-
-                with open(file_path, 'w') as f:
-                    json.dump(template_data, f, indent=4)
+            template = self.current_template()
 
+            def write():
+                atomic_write_json(file_path, template)
                 # Save the path of the exported template
-                self.save_last_template_path(file_path)  # Changed this line to use self
+                self.save_last_template_path(file_path)
 
-                messagebox.showinfo("Success", "Template exported successfully")
-
-            except Exception as e:
-                messagebox.showerror("Error", f"Error exporting template: {str(e)}")
+            self.io.submit(write, on_done=lambda _: messagebox.showinfo("Success", "Template exported successfully"),
+                           on_error=lambda e: messagebox.showerror("Error", f"Error exporting template: {str(e)}"))
 
     def create_gui(self):
         style = ttk.Style()
@@ -449,6 +878,10 @@ class SpeedrunTimerGUI:
         )
         self.timer_display.pack(pady=10)
 
+        self.comparison_text = None
+        self.comparison_display = tk.Label(self.root, text="", font=("Segoe UI Variable", 10), fg="gray25", bg="white")
+        self.comparison_display.pack()
+
         button_frame = tk.Frame(self.root, bg="white")
         button_frame.pack(pady=5)
 
@@ -456,6 +889,10 @@ class SpeedrunTimerGUI:
         self.start_button.pack(side=tk.LEFT, padx=5)
         self.split_button = ttk.Button(button_frame, text="Split", command=self.hit_split, state=tk.DISABLED)
         self.split_button.pack(side=tk.LEFT, padx=5)
+        self.undo_button = ttk.Button(button_frame, text="Undo", command=self.engine.undo_split)
+        self.undo_button.pack(side=tk.LEFT, padx=5)
+        self.skip_button = ttk.Button(button_frame, text="Skip", command=self.engine.skip_split, state=tk.DISABLED)
+        self.skip_button.pack(side=tk.LEFT, padx=5)
         self.reset_button = ttk.Button(button_frame, text="Reset", command=self.reset_timer)
         self.reset_button.pack(side=tk.LEFT, padx=5)
 
@@ -464,118 +901,106 @@ class SpeedrunTimerGUI:
 
         self.splits_tree = ttk.Treeview(
             splits_frame,
-            columns=("Split Name", "Split Time", "Segment Time", "Best Segment", "Focus Time"),
+            columns=self.SPLIT_COLUMNS,
             show="headings"
         )
 
         # Set all headings and columns to center
-        for col in ("Split Name", "Split Time", "Segment Time", "Best Segment", "Focus Time"):
+        for col in self.SPLIT_COLUMNS:
             self.splits_tree.heading(col, text=col, anchor="center")
             self.splits_tree.column(col, anchor="center", width=120)
 
+        # One shared tag per gradient colour, registered once
+        self.focus_gradient.register(self.splits_tree)
+
+        self.splits_tree.tag_configure("summary", foreground="gray40")
+        self.splits_tree.tag_configure("group", font=("Segoe UI Variable", 10, "bold"))
+
         self.splits_tree.pack(fill=tk.BOTH, expand=True)
         self.splits_tree.bind('<Button-1>', self.handle_focus_click)
+        # In windowed mode the wheel moves the window itself
+        self.splits_tree.bind('<MouseWheel>', lambda e: self.scroll_splits(-1 if e.delta > 0 else 1))
+        self.splits_tree.bind('<Button-4>', lambda e: self.scroll_splits(-1))
+        self.splits_tree.bind('<Button-5>', lambda e: self.scroll_splits(1))
 
     def toggle_timer(self):
-        if not self.is_running:
+        if not self.engine.is_running:
             self.start_timer()
         else:
             self.stop_timer()
 
-    def start_timer(self):
+    def start_timer(self, at_ns=None):
         """Start the timer and handle automatic first split if it's wake-up time"""
-        self.is_running = True
-        current_time = datetime.now().time()
+        engine = self.engine
+        started_at = datetime.now()
 
         # Check if this is the first split and if it's wake-up related
-        if (self.current_split_index == 0 and
-            any(name in self.splits[0].name.lower() for name in ["wake", "get up", "wakeup"])):
-
-            try:
-                # Use the hardcoded path to get wake time
-                csv_path = r"C:\Users\Kegs\Desktop\fitbit\Data\speedrun_stats.csv"
-                df = pd.read_csv(csv_path)
-
-                # Get today's date and wake time
-                today = datetime.now().strftime('%Y-%m-%d')
-                today_data = df[df['Date'] == today]
-
-                if not today_data.empty:
-                    wake_time_str = today_data['Wake Time'].iloc[0]
-                    wake_time = datetime.strptime(wake_time_str, '%I:%M %p').time()
-
-                    # Calculate time difference
-                    wake_datetime = datetime.combine(datetime.now().date(), wake_time)
-                    current_datetime = datetime.combine(datetime.now().date(), current_time)
-                    time_diff = (current_datetime - wake_datetime).total_seconds()
-
-                    # Automatically complete first split
-                    self.splits[0].split_time = time_diff
-                    self.splits[0].segment_time = time_diff
-                    self.last_split_time = time_diff
-                    self.current_split_index = 1
-                    self.update_splits_display()
-
-                    # Important: Set elapsed_time to match the time difference
-                    self.elapsed_time = time_diff
-                    
-                    self.update_splits_display()
-                    print(f"Auto-completed first split: {time_diff} seconds since wake-up")
-                else:
-                    print(f"No wake time data found for today ({today})")
-
-            except Exception as e:
-                print(f"Error processing wake time: {str(e)}")
-
-        self.start_time = time.time() - self.elapsed_time
-        self.start_button.config(text="Stop")
-        self.split_button.config(state=tk.NORMAL)
-
-    def stop_timer(self):
-        self.is_running = False
-        self.start_button.config(text="Start")
-        self.split_button.config(state=tk.DISABLED)
+        auto_split = (engine.current_split_index == 0 and engine.splits and not engine.is_running and
+                      any(name in engine.splits[0].name.lower() for name in ["wake", "get up", "wakeup"]))
+
+        engine.start(at_ns=at_ns)
+
+        if auto_split:
+            # Reading the sleep stats CSV can block, so it happens on the I/O thread
+            today = started_at.strftime('%Y-%m-%d')
+            self.io.submit(self.sleep_stats.wake_time, today,
+                           on_done=lambda wake_time: self.apply_wake_split(wake_time, started_at),
+                           on_error=lambda e: print(f"Error processing wake time: {str(e)}"))
+
+    def apply_wake_split(self, wake_time, started_at):
+        """Complete the first split at the time between waking up and pressing Start"""
+        engine = self.engine
+        if wake_time is None:
+            print(f"No wake time data found for today ({started_at.strftime('%Y-%m-%d')})")
+            return
+        if engine.current_split_index != 0:
+            return  # Split by hand while the CSV was being read
+
+        wake_datetime = datetime.combine(started_at.date(), wake_time)
+        time_diff = (started_at - wake_datetime).total_seconds()
+
+        # Split as if it had happened before Start, then carry on with the time run since.
+        # Stopping and restarting around it keeps the split log replayable.
+        now_ns = engine.clock()
+        was_running = engine.is_running
+        engine.stop(at_ns=now_ns)
+        running_for = engine.elapsed_time
+        engine.split(at=time_diff)
+        if not engine.is_finished:
+            engine.elapsed_time = time_diff + running_for
+            if was_running:
+                engine.start(at_ns=now_ns)
+        print(f"Auto-completed first split: {time_diff} seconds since wake-up")
+
+    def stop_timer(self, at_ns=None):
+        self.engine.stop(at_ns=at_ns)
 
     def reset_timer(self):
-        self.stop_timer()
-        self.elapsed_time = 0
-        self.current_split_index = 0
-        self.last_split_time = 0
-        self.timer_display.config(text="00:00:00.000")
-        self.clear_splits_display()
-        self.update_splits_display()
+        # Finished runs are only recorded here, so a misclicked final split can still be undone;
+        # a run abandoned part-way through is history too
+        if self.engine.current_split_index > 0:
+            self.record_run(completed=self.engine.is_finished)
+        self.engine.reset()
 
     def update_timer(self):
-        if self.is_running:
-            self.elapsed_time = time.time() - self.start_time
-            self.timer_display.config(text=self.format_time(self.elapsed_time))
-            
-            # Always update the current split's split_time and segment_time
-            if self.current_split_index < len(self.splits):
-                current_split = self.splits[self.current_split_index]
-                current_split.split_time = self.elapsed_time
-
-                # Added lines to keep segment_time updated in real-time
-                # This ensures the "Segment Time" column displays the current segment duration
-                if self.current_split_index == 0:
-                    current_split.segment_time = self.elapsed_time
-                else:
-                    current_split.segment_time = (
-                        self.elapsed_time - self.splits[self.current_split_index - 1].split_time
-                    )
+        """Tick the engine and sleep until the displayed time would next change"""
+        self.cancel_timer_update()
+        if not self.engine.is_running:
+            self.update_timer_display()
+            return
 
-                self.update_splits_display()
+        self.engine.tick()
 
-        # Keep calling update_timer periodically
-        self.root.after(1000, self.update_timer)
+        # Wake on the next display boundary (e.g. the next whole second) rather than polling
+        delay = self.engine.next_display_change(self.display_precision.get())
+        self.scheduler.call_later("timer", max(0.001, delay), self.update_timer)
 
-    def format_time(self, seconds):
-        if seconds is None:
-            return ""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = int(seconds % 60)  # Changed to int() to remove decimals
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"  # Removed .3f format
+    def cancel_timer_update(self):
+        self.scheduler.cancel("timer")
+
+    def format_time(self, seconds, precision=0):
+        """Format seconds as HH:MM:SS, with `precision` truncated decimal places"""
+        return format_duration(seconds, precision)
 
     def format_focus_cell(self, split):
         """
@@ -599,86 +1024,199 @@ class SpeedrunTimerGUI:
         return f"{focus_time_str}/{focus_pct_str}"
 
     def hit_split(self):
-        if self.current_split_index >= len(self.splits):
-            return
-
-        split = self.splits[self.current_split_index]
-        current_time = self.elapsed_time
-
-        split.split_time = current_time
-        split.segment_time = current_time - self.last_split_time
-
-        if split.best_segment is None or split.segment_time < split.best_segment:
-            split.best_segment = split.segment_time
-
-        self.last_split_time = current_time
-        self.current_split_index += 1
-
-        self.update_splits_display()
-
-        if self.current_split_index >= len(self.splits):
-            self.stop_timer()
+        self.engine.split()
 
     def load_run_template(self, template_name):
-        try:
-            with open('run_templates.json', 'r') as f:
-                templates = json.load(f)
-                if template_name in templates:
-                    self.splits = [Split(name) for name in templates[template_name]]
-                    self.update_splits_display()
-                    return True
-        except FileNotFoundError:
-            self.splits = [
-                Split("Wake Up"),
-                Split("Brush Teeth"),
-                Split("Breakfast"),
-                Split("Work Start")
-            ]
-            self.save_run_template(template_name)
-            self.update_splits_display()
-        return False
-
-    def save_run_template(self, template_name):
-        templates = {}
-        try:
-            with open('run_templates.json', 'r') as f:
-                templates = json.load(f)
-        except FileNotFoundError:
-            pass
+        """Load a template from the library; only that template's file is parsed"""
+        if template_name in self.templates:
+            try:
+                template = self.templates.load(template_name)
+                self.reset_timer()  # A run can't carry on against another template
+                self.run_type = template_name
+                self.engine.set_splits(self.splits_from_template(template))
+                return True
+            except Exception as e:
+                print(f"Error loading template {template_name}: {str(e)}")
+                return False
 
-        templates[template_name] = [split.name for split in self.splits]
+        self.reset_timer()
+        self.run_type = template_name
+        self.engine.set_splits([
+            Split("Wake Up"),
+            Split("Brush Teeth"),
+            Split("Breakfast"),
+            Split("Work Start")
+        ])
+        self.save_run_template(template_name)
+        return False
 
-        with open('run_templates.json', 'w') as f:
-            json.dump(templates, f, indent=4)
+    def save_run_template(self, template_name, on_done=None, on_error=None):
+        """Write the current splits to the library as `template_name`, on the I/O thread"""
+        self.io.submit(self.templates.save, template_name, self.current_template(),
+                       on_done=on_done, on_error=on_error)
 
     def clear_splits_display(self):
         for item in self.splits_tree.get_children():
             self.splits_tree.delete(item)
+        self.split_rows.clear()
+        self.split_row_order = []
+        self.split_row_index = {}
+
+    def format_delta(self, seconds):
+        """Signed HH:MM:SS for comparison columns"""
+        return format_delta(seconds)
+
+    def split_row(self, index, split):
+        """Return the (values, tags) a split's row should currently show"""
+        tags = ()
+        if split.focus_time and split.segment_time:
+            percentage = (split.focus_time / split.segment_time) * 100
+            tags = (self.focus_gradient.tag(percentage),)
+
+        # Comparisons only apply to splits that are done or in progress
+        comparisons = self.engine.comparisons
+        pb_delta = best_delta = None
+        if index <= self.engine.current_split_index:
+            pb_delta = comparisons.pb_delta(index, split.split_time)
+            best_delta = comparisons.best_delta(index, split.segment_time)
+
+        values = (
+            "    " * len(split.group) + split.name,  # Indent sub-splits under their group
+            self.format_time(split.split_time) if split.split_time is not None else "",
+            self.format_time(split.segment_time) if split.segment_time is not None else "",
+            self.format_time(split.best_segment) if split.best_segment is not None else "",
+            self.format_focus_cell(split),
+            self.format_delta(pb_delta),
+            self.format_delta(best_delta),
+            self.format_time(comparisons.sum_of_best(0, index + 1))
+        )
+        return values, tags
+
+    def update_current_split_row(self):
+        """Re-render just the current split's row (the per-tick fast path)"""
+        index = self.engine.current_split_index
+        if index >= len(self.engine.splits):
+            return
+        split = self.engine.splits[index]
+        rendered = self.split_rows.get(split.row_id)
+        if rendered is None:
+            self.update_splits_display()
+            return
+        row = self.split_row(index, split)
+        if row != rendered:
+            self.splits_tree.item(split.row_id, values=row[0], tags=row[1])
+            self.split_rows[split.row_id] = row
+
+    def visible_split_range(self):
+        """(start, end) of the splits that get rows: all of them, or a window near the current split"""
+        count = len(self.engine.splits)
+        if not self.virtual_splits.get() or count <= self.VIRTUAL_SPLITS_THRESHOLD:
+            return 0, count
+        start = self.engine.current_split_index - self.SPLITS_BEFORE_CURRENT + self.split_scroll
+        start = max(0, min(start, count - self.SPLIT_WINDOW))
+        return start, min(count, start + self.SPLIT_WINDOW)
+
+    def summary_row(self, start, end):
+        """(values, tags) of a row standing in for splits [start, end) outside the window"""
+        engine = self.engine
+        comparisons = engine.comparisons
+        if start == 0:
+            # Everything before the window: where the run stood at the last of them
+            last = engine.splits[end - 1]
+            values = (
+                f"▸ {end} earlier splits",
+                self.format_time(last.split_time) if last.split_time is not None else "",
+                "", "", "",
+                self.format_delta(comparisons.pb_delta(end - 1, last.split_time)),
+                "",
+                self.format_time(comparisons.sum_of_best(0, end))
+            )
+        else:
+            values = (f"▸ {end - start} more splits", "", "", "", "", "", "",
+                      self.format_time(comparisons.sum_of_best(0, end)))
+        return values, ("summary",)
+
+    def group_row(self, path, start, end):
+        """(values, tags) of the header row over sub-split group `path`, covering splits [start, end)"""
+        engine = self.engine
+        comparisons = engine.comparisons
+        group_time = engine.group_time(start, end)
+        best = comparisons.sum_of_best(start, end)
+        split_time = engine.splits[end - 1].split_time if group_time is not None else None
+        values = (
+            "    " * (len(path) - 1) + "▾ " + path[-1],
+            self.format_time(split_time) if split_time is not None else "",
+            self.format_time(group_time) if group_time is not None else "",
+            self.format_time(best) if best is not None else "",
+            "",
+            self.format_delta(comparisons.pb_delta(end - 1, split_time)),
+            self.format_delta(group_time - best if group_time is not None and best is not None else None),
+            self.format_time(comparisons.sum_of_best(0, end))
+        )
+        return values, ("group",)
+
+    def displayed_rows(self):
+        """[(row id, (values, tags))] the splits table should show, in order"""
+        splits = self.engine.splits
+        start, end = self.visible_split_range()
+        rows = []
+        if start > 0:
+            rows.append((self.DONE_ROW, self.summary_row(0, start)))
+        # A header row over each sub-split group, just above its first split
+        groups = {}
+        for path, group_start, group_end in self.engine.group_ranges():
+            if start <= group_start < end:
+                groups.setdefault(group_start, []).append((path, group_start, group_end))
+        for index in range(start, end):
+            for path, group_start, group_end in groups.get(index, ()):
+                rows.append((f"group_{group_start}_{len(path)}", self.group_row(path, group_start, group_end)))
+            rows.append((splits[index].row_id, self.split_row(index, splits[index])))
+        if end < len(splits):
+            rows.append((self.REST_ROW, self.summary_row(end, len(splits))))
+        self.split_row_index = {splits[index].row_id: index for index in range(start, end)}
+        return rows
 
     def update_splits_display(self):
-        self.clear_splits_display()
-        for i, split in enumerate(self.splits):
-            # Optionally, set a background color based on focus percentage if desired.
-            bg_color = "white"
-            if split.focus_time and split.segment_time:
-                percentage = (split.focus_time / split.segment_time) * 100
-                bg_color = self.get_focus_color(percentage)
-            
-            # Get the composite Focus Time string
-            focus_cell_text = self.format_focus_cell(split)
-            
-            item = self.splits_tree.insert("", "end", values=(
-                split.name,
-                self.format_time(split.split_time) if split.split_time is not None else "",
-                self.format_time(split.segment_time) if split.segment_time is not None else "",
-                self.format_time(split.best_segment) if split.best_segment is not None else "",
-                focus_cell_text
-            ))
-            
-            # Set background color for the row (if needed)
-            if split.focus_time and split.segment_time:
-                self.splits_tree.tag_configure(f'focus_color_{i}', background=bg_color)
-                self.splits_tree.item(item, tags=(f'focus_color_{i}',))
+        """Diff the wanted rows against the rendered ones and only touch what changed"""
+        rows = self.displayed_rows()
+        order = [row_id for row_id, _ in rows]
+
+        # Drop rows that are gone (deleted splits, or scrolled out of the window)
+        if len(self.split_rows) != len(order) or self.split_row_order != order:
+            wanted = set(order)
+            for row_id in [r for r in self.split_rows if r not in wanted]:
+                self.splits_tree.delete(row_id)
+                del self.split_rows[row_id]
+
+        for index, (row_id, row) in enumerate(rows):
+            rendered = self.split_rows.get(row_id)
+            if rendered is None:
+                self.splits_tree.insert("", index, iid=row_id, values=row[0], tags=row[1])
+            elif rendered != row:
+                self.splits_tree.item(row_id, values=row[0], tags=row[1])
+            self.split_rows[row_id] = row
+
+        # Reorder only when the row order itself changed
+        if self.split_row_order != order:
+            for index, row_id in enumerate(order):
+                self.splits_tree.move(row_id, "", index)
+            self.split_row_order = order
+
+            # Keep the current split in view
+            current = self.engine.current_split
+            if current is not None and current.row_id in self.split_rows and not self.split_scroll:
+                self.splits_tree.see(current.row_id)
+
+    def scroll_splits(self, rows):
+        """Move the split window by `rows` (windowed mode only; otherwise let Tk scroll)"""
+        start, end = self.visible_split_range()
+        if end - start == len(self.engine.splits):
+            return None
+        # Keep the window inside the template
+        base = self.engine.current_split_index - self.SPLITS_BEFORE_CURRENT
+        self.split_scroll = max(-base, min(self.split_scroll + rows, len(self.engine.splits) - self.SPLIT_WINDOW - base))
+        self.update_splits_display()
+        return "break"
 
     def export_times_to_csv(self):
         """
@@ -695,67 +1233,83 @@ class SpeedrunTimerGUI:
             initialfile=default_filename
         )
 
-        if file_path:
-            try:
-                with open(file_path, 'w', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['Run Type', self.run_type])
-                    writer.writerow(['Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
-                    writer.writerow([])
-                    # Added "Focus %" column here
-                    writer.writerow(['Split Name', 'Split Time', 'Segment Time', 'Best Segment', 'Focus Time', 'Focus %'])
-
-                    for split in self.splits:
-                        # Calculate focus percentage if both focus_time and segment_time exist and segment_time > 0
-                        focus_pct = ""
-                        if split.focus_time and split.segment_time and split.segment_time > 0:
-                            pct_value = (split.focus_time / split.segment_time) * 100
-                            focus_pct = f"{pct_value:.1f}%"
-
-                        writer.writerow([
-                            split.name,
-                            self.format_time(split.split_time) if split.split_time is not None else "",
-                            self.format_time(split.segment_time) if split.segment_time is not None else "",
-                            self.format_time(split.best_segment) if split.best_segment is not None else "",
-                            self.format_time(split.focus_time) if split.focus_time else "",
-                            focus_pct  # Added Focus %
-                        ])
-
-                # Then, ask user if they want to update the template with new best segments
-                if messagebox.askyesno("Update Best Segments", "Would you like to update the template with any new best segments?"):
-                    template_file = filedialog.askopenfilename(
-                        defaultextension=".json",
-                        filetypes=[("JSON files", "*.json")],
-                        title="Select Template to Update"
-                    )
-                    if template_file:
-                        if self.update_best_segments(template_file):
-                            messagebox.showinfo("Success", "Times exported and best segments updated successfully")
-                        else:
-                            messagebox.showinfo("Success", "Times exported (no new best segments)")
-                    else:
-                        messagebox.showinfo("Success", "Times exported successfully")
+        if not file_path:
+            return
+
+        # The worker writes a snapshot, so the run can carry on meanwhile
+        splits = SplitTable.from_splits(self.engine.splits)
+        run_type = self.run_type
+        date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        def write():
+            with open(file_path, 'w', newline='') as f:
+                write_run_csv(f, run_type, date, splits)
+
+        def on_best_segments_updated(updated):
+            if updated:
+                messagebox.showinfo("Success", "Times exported and best segments updated successfully")
+            else:
+                messagebox.showinfo("Success", "Times exported (no new best segments)")
+
+        def on_written(_):
+            # Then, ask user if they want to update the template with new best segments
+            if messagebox.askyesno("Update Best Segments", "Would you like to update the template with any new best segments?"):
+                template_file = filedialog.askopenfilename(
+                    defaultextension=".json",
+                    filetypes=[("JSON files", "*.json")],
+                    title="Select Template to Update"
+                )
+                if template_file:
+                    segment_times = [split.segment_time for split in splits]
+                    self.io.submit(self.update_best_segments, template_file, segment_times,
+                                   on_done=on_best_segments_updated)
                 else:
                     messagebox.showinfo("Success", "Times exported successfully")
+            else:
+                messagebox.showinfo("Success", "Times exported successfully")
 
-            except Exception as e:
-                messagebox.showerror("Error", f"Error exporting times: {str(e)}")
+        self.io.submit(write, on_done=on_written,
+                       on_error=lambda e: messagebox.showerror("Error", f"Error exporting times: {str(e)}"))
+
+    def export_history_to_csv(self):
+        """Stream every run in the history database to a CSV (or .csv.gz) file"""
+        current_date = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("Compressed CSV files", "*.csv.gz"), ("All files", "*.*")],
+            title="Export Run History to CSV",
+            initialfile=f"speedrun_history_{current_date}.csv"
+        )
+
+        if not file_path:
+            return
+        numeric = messagebox.askyesno("Numeric Columns",
+            "Also include split/segment/focus times as plain seconds?\n(Easier for spreadsheets and scripts)")
+
+        title = self.root.title()
+
+        def on_progress(runs):
+            self.root.title(f"{title} - exporting history ({runs} runs)")
+
+        def on_done(runs):
+            self.root.title(title)
+            messagebox.showinfo("Success", f"Exported {runs} runs")
+
+        def on_error(e):
+            self.root.title(title)
+            messagebox.showerror("Error", f"Error exporting run history: {str(e)}")
+
+        self.io.submit(lambda progress: write_history_csv(file_path, self.run_history.iter_split_rows(),
+                                                          numeric=numeric, progress=progress),
+                       on_done=on_done, on_error=on_error, on_progress=on_progress)
 
     def get_todays_wake_time(self):
         """Read today's wake time from speedrun_stats.csv"""
         try:
-            # Hardcoded path to CSV
-            csv_path = r"C:\Users\Kegs\Desktop\fitbit\Data\speedrun_stats.csv"
-
-            df = pd.read_csv(csv_path)
-
             # Get today's date in the same format as CSV
             today = datetime.now().strftime('%Y-%m-%d')
-            today_data = df[df['Date'] == today]
-
-            if not today_data.empty:
-                wake_time_str = today_data['Wake Time'].iloc[0]  # Format: '06:17 AM'
-                wake_time = datetime.strptime(wake_time_str, '%I:%M %p').time()
+            wake_time = self.sleep_stats.wake_time(today)  # Format in CSV: '06:17 AM'
+            if wake_time is not None:
                 return wake_time
 
             print(f"No data found for today ({today})")
@@ -765,73 +1319,108 @@ class SpeedrunTimerGUI:
             print(f"Error reading wake time: {str(e)}")
             return None
 
-    def save_current_run(self):
-        """Save the current run state to a JSON file"""
-        try:
-            current_state = {
-                "elapsed_time": self.elapsed_time,
-                "current_split_index": self.current_split_index,
-                "last_split_time": self.last_split_time,
-                "run_type": self.run_type,
-                "splits": []
-            }
-
-            # Save each split's current state
-            for split in self.splits:
-                split_data = {
+    def current_run_state(self):
+        """Snapshot of the current run as plain JSON data"""
+        return {
+            "elapsed_time": self.engine.elapsed_time,
+            "current_split_index": self.engine.current_split_index,
+            "last_split_time": self.engine.last_split_time,
+            "run_type": self.run_type,
+            "prior_best": self.engine.prior_bests(),
+            "splits": [
+                {
                     "name": split.name,
                     "split_time": split.split_time,
                     "segment_time": split.segment_time,
-                    "best_segment": split.best_segment
-                }
-                current_state["splits"].append(split_data)
-
-            # Save to a dedicated file
-            save_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "current_run_state.json")
-            with open(save_path, 'w') as f:
-                json.dump(current_state, f, indent=4)
+                    "best_segment": split.best_segment,
+                    "pb_split": split.pb_split,
+                    "focus_time": split.focus_time,
+                    "group": list(split.group)
+                } for split in self.engine.splits
+            ]
+        }
 
-            messagebox.showinfo("Success", "Current run saved successfully")
+    def autosave_current_run(self):
+        """Queue a background save of the current run so a crash loses at most a few seconds"""
+        if self.engine.current_split_index == 0 and not self.engine.is_running:
+            return
+        self.last_autosave = self.engine.elapsed_time
+        self.writer.schedule(self.data_path(self.CURRENT_RUN_FILE), self.current_run_state())
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Error saving current run: {str(e)}")
+    def save_current_run(self):
+        """Save the current run state to a JSON file"""
+        self.io.submit(
+            atomic_write_json, self.data_path(self.CURRENT_RUN_FILE), self.current_run_state(),
+            on_done=lambda _: messagebox.showinfo("Success", "Current run saved successfully"),
+            on_error=lambda e: messagebox.showerror("Error", f"Error saving current run: {str(e)}")
+        )
 
     def load_current_run(self):
-        """Load the previously saved run state"""
-        try:
-            save_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "current_run_state.json")
+        """Load the previously saved run state (read on the I/O thread)"""
+        save_path = self.data_path(self.CURRENT_RUN_FILE)
 
+        def read():
+            # Make sure a pending autosave isn't still on its way to disk
+            self.writer.flush()
             if not os.path.exists(save_path):
-                messagebox.showwarning("Warning", "No saved run state found")
-                return
-
+                return None
             with open(save_path, 'r') as f:
-                saved_state = json.load(f)
+                return json.load(f)
 
-            # Restore timer state
-            self.elapsed_time = saved_state["elapsed_time"]
-            self.current_split_index = saved_state["current_split_index"]
-            self.last_split_time = saved_state["last_split_time"]
+        self.io.submit(read, on_done=self.apply_saved_run,
+                       on_error=lambda e: messagebox.showerror("Error", f"Error loading saved run: {str(e)}"))
+
+    def apply_saved_run(self, saved_state):
+        if saved_state is None:
+            messagebox.showwarning("Warning", "No saved run state found")
+            return
+
+        try:
             self.run_type = saved_state["run_type"]
 
             # Restore splits
-            self.splits = []
+            splits = []
             for split_data in saved_state["splits"]:
-                split = Split(split_data["name"])
+                split = Split(split_data["name"], split_data.get("group") or ())
                 split.split_time = split_data["split_time"]
                 split.segment_time = split_data["segment_time"]
                 split.best_segment = split_data["best_segment"]
-                self.splits.append(split)
+                split.focus_time = split_data.get("focus_time", 0)
+                split.pb_split = split_data.get("pb_split")
+                splits.append(split)
+
+            # Restore timer state
+            self.engine.stop()
+            self.engine.restore(
+                saved_state["elapsed_time"],
+                saved_state["current_split_index"],
+                saved_state["last_split_time"],
+                splits,
+                prior_best=saved_state.get("prior_best")
+            )
+            # The log must describe this run, not whatever was running before
+            self.split_log.rewrite()
 
             # Update display
-            self.timer_display.config(text=self.format_time(self.elapsed_time))
-            self.update_splits_display()
+            self.update_timer_display()
 
             messagebox.showinfo("Success", "Run state loaded successfully")
 
         except Exception as e:
             messagebox.showerror("Error", f"Error loading saved run: {str(e)}")
 
+    def export_timings(self):
+        """Save callback timings, tick jitter and any profile samples as JSON"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            title="Export Timings"
+        )
+        if file_path:
+            # The report is taken here; only the file is written on the I/O thread
+            self.io.submit(self.instruments.export_json, file_path, self.instruments.report(),
+                           on_error=lambda e: messagebox.showerror("Error", f"Error exporting timings: {str(e)}"))
+
     def toggle_always_on_top(self):
         """Toggle always-on-top state"""
         self.root.attributes('-topmost', self.always_on_top.get())
@@ -843,97 +1432,107 @@ class SpeedrunTimerGUI:
             column = self.splits_tree.identify_column(event.x)
             if str(column) == "#5":  # Focus Time column
                 item = self.splits_tree.identify_row(event.y)
-                if item:
-                    index = self.splits_tree.index(item)
-                    self.setup_focus_tracking(index)
+                if item in self.split_row_index:  # Summary and group rows aren't splits
+                    self.setup_focus_tracking(self.split_row_index[item])
 
     def setup_focus_tracking(self, split_index):
         """Setup window tracking for a split"""
-        if not self.is_running:
+        if not self.engine.is_running:
             messagebox.showinfo("Info", "Timer must be running to track focus")
             return
 
-        if split_index != self.current_split_index:
+        if split_index != self.engine.current_split_index:
             messagebox.showinfo("Info", "Can only track focus for current split")
             return
 
-        split = self.splits[split_index]
+        split = self.engine.splits[split_index]
 
         # If already tracking, stop tracking
         if split.is_focusing:
-            split.is_focusing = False
-            split.focus_window = None
+            self.stop_focus_tracking()
+            self.update_splits_display()
             messagebox.showinfo("Focus Tracking", "Focus tracking stopped")
             return
 
+        if self.get_focus_timer() is None:
+            messagebox.showerror("Error", "Focus tracking is not available on this system")
+            return
+
         # Ask user to click on the window they want to track
         messagebox.showinfo("Setup Focus Tracking",
             "After clicking OK, click on the window you want to track (you have 3 seconds)")
 
-        self.root.after(3000, lambda: self.capture_window(split_index))
+        self.scheduler.call_later("capture_window", 3, lambda: self.capture_window(split_index))
+
+    def stop_focus_tracking(self):
+        """Stop counting focus time, keeping what was counted, and stop polling for it"""
+        if self.focus_timer:
+            self.focus_timer.untrack()
+        self.scheduler.cancel("focus_poll")
+
+    def get_focus_timer(self):
+        """Create the platform's focus tracker on first use"""
+        if self.focus_timer is None:
+            tracker = create_focus_tracker(self.engine.clock)
+            if tracker is None:
+                return None
+            self.focus_tracker = tracker
+            self.focus_timer = FocusTimer(tracker)
+            tracker.subscribe(self.on_focus_change)
+
+            # Event-driven backends are watched by Tk itself, so nothing polls
+            if tracker.fileno() is not None:
+                self.root.tk.createfilehandler(tracker.fileno(), tk.READABLE,
+                                               lambda *args: tracker.dispatch())
+        return self.focus_timer
 
     def capture_window(self, split_index):
         """Capture the currently active window for tracking"""
         try:
-            window = win32gui.GetForegroundWindow()
-            window_title = win32gui.GetWindowText(window)
+            if split_index != self.engine.current_split_index:
+                return
+
+            self.focus_tracker.poll()
+            window_title = self.focus_tracker.active_title
 
-            split = self.splits[split_index]
-            split.focus_window = window_title
-            split.is_focusing = True
+            split = self.engine.splits[split_index]
+            self.focus_timer.track(split, window_title)
 
             messagebox.showinfo("Focus Tracking",
                 f"Now tracking window: {window_title}\nFocus time will only count when this window is active")
 
-            # Start the focus checking
-            self.check_window_focus()
+            # Polled backends only need checking while something is tracked
+            if self.focus_tracker.poll_interval is not None:
+                self.scheduler.every("focus_poll", self.focus_tracker.poll_interval, self.poll_focus)
 
         except Exception as e:
             messagebox.showerror("Error", f"Error setting up focus tracking: {str(e)}")
 
-    def check_window_focus(self):
-        """Check if the tracked window is in focus and update times"""
-        if self.is_running and self.current_split_index < len(self.splits):
-            current_split = self.splits[self.current_split_index]
-
-            if current_split.is_focusing:
-                current_window = win32gui.GetWindowText(win32gui.GetForegroundWindow())
+    def poll_focus(self):
+        """Poll backends without focus events while a split is being tracked"""
+        tracker = self.focus_tracker
+        if tracker is None or tracker.poll_interval is None or self.focus_timer.split is None:
+            self.scheduler.cancel("focus_poll")
+            return
 
-                if current_window == current_split.focus_window:
-                    # Update focus time
-                    current_split.focus_time += 1
-                    self.update_splits_display()
+        tracker.poll()
 
-        # Check again in 1 second
-        self.root.after(1000, self.check_window_focus)
+    def on_focus_change(self, window_title, timestamp_ns):
+        if self.engine.is_running:
+            self.scheduler.after_batch("splits_display", self.update_splits_display)
 
     def get_focus_color(self, focus_percentage):
         """Return the appropriate color based on focus percentage"""
-        color_map = [
-            (0, "#FCC0C7"),
-            (5.5, "#eebcc7"),
-            (11, "#e4bcc4"),
-            (16.5, "#dabcc1"),
-            (22, "#d0bcbe"),
-            (27.5, "#c6bcbb"),
-            (33, "#bcbcb8"),
-            (38.5, "#b2bcb5"),
-            (44, "#a8bcb2"),
-            (49.5, "#9ebcaf"),
-            (55, "#94bcac"),
-            (59.5, "#8abca9"),
-            (66, "#80bca6"),
-            (71.5, "#76bca3"),
-            (77, "#6cbca0"),
-            (82.5, "#62bc9d"),
-            (88, "#58bc9a"),
-            (93.5, "#4EBC97"),
-            (99, "#00c62b")
-        ]
-
-        # Find the closest percentage match
-        closest = min(color_map, key=lambda x: abs(x[0] - focus_percentage))
-        return closest[1]
+        return self.focus_gradient.color(focus_percentage)
+
+    def toggle_blend_focus_colors(self):
+        """Switch between nearest-stop and blended focus colours, and remember the choice"""
+        gradient = self.focus_gradient
+        self.focus_gradient = FocusGradient(gradient.stops, self.blend_focus_colors.get())
+        self.focus_gradient.register(self.splits_tree)
+        self.update_splits_display()
+        self.io.submit(atomic_write_json, self.data_path(self.FOCUS_COLORS_FILE), self.focus_gradient.settings(),
+                       on_error=lambda e: print(f"Error saving focus colour settings: {str(e)}"))
 
 
 def run_csv_script():
@@ -950,35 +1549,62 @@ def run_csv_script():
         print(f"Error opening CSV script: {str(e)}")
         return False
 
-def main():
-    # First, ask if user wants to update CSV
-    initial_root = tk.Tk()
-    initial_root.withdraw()  # Hide the empty tkinter window
-
+def ask_csv_update(root):
+    """Offer to refresh the Fitbit CSV data on top of the already visible main window"""
     should_update = messagebox.askyesno(
         "Update CSV Data",
-        "Would you like to update CSV data before starting?\n(This will open the Fitbit data script)"
+        "Would you like to update CSV data before starting?\n(This will open the Fitbit data script)",
+        parent=root
     )
 
-    initial_root.destroy()  # Destroy the initial window
-
     if should_update:
         run_csv_script()
-        temp_root = tk.Tk()
-        temp_root.withdraw()
-        if messagebox.askyesno("Continue", "Click Yes when the CSV update is complete to start the timer"):
-            temp_root.destroy()
-            # Create new root window for main application
-            main_root = tk.Tk()
-            app = SpeedrunTimerGUI(main_root)
-            main_root.mainloop()
-        else:
-            temp_root.destroy()
-    else:
-        # Create new root window for main application
-        main_root = tk.Tk()
-        app = SpeedrunTimerGUI(main_root)
-        main_root.mainloop()
+        if not messagebox.askyesno("Continue", "Click Yes when the CSV update is complete to start the timer", parent=root):
+            root.destroy()
+
+def report_first_frame(root):
+    """Print the time to the first drawn frame and quit (see benchmarks/bench_startup.py)"""
+    def on_map(event=None):
+        if event is not None and event.widget is not root:
+            return
+        root.unbind('<Map>')
+        root.after_idle(finish)
+
+    def finish():
+        root.update_idletasks()
+        print(f"first_frame {time.perf_counter() - _STARTUP_T0:.6f}")
+        sys.stdout.flush()
+        root.destroy()
+
+    root.bind('<Map>', on_map)
+
+def main():
+    parser = argparse.ArgumentParser(description="Speedrun Timer")
+    parser.add_argument("--skip-csv-prompt", action="store_true",
+                        help="start straight away without offering to update the CSV data")
+    parser.add_argument("--startup-benchmark", action="store_true",
+                        help="print the time to the first frame and exit")
+    parser.add_argument("--timings-json", metavar="PATH",
+                        help="write callback timings and tick jitter to PATH on exit")
+    parser.add_argument("--data-dir", metavar="DIR",
+                        help="keep templates, run history, logs and settings in DIR instead of next to timer.py")
+    parser.add_argument("--control-socket", metavar="PATH",
+                        help="listen for control commands on PATH instead of the default socket")
+    parser.add_argument("--no-control-socket", action="store_true", help="don't open the control socket")
+    args = parser.parse_args()
+
+    # A single root for the whole session: the main window comes up first and
+    # the pre-launch "Update CSV Data" prompt is asked on top of it
+    main_root = tk.Tk()
+    app = SpeedrunTimerGUI(main_root, timings_json=args.timings_json, data_dir=args.data_dir,
+                           control_address=False if args.no_control_socket else args.control_socket)
+
+    if args.startup_benchmark:
+        report_first_frame(main_root)
+    elif not args.skip_csv_prompt:
+        main_root.after_idle(ask_csv_update, main_root)
+
+    main_root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,464 @@
+import itertools
+import time
+from array import array
+
+NS_PER_SECOND = 1_000_000_000
+
+# Markers in TimerEngine.split_ns for splits without a time
+NOT_REACHED = -1
+SKIPPED = -2
+
+
+class Split:
+    # No per-instance __dict__: replay and simulation keep very many of these alive
+    __slots__ = ("name", "group", "row_id", "split_time", "segment_time", "best_segment",
+                 "pb_split", "focus_time", "focus_window", "is_focusing")
+
+    _row_ids = itertools.count()
+
+    def __init__(self, name, group=()):
+        self.name = name
+        self.group = tuple(group)  # Path of enclosing sub-split groups, outermost first
+        self.row_id = f"split_{next(Split._row_ids)}"  # Stable Treeview item id
+        self.split_time = None
+        self.segment_time = None
+        self.best_segment = None
+        self.pb_split = None  # Split time in the personal best run
+        self.focus_time = 0  # Total focused time
+        self.focus_window = None  # Window to track
+        self.is_focusing = False  # Currently tracking focus?
+
+
+class ComparisonIndex:
+    """
+    Prefix sums over the comparison times a run is measured against.
+
+    The baseline (best segments and PB split times) is rebuilt whenever
+    the split list is replaced, edited, restored or reset, never on a
+    split, so golds set during the run don't move the target until the
+    next reset.
+    Every query is O(1): sum of best up to a split is a prefix-sum lookup,
+    and the live deltas for the current split only need the elapsed time.
+    """
+
+    def __init__(self, splits=()):
+        self.rebuild(splits)
+
+    def rebuild(self, splits):
+        self.best = [split.best_segment for split in splits]
+        self.pb = [split.pb_split for split in splits]
+
+        # best_prefix[i] = sum of best segments before split i; missing_prefix
+        # counts splits without a best so incomplete sums can be reported as None
+        self.best_prefix = [0.0]
+        self.missing_prefix = [0]
+        for best in self.best:
+            self.best_prefix.append(self.best_prefix[-1] + (best or 0.0))
+            self.missing_prefix.append(self.missing_prefix[-1] + (best is None))
+
+    def sum_of_best(self, start=0, end=None):
+        """Sum of best segments for splits [start, end), or None if any is missing"""
+        if end is None:
+            end = len(self.best)
+        if self.missing_prefix[end] - self.missing_prefix[start]:
+            return None
+        return self.best_prefix[end] - self.best_prefix[start]
+
+    def pb_delta(self, index, split_time):
+        """Time ahead (-) or behind (+) the PB at split `index`"""
+        pb = self.pb[index] if index < len(self.pb) else None
+        if pb is None or split_time is None:
+            return None
+        return split_time - pb
+
+    def best_delta(self, index, segment_time):
+        """Time lost (+) or saved (-) against the best segment of split `index`"""
+        best = self.best[index] if index < len(self.best) else None
+        if best is None or segment_time is None:
+            return None
+        return segment_time - best
+
+    def best_possible_time(self, index, last_split_time, segment_time):
+        """
+        Best final time still reachable while on split `index`: time so far,
+        plus at least the best segment for the current split, plus the sum
+        of best for the rest.
+        """
+        if index >= len(self.best):
+            return last_split_time
+        remaining = self.sum_of_best(index + 1)
+        best = self.best[index]
+        if remaining is None or best is None:
+            return None
+        return last_split_time + max(segment_time or 0, best) + remaining
+
+    @property
+    def pb_time(self):
+        return self.pb[-1] if self.pb else None
+
+
+class TimerEngine:
+    """
+    Display-independent timing state for a run.
+
+    The engine owns the splits and the elapsed/split bookkeeping. Anything
+    that wants to react to it (the Tk GUI, tests, benchmarks) subscribes to
+    events instead of poking at the state directly:
+
+        started, stopped, reset   -> callback()
+        tick                      -> callback(elapsed_time)
+        split, undo, skip         -> callback(index, split)
+        finished                  -> callback()
+        splits_changed            -> callback()
+
+    Per-split progress is kept in compact arrays: split_ns holds the
+    elapsed nanoseconds at each split (or NOT_REACHED / SKIPPED), and a
+    stack of completed indices plus each split's best segment from before
+    this run make undo O(1) and restore the best segment exactly.
+    A segment that follows a skipped split spans several splits, so it
+    never counts as a best segment.
+
+    `clock` is any zero-argument callable returning a monotonic integer
+    nanosecond count (time.perf_counter_ns by default), so tests can drive
+    the engine with a fake clock. Elapsed time is kept in integer
+    nanoseconds to avoid float drift on long runs; `elapsed_time` exposes
+    it in seconds.
+    """
+
+    EVENTS = ("started", "stopped", "reset", "tick", "split", "undo", "skip", "finished", "splits_changed")
+
+    def __init__(self, splits=None, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.splits = list(splits) if splits else []
+        self.start_ns = None
+        self.is_running = False
+        self.current_split_index = 0
+        self.last_split_time = 0
+        self.elapsed_ns = 0
+        self.comparisons = ComparisonIndex(self.splits)
+        self._listeners = {event: [] for event in self.EVENTS}
+        self._reset_progress()
+
+    def _reset_progress(self):
+        count = len(self.splits)
+        self.split_ns = array('q', [NOT_REACHED]) * count
+        self._prior_best = array('d', [0.0]) * count
+        self._completed = array('i')
+        self._prior_pb = None  # PB split times replaced by this run, until it's undone or reset
+        self._group_ranges = None
+
+    # Observer API
+
+    def subscribe(self, event, callback):
+        """Register a callback for an engine event"""
+        if event not in self._listeners:
+            raise ValueError(f"Unknown timer event: {event}")
+        self._listeners[event].append(callback)
+        return callback
+
+    def unsubscribe(self, event, callback):
+        """Remove a previously registered callback"""
+        if callback in self._listeners.get(event, ()):
+            self._listeners[event].remove(callback)
+
+    def emit(self, event, *args):
+        for callback in list(self._listeners[event]):
+            callback(*args)
+
+    # Run control
+
+    @property
+    def elapsed_time(self):
+        return self.elapsed_ns / NS_PER_SECOND
+
+    @elapsed_time.setter
+    def elapsed_time(self, seconds):
+        self.elapsed_ns = round(seconds * NS_PER_SECOND)
+        if self.is_running:
+            self.start_ns = self.clock() - self.elapsed_ns
+
+    def next_display_change(self, precision=0):
+        """
+        Seconds until the elapsed time, shown with `precision` decimal
+        places, next changes its displayed text.
+        """
+        unit_ns = 10 ** (9 - precision)
+        elapsed_ns = self.clock() - self.start_ns if self.is_running else self.elapsed_ns
+        return (unit_ns - elapsed_ns % unit_ns) / NS_PER_SECOND
+
+    @property
+    def current_split(self):
+        if self.current_split_index < len(self.splits):
+            return self.splits[self.current_split_index]
+        return None
+
+    @property
+    def is_finished(self):
+        return bool(self.splits) and self.current_split_index >= len(self.splits)
+
+    def set_splits(self, splits):
+        """Replace the run's splits (e.g. after loading a template)"""
+        self.splits = list(splits)
+        self.comparisons.rebuild(self.splits)
+        self._reset_progress()
+        self.emit("splits_changed")
+
+    def splits_edited(self):
+        """The splits' names or times were edited in place; keeps the run's progress"""
+        self.comparisons.rebuild(self.splits)
+        self.emit("splits_changed")
+
+    def elapsed_at(self, timestamp_ns):
+        """Elapsed run time in seconds at a reading of the engine's clock"""
+        if not self.is_running:
+            return self.elapsed_time
+        return (timestamp_ns - self.start_ns) / NS_PER_SECOND
+
+    def start(self, at_ns=None):
+        """Start (or resume) the run; `at_ns` backdates it to an earlier clock reading"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self.start_ns = (self.clock() if at_ns is None else at_ns) - self.elapsed_ns
+        self.emit("started")
+
+    def stop(self, at_ns=None):
+        if self.is_running:
+            self.elapsed_ns = (self.clock() if at_ns is None else at_ns) - self.start_ns
+        self.is_running = False
+        self.emit("stopped")
+
+    def reset(self):
+        self.is_running = False
+        self.elapsed_ns = 0
+        self.current_split_index = 0
+        self.last_split_time = 0
+        # Times belong to the run; bests and PB splits carry over
+        for split in self.splits:
+            split.split_time = None
+            split.segment_time = None
+            split.focus_time = 0
+        self.comparisons.rebuild(self.splits)
+        self._reset_progress()
+        self.emit("stopped")
+        self.emit("reset")
+
+    def tick(self):
+        """Advance the elapsed time and keep the current split's times live"""
+        if not self.is_running:
+            return
+        self.elapsed_ns = self.clock() - self.start_ns
+
+        current_split = self.current_split
+        if current_split is not None:
+            current_split.split_time = self.elapsed_time
+            current_split.segment_time = self.elapsed_time - self.last_split_time
+
+        self.emit("tick", self.elapsed_time)
+
+    def split(self, at=None, at_ns=None):
+        """
+        Complete the current split at `at` seconds into the run, or at
+        clock reading `at_ns` (defaults to now). A backdated split leaves
+        a running clock alone. Returns the completed Split, or None.
+        """
+        current_split = self.current_split
+        if current_split is None:
+            return None
+
+        if self.is_running:
+            if at is None:
+                at = ((self.clock() if at_ns is None else at_ns) - self.start_ns) / NS_PER_SECOND
+            self.elapsed_ns = self.clock() - self.start_ns
+        elif at is None:
+            at = self.elapsed_time
+        else:
+            self.elapsed_time = at
+
+        index = self.current_split_index
+        current_split.split_time = at
+        current_split.segment_time = at - self.last_split_time
+
+        # Remember the best from before this split so an undo can put it back
+        best = current_split.best_segment
+        self._prior_best[index] = float('nan') if best is None else best
+        if self._segment_is_clean(index) and (best is None or current_split.segment_time < best):
+            current_split.best_segment = current_split.segment_time
+
+        self.split_ns[index] = round(at * NS_PER_SECOND)
+        self._completed.append(index)
+        self.last_split_time = at
+        self.current_split_index += 1
+
+        self.emit("split", index, current_split)
+
+        if self.is_finished:
+            # The run ends at the final split, however late it was handled
+            self.stop(at_ns=self.start_ns + self.split_ns[index] if self.is_running else None)
+            prior_pb = [split.pb_split for split in self.splits]
+            if self.update_personal_best():
+                self._prior_pb = prior_pb
+            self.emit("finished")
+        return current_split
+
+    def _segment_is_clean(self, index):
+        """True if split `index`'s segment starts at the previous split (nothing skipped in between)"""
+        if index == 0:
+            return True
+        return bool(self._completed) and self._completed[-1] == index - 1
+
+    def skip_split(self):
+        """Move past the current split without a time. Returns the skipped Split, or None"""
+        current_split = self.current_split
+        if current_split is None:
+            return None
+
+        index = self.current_split_index
+        current_split.split_time = None
+        current_split.segment_time = None
+        self.split_ns[index] = SKIPPED
+        self.current_split_index += 1
+
+        self.emit("skip", index, current_split)
+
+        if self.is_finished:
+            self.stop()
+            self.emit("finished")
+        return current_split
+
+    def undo_split(self):
+        """
+        Step back to the previous split, undoing its split or skip in O(1).
+        Undoing the final split resumes a finished run. Returns the Split
+        that is current again, or None if there was nothing to undo.
+        """
+        if self.current_split_index == 0:
+            return None
+
+        was_finished = self.is_finished
+        index = self.current_split_index - 1
+        split = self.splits[index]
+
+        # The split we're leaving was showing live times
+        if not was_finished:
+            leaving = self.splits[self.current_split_index]
+            leaving.split_time = None
+            leaving.segment_time = None
+
+        if was_finished and self._prior_pb is not None:
+            # The run isn't a PB after all
+            for restored, pb_split in zip(self.splits, self._prior_pb):
+                restored.pb_split = pb_split
+            self._prior_pb = None
+
+        if self._completed and self._completed[-1] == index:
+            self._completed.pop()
+            prior_best = self._prior_best[index]
+            split.best_segment = None if prior_best != prior_best else prior_best
+            previous = self._completed[-1] if self._completed else None
+            self.last_split_time = 0 if previous is None else self.split_ns[previous] / NS_PER_SECOND
+
+        split.split_time = None
+        split.segment_time = None
+        self.split_ns[index] = NOT_REACHED
+        self.current_split_index = index
+
+        if was_finished and not self.is_running:
+            # Carry on timing as if the final split had never been hit
+            self.is_running = True
+            self.emit("started")
+
+        self.emit("undo", index, split)
+        return split
+
+    # Sub-split groups
+
+    def group_ranges(self):
+        """
+        [(group path, start, end)] for every (nested) group of consecutive
+        splits sharing a group prefix, outermost groups first.
+        """
+        if self._group_ranges is None:
+            ranges = []
+            open_groups = []  # [(path, start)]
+            for index, split in enumerate(self.splits + [Split("", ())]):
+                depth = 0
+                while (depth < len(open_groups) and depth < len(split.group)
+                       and open_groups[depth][0] == split.group[:depth + 1]):
+                    depth += 1
+                for path, start in open_groups[depth:]:
+                    ranges.append((path, start, index))
+                del open_groups[depth:]
+                for level in range(depth, len(split.group)):
+                    open_groups.append((split.group[:level + 1], index))
+            self._group_ranges = sorted(ranges, key=lambda r: (r[1], len(r[0])))
+        return self._group_ranges
+
+    def group_time(self, start, end):
+        """Time spent on splits [start, end) if the group is complete, otherwise None"""
+        last = self.splits[end - 1].split_time if self.current_split_index >= end else None
+        if last is None:
+            return None
+        before = 0.0
+        if start > 0:
+            before = self.splits[start - 1].split_time
+            if before is None:
+                return None
+        return last - before
+
+    def update_personal_best(self):
+        """Make a finished run the new PB if it beat the old one. Returns True if it did"""
+        final_time = self.splits[-1].split_time
+        pb_time = self.splits[-1].pb_split
+        if final_time is None or (pb_time is not None and final_time >= pb_time):
+            return False
+        for split in self.splits:
+            split.pb_split = split.split_time
+        return True
+
+    def prior_bests(self):
+        """Each split's best segment from before this run (golds the run set are left out)"""
+        bests = [split.best_segment for split in self.splits]
+        for index in self._completed:
+            prior = self._prior_best[index]
+            bests[index] = None if prior != prior else prior
+        return bests
+
+    def restore(self, elapsed_time, current_split_index, last_split_time, splits=None, prior_best=None):
+        """
+        Restore a previously saved run state (timer stopped). `prior_best`
+        is each split's best from before the run (as from prior_bests()),
+        so undo can put it back; without it the current bests are used.
+        """
+        self.is_running = False
+        if splits is not None:
+            self.splits = list(splits)
+            self.comparisons.rebuild(self.splits)
+        self.elapsed_time = elapsed_time
+        self.current_split_index = current_split_index
+        self.last_split_time = last_split_time
+
+        # Rebuild the progress arrays from the restored split times
+        self._reset_progress()
+        for index, split in enumerate(self.splits[:current_split_index]):
+            best = prior_best[index] if prior_best is not None and index < len(prior_best) else split.best_segment
+            self._prior_best[index] = float('nan') if best is None else best
+            if split.split_time is None:
+                self.split_ns[index] = SKIPPED
+            else:
+                self.split_ns[index] = round(split.split_time * NS_PER_SECOND)
+                self._completed.append(index)
+        self.emit("splits_changed")
+
+
+class FakeClock:
+    """Integer nanosecond clock for tests and replays, moved forward by hand"""
+
+    def __init__(self):
+        self.ns = 0
+
+    def __call__(self):
+        return self.ns
+
+    def advance(self, seconds):
+        self.ns += round(seconds * NS_PER_SECOND)
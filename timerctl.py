@@ -0,0 +1,34 @@
+"""
+Control a running Speedrun Timer without switching to its window.
+
+    python timerctl.py split
+    python timerctl.py status
+
+Bind these to global hotkeys in your window manager / AutoHotkey.
+"""
+import argparse
+import sys
+
+from control_socket import send_command
+
+COMMANDS = ["start", "stop", "split", "undo", "skip", "reset", "status"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("--socket", help="control socket path (default: the timer's default)")
+    args = parser.parse_args()
+
+    try:
+        reply = send_command(args.command, args.socket)
+    except OSError as e:
+        print(f"Could not reach the timer: {str(e)}", file=sys.stderr)
+        return 2
+
+    print(reply)
+    return 0 if reply.startswith("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())